@@ -0,0 +1,29 @@
+"""Add ORDERED purchase request status
+
+Revision ID: 6e90a34af204
+Revises: c470e6b08c58
+Create Date: 2026-10-18 18:41:07.263590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e90a34af204'
+down_revision: Union[str, None] = 'c470e6b08c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Autogenerate no detecta valores nuevos de un enum de Postgres
+    op.execute("ALTER TYPE purchaserequeststatus ADD VALUE IF NOT EXISTS 'ORDERED'")
+
+
+def downgrade() -> None:
+    # Postgres no permite sacar un valor de un enum: ORDERED queda sin usarse y
+    # las solicitudes ya convertidas vuelven a figurar aprobadas
+    op.execute("UPDATE purchase_requests SET status = 'APPROVED' WHERE status = 'ORDERED'")
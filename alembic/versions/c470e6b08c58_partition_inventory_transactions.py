@@ -0,0 +1,119 @@
+"""Partition inventory transactions by month
+
+Revision ID: c470e6b08c58
+Revises: 539669727571
+Create Date: 2026-10-18 18:02:11.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c470e6b08c58'
+down_revision: Union[str, None] = '539669727571'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Autogenerate no sabe pasar una tabla existente a particionada: se crea la
+# tabla nueva particionada por RANGE (created_at), se copian las filas y se
+# borra la vieja. Las particiones son mensuales (mes calendario en hora
+# Argentina) desde el movimiento más viejo hasta 3 meses adelante; las
+# siguientes las crea `python -m app.cli.inventory_partitions`.
+
+def upgrade() -> None:
+    # created_at pasa a ser parte de la PK (obligatorio en una tabla particionada)
+    op.execute("UPDATE inventory_transactions SET created_at = now() WHERE created_at IS NULL")
+    op.drop_index('ix_inventory_transactions_history', table_name='inventory_transactions')
+    op.drop_index('ix_inventory_transactions_product_id', table_name='inventory_transactions')
+    op.drop_index('ix_inventory_transactions_tenant_id', table_name='inventory_transactions')
+    op.rename_table('inventory_transactions', 'inventory_transactions_old')
+    op.execute('ALTER TABLE inventory_transactions_old RENAME CONSTRAINT inventory_transactions_pkey TO inventory_transactions_old_pkey')
+
+    op.create_table('inventory_transactions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('transaction_type', postgresql.ENUM('IN', 'OUT', 'ADJUSTMENT', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('reference_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM inventory_transactions_old), now()
+            ) AT TIME ZONE 'America/Argentina/Buenos_Aires')::date;
+            last_month date := (date_trunc('month', now() AT TIME ZONE 'America/Argentina/Buenos_Aires') + interval '3 months')::date;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF inventory_transactions FOR VALUES FROM (%L) TO (%L)',
+                    'inventory_transactions_p' || to_char(month_start, 'YYYYMM'),
+                    month_start::timestamp AT TIME ZONE 'America/Argentina/Buenos_Aires',
+                    (month_start + interval '1 month')::timestamp AT TIME ZONE 'America/Argentina/Buenos_Aires'
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+        """
+    )
+    # Red de seguridad si el mantenimiento no corrió a tiempo
+    op.execute('CREATE TABLE inventory_transactions_default PARTITION OF inventory_transactions DEFAULT')
+    op.execute(
+        """
+        INSERT INTO inventory_transactions (id, tenant_id, product_id, transaction_type, quantity, reference_id, created_at)
+        SELECT id, tenant_id, product_id, transaction_type, quantity, reference_id, created_at
+        FROM inventory_transactions_old
+        """
+    )
+    op.drop_table('inventory_transactions_old')
+
+    # Índices en la tabla padre: Postgres los crea en cada partición
+    op.create_index(op.f('ix_inventory_transactions_product_id'), 'inventory_transactions', ['product_id'], unique=False)
+    op.create_index(op.f('ix_inventory_transactions_tenant_id'), 'inventory_transactions', ['tenant_id'], unique=False)
+    op.create_index('ix_inventory_transactions_history', 'inventory_transactions', ['tenant_id', 'product_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    # Vuelve a una tabla común con lo que siga adjunto (lo archivado no vuelve)
+    op.drop_index('ix_inventory_transactions_history', table_name='inventory_transactions')
+    op.drop_index(op.f('ix_inventory_transactions_tenant_id'), table_name='inventory_transactions')
+    op.drop_index(op.f('ix_inventory_transactions_product_id'), table_name='inventory_transactions')
+    op.rename_table('inventory_transactions', 'inventory_transactions_partitioned')
+
+    op.create_table('inventory_transactions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('transaction_type', postgresql.ENUM('IN', 'OUT', 'ADJUSTMENT', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('reference_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id', name='inventory_transactions_new_pkey')
+    )
+    op.execute(
+        """
+        INSERT INTO inventory_transactions (id, tenant_id, product_id, transaction_type, quantity, reference_id, created_at)
+        SELECT id, tenant_id, product_id, transaction_type, quantity, reference_id, created_at
+        FROM inventory_transactions_partitioned
+        """
+    )
+    # Borra la tabla padre y todas sus particiones
+    op.drop_table('inventory_transactions_partitioned')
+    op.execute('ALTER TABLE inventory_transactions RENAME CONSTRAINT inventory_transactions_new_pkey TO inventory_transactions_pkey')
+    op.create_index(op.f('ix_inventory_transactions_product_id'), 'inventory_transactions', ['product_id'], unique=False)
+    op.create_index(op.f('ix_inventory_transactions_tenant_id'), 'inventory_transactions', ['tenant_id'], unique=False)
+    op.create_index('ix_inventory_transactions_history', 'inventory_transactions', ['tenant_id', 'product_id', 'created_at', 'id'], unique=False)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from app.api.v1.endpoints import auth
-from app.api.v1.endpoints import users, tenants, payments, notifications, products, suppliers, request, orders, inventory
+from app.api.v1.endpoints import users, tenants, payments, notifications, products, suppliers, request, orders, inventory, metrics
 
 api_router = APIRouter()
 
@@ -14,3 +14,4 @@ api_router.include_router(products.router, prefix="/products", tags=["products"]
 api_router.include_router(request.router, prefix="/request", tags=["request"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
 api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -1,53 +1,120 @@
 from typing import AsyncGenerator
 from typing import Annotated, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from uuid import UUID
 
 from app.core import security
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_db, get_read_sessionmaker, get_sessionmaker
+from app.core.principal_cache import principal_cache
+from app.core.token_revocation import token_revocations
 from app.models.user import Users
 from app.schemas.token import TokenPayload
 from app.services import user_services
 from app.models.enums import Roles
+from app.middleware.read_after_write import prefers_primary
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/v1/auth/login")
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Sesión de solo lectura: réplica si hay una configurada, salvo que el cliente haya escrito recién."""
+    sessionmaker = get_sessionmaker() if prefers_primary(request) else get_read_sessionmaker()
+    async with sessionmaker() as session:
         try:
             yield session
         finally:
             await session.close()
 
-async def get_current_user(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    token: Annotated[str, Depends(oauth2_scheme)]
-) -> Users:
+def _claims_principal(user_id: UUID, token_data: TokenPayload) -> Users:
+    # Usuario armado solo con los claims firmados; no tiene username ni full_name
+    user = Users(
+        id=user_id,
+        tenant_id=UUID(token_data.tenant_id),
+        role=Roles(token_data.role),
+        is_active=True,
+        token_version=token_data.ver,
+    )
+    make_transient_to_detached(user)
+    return user
+
+async def _load_user(db: AsyncSession, user_id: UUID) -> Users:
+    # Primero el cache de usuarios; solo vamos a la DB en un miss
+    user = principal_cache.get(user_id)
+    if user is None:
+        user = await user_services.get_by_id(db, user_id=user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.set(user)
+    return user
+
+async def _authenticate(db: AsyncSession, token: str, allow_stateless: bool) -> Users:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
+        user_id = UUID(token_data.sub)
+        stateless = (
+            allow_stateless
+            and settings.STATELESS_AUTH
+            and None not in (token_data.tenant_id, token_data.role, token_data.ver)
+        )
+        user = _claims_principal(user_id, token_data) if stateless else None
+    except (JWTError, ValidationError, TypeError, ValueError):
         raise HTTPException(
             status_code=403,
             detail="Could not validate credentials",
         )
-    
-    user_id = token_data.sub
-    user = await user_services.get_by_id(db, user_id=UUID(user_id))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+
+    if stateless:
+        await token_revocations.refresh_if_due(db)
+        if token_revocations.is_revoked(user_id, token_data.ver):
+            raise HTTPException(status_code=403, detail="Could not validate credentials")
+        # Si el usuario ya está en cache lo preferimos (trae el perfil completo),
+        # pero solo si corresponde a esta versión de token y sigue activo
+        cached = principal_cache.get(user_id, user.tenant_id)
+        if cached is None or cached.token_version < token_data.ver:
+            return user
+        if cached.token_version > token_data.ver:
+            raise HTTPException(status_code=403, detail="Could not validate credentials")
+        if not cached.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        return cached
+
+    user = await _load_user(db, user_id)
+    # Tokens emitidos antes de un reset de contraseña o una desactivación. Las
+    # revocaciones en memoria cubren además un cache que se llenó con la fila
+    # vieja justo antes del COMMIT del cambio.
+    if token_data.ver is not None and (
+        token_data.ver != user.token_version or token_revocations.is_revoked(user_id, token_data.ver)
+    ):
+        raise HTTPException(status_code=403, detail="Could not validate credentials")
+
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-        
+
     return user
 
+async def get_current_user(
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> Users:
+    """
+    Usuario autenticado. Con STATELESS_AUTH los tokens que traen tenant_id, role y
+    versión se autorizan sin consultar la tabla users (sin username/full_name).
+    """
+    return await _authenticate(db, token, allow_stateless=True)
+
+async def get_current_db_user(
+    db: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> Users:
+    """Usuario autenticado con el perfil completo, siempre resuelto contra la DB (o su cache)."""
+    return await _authenticate(db, token, allow_stateless=False)
@@ -1,16 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.models import PlanType
-from datetime import timedelta
 from typing import Annotated, TYPE_CHECKING, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 if TYPE_CHECKING:
     from app.models.user import Users
-from app.core.config import settings
 from uuid import UUID
 
-from app.core.security import create_access_token, verify_password
+from app.core.security import issue_access_token, password_needs_rehash, verify_password_async
 from app.api.deps import get_current_user, get_db
 from app.schemas.token import Token
 from app.schemas.tenant import TenantCreate, TenantSchema
@@ -23,7 +21,7 @@ router = APIRouter()
 async def register(
     tenant: TenantCreate,
     user: UserCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
     ) -> Any:
     tenant.plan_type = PlanType.FREE_TRIAL_1_MONTH
     return await tenant_services.create_tenant_with_admin(db, tenant, user)
@@ -31,23 +29,20 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
     ) -> Token:
     user = await user_services.get_by_username(db, form_data.username)
     if not user:
         raise HTTPException(status_code=400, detail="Usuario no encontrado")
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code = 400, detail="Contraseña incorrecta")
     if not user.is_active:
         raise HTTPException(status_code = 400, detail="Usuario inactivo")
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role},
-        expires_delta=access_token_expires
-    )
+    # Si cambió el costo de bcrypt configurado, regeneramos el hash con la contraseña en mano
+    if password_needs_rehash(user.hashed_password):
+        await user_services.rehash_password(db, user, form_data.password)
     return Token(
-        access_token=access_token,
+        access_token=issue_access_token(user),
         token_type="bearer"
     )
     
@@ -59,7 +54,7 @@ from app.schemas.user import PasswordChange, PasswordReset
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChange,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: Annotated[Any, Depends(get_current_user)] = None # Annotated type Any to avoid circular import issues if Users is not imported, though get_current_user returns Users.
 ):
     # current_user is already verified by get_current_user
@@ -69,7 +64,7 @@ async def change_password(
 async def reset_password(
     target_user_id: UUID, 
     password_data: PasswordReset,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: Annotated[Any, Depends(get_current_user)] = None
 ):
     # Lógica de permisos manejada en el servicio
@@ -82,7 +77,7 @@ from fastapi.responses import JSONResponse
 @router.post("/recover-password")
 async def recover_password(
     request: PasswordRecoveryRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Initiates password recovery.
@@ -1,14 +1,27 @@
-from typing import List, Optional, Dict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_read_db
+from app.core.config import settings
 from app.models.enums import Roles
 from app.models.user import Users
-from app.schemas.inventory import InventoryTransactionSchema, InventoryTransactionCreate
-from app.services import inventory_services
+from app.schemas.inventory import (
+    InventoryHistoryPage,
+    InventoryTransactionBatchCreate,
+    InventoryTransactionCreate,
+    InventoryTransactionSchema,
+    ReorderSuggestion,
+    StockAsOf,
+    ValuationReport,
+)
+from app.schemas.products import ProductsPage
+from app.schemas.requests import RequestSchema
+from app.services import forecast_services, inventory_services, valuation_services
 
 router = APIRouter()
 
@@ -16,7 +29,7 @@ router = APIRouter()
 async def create_manual_transaction(
     transaction: InventoryTransactionCreate,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
         raise HTTPException(
@@ -32,19 +45,122 @@ async def create_manual_transaction(
         reference_id=transaction.reference_id
     )
 
-@router.get("/history/{product_id}", response_model=List[InventoryTransactionSchema])
+@router.post("/transactions/batch", response_model=List[InventoryTransactionSchema])
+async def create_batch_transaction(
+    batch: InventoryTransactionBatchCreate,
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db, scope="function"),
+):
+    if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
+        raise HTTPException(
+            status_code=403, detail="No tienes permisos para realizar ajustes de inventario."
+        )
+
+    # Todas las líneas se aplican juntas o ninguna (un solo commit en get_db)
+    return await inventory_services.register_transactions(
+        db=db,
+        tenant_id=current_user.tenant_id,
+        lines=[
+            inventory_services.Movement(line.product_id, line.transaction_type, Decimal(line.quantity), batch.reference_id)
+            for line in batch.lines
+        ],
+    )
+
+@router.get("/history/{product_id}", response_model=InventoryHistoryPage)
 async def read_product_history(
     product_id: UUID,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(settings.INVENTORY_HISTORY_PAGE_SIZE, ge=1, le=settings.INVENTORY_HISTORY_MAX_PAGE_SIZE),
 ):
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
         raise HTTPException(
             status_code=403, detail="No tienes permisos para ver el historial de inventario."
         )
 
-    return await inventory_services.get_product_history(
+    transactions, next_cursor = await inventory_services.get_product_history(
         db=db,
         product_id=product_id,
-        tenant_id=current_user.tenant_id
-    )
\ No newline at end of file
+        tenant_id=current_user.tenant_id,
+        limit=limit,
+        cursor=cursor,
+    )
+    return InventoryHistoryPage(items=transactions, next_cursor=next_cursor)
+
+@router.get("/low-stock", response_model=ProductsPage)
+async def read_low_stock(
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(settings.PRODUCTS_PAGE_SIZE, ge=1, le=settings.PRODUCTS_MAX_PAGE_SIZE),
+):
+    if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
+        raise HTTPException(
+            status_code=403, detail="No tienes permiso para acceder a esta ruta"
+        )
+
+    products, next_cursor = await inventory_services.get_low_stock_products(
+        db, current_user.tenant_id, limit=limit, cursor=cursor
+    )
+    return ProductsPage(items=products, next_cursor=next_cursor)
+
+@router.get("/reorder-suggestions", response_model=List[ReorderSuggestion])
+async def read_reorder_suggestions(
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    method: Optional[Literal["sma", "ses"]] = Query(None, description="Por defecto FORECAST_METHOD"),
+    only_needed: bool = Query(True, description="Solo los productos que hay que pedir"),
+):
+    if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
+        raise HTTPException(
+            status_code=403, detail="No tienes permiso para acceder a esta ruta"
+        )
+
+    return await forecast_services.get_reorder_suggestions(
+        db, current_user.tenant_id, method=method, only_needed=only_needed
+    )
+
+@router.post("/reorder-suggestions/request", response_model=RequestSchema)
+async def create_request_from_suggestions(
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db, scope="function"),
+    method: Optional[Literal["sma", "ses"]] = Query(None, description="Por defecto FORECAST_METHOD"),
+):
+    if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
+        raise HTTPException(
+            status_code=403, detail="No tienes permiso para acceder a esta ruta"
+        )
+
+    # Queda PENDING: la empresa la revisa y aprueba como cualquier solicitud
+    return await forecast_services.create_request_from_suggestions(
+        db, current_user.tenant_id, current_user.id, method=method
+    )
+
+@router.get("/valuation", response_model=ValuationReport)
+async def read_valuation(
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    method: Literal["fifo", "average"] = Query("fifo"),
+):
+    if current_user.role != Roles.COMPANY:
+        raise HTTPException(
+            status_code=403, detail="No tienes permiso para acceder a esta ruta"
+        )
+
+    return await valuation_services.get_valuation_report(db, current_user.tenant_id, method)
+
+@router.get("/stock/{product_id}", response_model=StockAsOf)
+async def read_stock_as_of(
+    product_id: UUID,
+    as_of: datetime = Query(..., description="Fecha y hora (ISO 8601) a la que se quiere el stock"),
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
+        raise HTTPException(
+            status_code=403, detail="No tienes permisos para ver el historial de inventario."
+        )
+
+    stock = await inventory_services.get_stock_as_of(db, product_id, current_user.tenant_id, as_of)
+    return StockAsOf(product_id=product_id, as_of=as_of, stock_quantity=stock)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, TYPE_CHECKING
+
+from app.api.deps import get_current_user
+from app.core.catalog_cache import catalog_cache, hot_sku_cache
+from app.core.database import get_engine, get_read_engine, pool_status
+from app.models.enums import Roles
+
+if TYPE_CHECKING:
+    from app.models.user import Users
+
+router = APIRouter()
+
+# Estado del pool de conexiones - solo Admin
+@router.get("/db-pool", response_model=dict)
+async def read_db_pool_status(
+    current_user: Annotated["Users", Depends(get_current_user)],
+):
+    if current_user.role != Roles.ADMIN:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para acceder a esta ruta"
+        )
+    engine, read_engine = get_engine(), get_read_engine()
+    status = pool_status(engine)
+    if read_engine is not engine:
+        status["read_replica"] = pool_status(read_engine)
+    return status
+
+
+# Cache de listados de catálogo (hit rate, bytes, 304 servidos) - solo Admin
+@router.get("/catalog-cache", response_model=dict)
+async def read_catalog_cache_stats(
+    current_user: Annotated["Users", Depends(get_current_user)],
+):
+    if current_user.role != Roles.ADMIN:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para acceder a esta ruta"
+        )
+    return {**catalog_cache.stats(), "hot_skus": hot_sku_cache.stats()}
@@ -20,7 +20,7 @@ router = APIRouter()
 @router.get("/", response_model=List[NotificationSchema])
 async def get_my_notifications(
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     status: Optional[NotificationStatus] = Query(None)
 ):
     if current_user.role == Roles.COMPANY:
@@ -28,7 +28,8 @@ async def get_my_notifications(
             db, 
             tenant_id=current_user.tenant_id,
             status=status, 
-            creator_role=Roles.EMPLOYEE
+            creator_role=Roles.EMPLOYEE,
+            include_types=[NotificationType.LOW_STOCK]
         )
     elif current_user.role == Roles.ADMIN:
         return await notification_services.get_notifications(
@@ -44,7 +45,7 @@ async def get_my_notifications(
         )
 
 @router.post("/{username_request}", response_model=NotificationCreate)
-async def create_reset_request(username_request: str, db: AsyncSession = Depends(get_db)):
+async def create_reset_request(username_request: str, db: AsyncSession = Depends(get_db, scope="function")):
     result = await db.execute(select(Users).where(Users.username == username_request))
     user_db = result.scalars().first()
     if not user_db:
@@ -74,7 +75,7 @@ async def create_reset_request(username_request: str, db: AsyncSession = Depends
     )
 
     db.add(new_notification)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_notification)
     return new_notification
 
@@ -83,7 +84,7 @@ async def resolve_notification_request(
     notification_id: UUID,
     new_Status: NotificationStatus,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     result = await db.execute(select(Notification).where(Notification.id == notification_id))
     notification_to_update = result.scalar_one_or_none()
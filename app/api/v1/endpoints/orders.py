@@ -5,7 +5,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user,get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models.enums import Roles, PurchaseOrderStatus
 from app.models.user import Users
 from app.schemas.orders import OrderSchema, OrderUpdate, OrderItemSchema
@@ -17,7 +17,7 @@ router = APIRouter()
 async def generate_orders(
     request_ids: List[UUID] = Body(...),
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
         raise HTTPException(
@@ -35,7 +35,7 @@ async def read_orders(
     skip: int = 0,
     limit: int = 100,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
         raise HTTPException(
@@ -55,7 +55,7 @@ async def read_orders(
 async def read_order(
     order_id: UUID,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
         raise HTTPException(
@@ -75,7 +75,7 @@ async def receive_order_items(
     order_id: UUID,
     items: List[Dict[str, float]] = Body(..., description="List of dictionaries with 'product_id' (UUID) and 'quantity' (float)"),
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     """
     Receive items for a purchase order.
@@ -114,7 +114,7 @@ async def update_order(
     order_id: UUID,
     order_in: OrderUpdate,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
         raise HTTPException(
@@ -133,7 +133,7 @@ async def update_order(
 async def delete_order(
     order_id: UUID,
     current_user: Users = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
 
     if current_user.role not in [Roles.COMPANY, Roles.EMPLOYEE]:
@@ -1,6 +1,6 @@
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, Query
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models.enums import Roles, PaymentStatus, PaymentType
 from app.schemas.payments import PaymentCreate, PaymentSchema
 from app.services import payments_services, storage_services
@@ -21,7 +21,7 @@ async def new_payment(
     amount: float = Form(...),
     payment_period: date = Form(...),
     type: PaymentType = Form(...),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role != Roles.COMPANY:
         raise HTTPException(status_code=403, detail="Solo los responsables de la empresa pueden crear pagos")
@@ -39,7 +39,7 @@ async def new_payment(
 @router.get("/mis-pagos", response_model=List[PaymentSchema])
 async def list_of_my_payments(
         current_user: Annotated["Users", Depends(get_current_user)],
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     if current_user.role != Roles.COMPANY:
         raise HTTPException(status_code=403, detail="Solo los responsables de la empresa pueden ver sus pagos")
@@ -48,7 +48,7 @@ async def list_of_my_payments(
 @router.get("/pagos", response_model=list[PaymentSchema])
 async def list_of_payments(
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     if current_user.role != Roles.ADMIN:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta ruta")
@@ -58,7 +58,7 @@ async def list_of_payments(
 async def verify_payment(
     payment_id: UUID,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     status: PaymentStatus = Form(...)
 ):
     if current_user.role != Roles.ADMIN:
@@ -69,7 +69,7 @@ async def verify_payment(
 async def cancel_payment(
     payment_id: UUID,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     if current_user.role != Roles.COMPANY:
         raise HTTPException(status_code=403, detail="Solo los responsables de la empresa pueden cancelar sus pagos")
@@ -1,11 +1,24 @@
 from uuid import UUID
-from app.api.deps import get_current_user, get_db
-from fastapi import APIRouter, Depends, HTTPException
+from app.api.deps import get_current_user, get_db, get_read_db
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated, TYPE_CHECKING
+from typing import Annotated, List, Literal, Optional, TYPE_CHECKING
 
-from app.schemas.products import ProductsCreate, ProductsSchema, ProductsUpdate
-from app.services import product_services
+from app.core.catalog_cache import catalog_cache, stock_epoch
+from app.core.config import settings
+from app.schemas.products import (
+    ProductImportReport,
+    ProductSearchResult,
+    ProductsCreate,
+    ProductsPage,
+    ProductsReprice,
+    ProductsRepriceResult,
+    ProductsSchema,
+    ProductsUpdate,
+    SkuLookupRequest,
+    SkuLookupResult,
+)
+from app.services import product_services, tenant_services
 
 if TYPE_CHECKING:
     from app.models.user import Users
@@ -13,10 +26,18 @@ from app.models.enums import Roles
 
 router = APIRouter()
 
-@router.get("/", response_model=ProductsSchema)
+@router.get("/", response_model=ProductsPage)
 async def return_all_products(
+    request: Request,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(settings.PRODUCTS_PAGE_SIZE, ge=1, le=settings.PRODUCTS_MAX_PAGE_SIZE),
+    order_by: Literal["name", "sku"] = Query("name"),
+    supplier_id: Optional[UUID] = Query(None),
+    is_raw_material: Optional[bool] = Query(None),
+    low_stock: bool = Query(False),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Prefijo de nombre o SKU"),
 ):
     Allowed_roles = {
         Roles.COMPANY,
@@ -24,7 +45,92 @@ async def return_all_products(
     }
     if current_user.role in Allowed_roles:
         tenant_id = current_user.tenant_id
-        return await product_services.get_products(db, tenant_id)
+
+        async def build_page() -> bytes:
+            products, next_cursor = await product_services.get_products(
+                db,
+                tenant_id,
+                limit=limit,
+                cursor=cursor,
+                order_by=order_by,
+                supplier_id=supplier_id,
+                is_raw_material=is_raw_material,
+                low_stock=low_stock,
+                prefix=q,
+            )
+            return ProductsPage(items=products, next_cursor=next_cursor).model_dump_json().encode()
+
+        # Con la misma versión de catálogo (y tramo de stock) la página sale del cache, sin tocar products;
+        # el ETag es el hash del JSON, así que una página que no cambió da 304 aunque cambie el tramo
+        version = await tenant_services.get_catalog_version(db, tenant_id)
+        return await catalog_cache.respond(request, tenant_id, version, build_page, epoch=stock_epoch())
+    raise HTTPException(
+        status_code=403,
+        detail="No tienes permiso para acceder a esta ruta"
+        )
+
+# Búsqueda por nombre o SKU parcial. Va antes de "/{product_id}" para no ser tomada como un id.
+@router.get("/search", response_model=List[ProductSearchResult])
+async def search_products(
+    current_user: Annotated["Users", Depends(get_current_user)],
+    q: str = Query(..., min_length=1, max_length=100, description="Parte del nombre o del SKU"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    Allowed_roles = {
+        Roles.COMPANY,
+        Roles.EMPLOYEE
+    }
+    if current_user.role in Allowed_roles:
+        tenant_id = current_user.tenant_id
+        results = await product_services.search_products(db, tenant_id, q, limit)
+        return [
+            ProductSearchResult(**ProductsSchema.model_validate(product).model_dump(), score=score)
+            for product, score in results
+        ]
+    raise HTTPException(
+        status_code=403,
+        detail="No tienes permiso para acceder a esta ruta"
+        )
+
+# Lectura de código de barras / SKU (mostrador y recepción)
+@router.get("/by-sku/{sku}", response_model=ProductsSchema)
+async def return_product_by_sku(
+    current_user: Annotated["Users", Depends(get_current_user)],
+    sku: str,
+    db: AsyncSession = Depends(get_read_db),
+):
+    Allowed_roles = {
+        Roles.COMPANY,
+        Roles.EMPLOYEE
+    }
+    if current_user.role in Allowed_roles:
+        tenant_id = current_user.tenant_id
+        found = await product_services.lookup_skus(db, tenant_id, [sku])
+        if not found:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        return next(iter(found.values()))
+    raise HTTPException(
+        status_code=403,
+        detail="No tienes permiso para acceder a esta ruta"
+        )
+
+# Varios SKUs en un solo request (por ejemplo, una recepción escaneada completa)
+@router.post("/by-sku", response_model=SkuLookupResult)
+async def return_products_by_skus(
+    current_user: Annotated["Users", Depends(get_current_user)],
+    lookup: SkuLookupRequest,
+    db: AsyncSession = Depends(get_read_db),
+):
+    Allowed_roles = {
+        Roles.COMPANY,
+        Roles.EMPLOYEE
+    }
+    if current_user.role in Allowed_roles:
+        tenant_id = current_user.tenant_id
+        found = await product_services.lookup_skus(db, tenant_id, lookup.skus)
+        missing = [sku for sku in dict.fromkeys(s.strip() for s in lookup.skus) if sku and sku not in found]
+        return SkuLookupResult(found=found, missing=missing)
     raise HTTPException(
         status_code=403,
         detail="No tienes permiso para acceder a esta ruta"
@@ -34,7 +140,7 @@ async def return_all_products(
 async def return_product_by_id(
     current_user: Annotated["Users", Depends(get_current_user)],
     product_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     Allowed_roles = {
         Roles.COMPANY,
@@ -52,7 +158,7 @@ async def return_product_by_id(
 async def return_products_by_suppliers(
     current_user: Annotated["Users", Depends(get_current_user)],
     supplier_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -66,7 +172,7 @@ async def return_products_by_suppliers(
 async def new_product(
     current_user: Annotated["Users", Depends(get_current_user)],
     product_data:ProductsCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -76,12 +182,44 @@ async def new_product(
         detail="No tienes permiso para acceder a esta ruta"
         )
 
+# Alta/actualización masiva desde CSV (upsert por SKU)
+@router.post("/import", response_model=ProductImportReport)
+async def import_products(
+    current_user: Annotated["Users", Depends(get_current_user)],
+    file: UploadFile = File(..., description="CSV con columnas sku, name, unit, base_price, cost_price, is_raw_material, supplier"),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    if current_user.role == Roles.COMPANY:
+        if not (file.filename or "").lower().endswith(".csv"):
+            raise HTTPException(status_code=400, detail="Formato de archivo no válido. Debe ser CSV.")
+        tenant_id = current_user.tenant_id
+        return await product_services.import_products_csv(db, file.file, tenant_id)
+    raise HTTPException(
+        status_code=403,
+        detail="No tienes permiso para acceder a esta ruta"
+        )
+
+# Ajuste masivo de precios (por proveedor, materia prima o lista de ids); dry_run solo muestra el cambio
+@router.post("/reprice", response_model=ProductsRepriceResult)
+async def reprice_products(
+    current_user: Annotated["Users", Depends(get_current_user)],
+    change: ProductsReprice,
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    if current_user.role == Roles.COMPANY:
+        tenant_id = current_user.tenant_id
+        return await product_services.reprice_products(db, change, tenant_id)
+    raise HTTPException(
+        status_code=403,
+        detail="No tienes permiso para acceder a esta ruta"
+        )
+
 @router.patch("/{product_id}", response_model=ProductsUpdate)
 async def modify_product(
     current_user: Annotated["Users", Depends(get_current_user)],
     product_id: UUID,
     product_data:ProductsUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -94,7 +232,7 @@ async def modify_product(
 async def remove_product(
     current_user: Annotated["Users", Depends(get_current_user)],
     product_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -108,7 +246,7 @@ async def remove_product(
 async def remove_all_product_for_supplier(
     current_user: Annotated["Users", Depends(get_current_user)],
     supplier_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -1,5 +1,5 @@
 from uuid import UUID
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, TYPE_CHECKING, List, Optional
@@ -17,7 +17,7 @@ router = APIRouter()
 async def return_all_request(
     current_user: Annotated["Users", Depends(get_current_user)],
     status: Optional[PurchaseRequestStatus],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     allowed_roles = {
         Roles.EMPLOYEE,
@@ -35,7 +35,7 @@ async def return_all_request(
 async def return_request_by_id(
     current_user: Annotated["Users", Depends(get_current_user)],
     request_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     allowed_roles = {
         Roles.EMPLOYEE,
@@ -52,7 +52,7 @@ async def return_request_by_id(
 async def new_request(
     current_user: Annotated["Users", Depends(get_current_user)],
     request_data: RequestCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     allowed_roles = {
         Roles.EMPLOYEE,
@@ -75,7 +75,7 @@ async def modify_request(
     current_user: Annotated["Users", Depends(get_current_user)],
     request_id:UUID,
     status: PurchaseRequestStatus,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -106,7 +106,7 @@ async def modify_request(
 async def remove_request(
     current_user: Annotated["Users", Depends(get_current_user)],
     request_id:UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     allowed_roles = {
         Roles.EMPLOYEE,
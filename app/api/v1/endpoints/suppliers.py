@@ -1,11 +1,13 @@
 from uuid import UUID
-from app.api.deps import get_current_user, get_db
-from fastapi import APIRouter, Depends, HTTPException
+from app.api.deps import get_current_user, get_db, get_read_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, TYPE_CHECKING, List
 
 from app.schemas.suppliers import SuppliersCreate, SuppliersSchema, SuppliersUpdate
-from app.services import supplier_services, product_services
+from app.core.catalog_cache import catalog_cache
+from app.services import supplier_services, tenant_services
 
 if TYPE_CHECKING:
     from app.models.user import Users
@@ -13,14 +15,22 @@ from app.models.enums import Roles
 
 router = APIRouter()
 
+_suppliers_list = TypeAdapter(List[SuppliersSchema])
+
 @router.get("/", response_model=List[SuppliersSchema])
 async def return_all_suppliers(
+    request: Request,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
-        return await supplier_services.get_suppliers(db, tenant_id)
+
+        async def build_list() -> bytes:
+            return _suppliers_list.dump_json(await supplier_services.get_suppliers(db, tenant_id))
+
+        version = await tenant_services.get_catalog_version(db, tenant_id)
+        return await catalog_cache.respond(request, tenant_id, version, build_list)
     raise HTTPException(
         status_code=403,
         detail="No tienes permiso para acceder a esta ruta"
@@ -29,7 +39,7 @@ async def return_all_suppliers(
 async def return_supplier_by_id(
     current_user: Annotated["Users", Depends(get_current_user)],
     supplier_id:UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -43,7 +53,7 @@ async def return_supplier_by_id(
 async def new_supplier(
     current_user: Annotated["Users", Depends(get_current_user)],
     supplier_data:SuppliersCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -57,7 +67,7 @@ async def modify_supplier(
     current_user: Annotated["Users", Depends(get_current_user)],
     supplier_id: UUID,
     supplier_data:SuppliersCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
@@ -70,16 +80,11 @@ async def modify_supplier(
 async def remove_supplier(
     current_user: Annotated["Users", Depends(get_current_user)],
     supplier_id: UUID,
-    db: AsyncSession = Depends(get_db) 
+    db: AsyncSession = Depends(get_db, scope="function") 
 ):
     if current_user.role == Roles.COMPANY:
         tenant_id = current_user.tenant_id
-        products = await product_services.get_products_by_supplier(db, tenant_id, supplier_id)
-        if products:
-             raise HTTPException(
-                status_code=400,
-                detail="No se puede eliminar el proveedor porque tiene productos asociados. Elimine o reasigne los productos primero."
-            )
+        # Archiva el proveedor junto con sus productos (baja lógica)
         return await supplier_services.delete_supplier(db, supplier_id, tenant_id)
     raise HTTPException(
         status_code=403,
@@ -10,7 +10,7 @@ from typing import Annotated, TYPE_CHECKING
 if TYPE_CHECKING:
     from app.models.user import Users
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.schemas.tenant import TenantCreate, TenantSchema, TenantUpdate
 from app.schemas.user import UserCreate
 from app.services import tenant_services
@@ -23,7 +23,7 @@ router = APIRouter()
 @router.get("/", response_model=List[TenantSchema])
 async def return_all_tenants(
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     if current_user.role == Roles.ADMIN:
         return await tenant_services.get_all_tenants(db)
@@ -37,7 +37,7 @@ async def return_all_tenants(
 async def get_tenant_details_by_id(
     current_user: Annotated["Users",Depends(get_current_user)],
     tenant_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await tenant_services.get_tenant(db, tenant_id)
@@ -49,7 +49,7 @@ async def get_tenant_details_by_id(
 @router.get("/mi-empresa", response_model=TenantSchema)
 async def return_my_tenant(
     current_user: Annotated["Users",Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.COMPANY:
         return await tenant_services.get_tenant(db, current_user.tenant_id)
@@ -64,7 +64,7 @@ async def new_tenant(
     current_user: Annotated["Users",Depends(get_current_user)],
     tenant_data: TenantCreate,
     company_role_data: UserCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 
 ):
     if current_user.role != Roles.ADMIN:
@@ -80,7 +80,7 @@ async def modify_tenant(
     current_user: Annotated["Users",Depends(get_current_user)],
     tenant_id: UUID,
     tenant_data: TenantUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role != Roles.ADMIN:
         raise HTTPException(
@@ -101,7 +101,7 @@ async def modify_tenant(
 async def remove_tenant(
     current_user: Annotated["Users",Depends(get_current_user)],
     tenant_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role != Roles.ADMIN:
         raise HTTPException(
@@ -115,7 +115,7 @@ async def remove_tenant(
 async def activate_tenant(
     current_user: Annotated["Users",Depends(get_current_user)],
     tenant_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role != Roles.ADMIN:
         raise HTTPException(
@@ -129,7 +129,7 @@ async def activate_tenant(
 async def deactivate_tenant(
     current_user: Annotated["Users",Depends(get_current_user)],
     tenant_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role != Roles.ADMIN:
         raise HTTPException(
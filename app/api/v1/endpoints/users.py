@@ -1,5 +1,5 @@
 from uuid import UUID
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_db_user, get_current_user, get_db
 from app.models import PlanType
 from datetime import timedelta
 from typing import Any
@@ -19,8 +19,8 @@ router = APIRouter()
 
 @router.get("/mi-usuario", response_model=UserSchema)
 async def return_my_user(
-    current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    current_user: Annotated["Users", Depends(get_current_db_user)],
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     # Fetch Tenant Name explicitly to avoid async relationship loading issues
     from app.models.tenant import Tenants
@@ -37,7 +37,7 @@ async def return_my_user(
 @router.get("/", response_model=list[UserSchema])
 async def return_all_users(
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.get_all_users(db)
@@ -52,7 +52,7 @@ async def return_all_users(
 async def return_users_in_tenant(
     current_user: Annotated["Users", Depends(get_current_user)],
     tenant_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.get_all_users_by_tenant_id(db, tenant_id)
@@ -66,7 +66,7 @@ async def return_users_in_tenant(
 async def return_user_by_id(
     user_id: UUID,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):        
     
     # Logic to fetch user
@@ -107,7 +107,7 @@ async def return_user_by_id(
 async def new_user(
     user_data: UserCreate,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.create_user(db, user_data)
@@ -131,7 +131,7 @@ async def modify_user(
     user_id: UUID,
     user_data: UserUpdate,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.update_user(db, user_id, user_data)
@@ -154,7 +154,7 @@ async def modify_user(
 async def remove_user(
     user_id: UUID,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.delete_user(db, user_id)
@@ -177,7 +177,7 @@ async def remove_user(
 async def disable_user(
     user_id: UUID,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.disable_user(db, user_id)
@@ -199,7 +199,7 @@ async def disable_user(
 async def enable_user(
     user_id: UUID,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     if current_user.role == Roles.ADMIN:
         return await user_services.enable_user(db, user_id)
@@ -227,6 +227,6 @@ async def reset_user_password(
     user_id: UUID,
     password_data: PasswordReset,
     current_user: Annotated["Users", Depends(get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     return await user_services.reset_password(db, current_user, user_id, password_data.new_password)
@@ -0,0 +1 @@
+"""Tareas de mantenimiento que se corren por fuera de la API (cron, jobs programados)."""
@@ -0,0 +1,44 @@
+"""
+Mantenimiento de las particiones mensuales de inventory_transactions.
+
+    python -m app.cli.inventory_partitions [--months-ahead N] [--retain-months N] [--drop] [--dry-run]
+
+Pensado para un cron mensual (o diario, no hace nada si ya está todo): crea las
+particiones de los próximos meses y, con retención, saca del historial los meses
+viejos al esquema `archive` (o los borra con --drop). Conviene cortar snapshots
+antes de archivar. Ver partition_services.partition_plan.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.database import get_engine, get_sessionmaker
+from app.services import partition_services
+
+
+async def main(months_ahead: int, retain_months: int, drop: bool = False, dry_run: bool = False) -> partition_services.PartitionPlan:
+    try:
+        async with get_sessionmaker()() as db:
+            existing = await partition_services.get_existing_partitions(db)
+            today = datetime.now(partition_services.ARG).date()
+            plan = partition_services.partition_plan(today, existing, months_ahead, retain_months)
+            if not dry_run:
+                await partition_services.apply_partition_plan(db, plan, drop=drop)
+                await db.commit()
+    finally:
+        await get_engine().dispose()
+    prefix = "(dry run) " if dry_run else ""
+    print(f"{prefix}Particiones creadas: {', '.join(p.name for p in plan.create) or '-'}")
+    print(f"{prefix}Particiones {'borradas' if drop else 'archivadas'}: {', '.join(plan.detach) or '-'}")
+    return plan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crea particiones futuras y archiva las viejas de inventory_transactions")
+    parser.add_argument("--months-ahead", type=int, default=settings.INVENTORY_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retain-months", type=int, default=settings.INVENTORY_RETENTION_MONTHS)
+    parser.add_argument("--drop", action="store_true", help="Borra los meses viejos en lugar de archivarlos")
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra el plan")
+    args = parser.parse_args()
+    asyncio.run(main(args.months_ahead, args.retain_months, args.drop, args.dry_run))
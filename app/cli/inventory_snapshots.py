@@ -0,0 +1,35 @@
+"""
+Corte de snapshots de saldo de inventario.
+
+    python -m app.cli.inventory_snapshots [--min-movements N] [--tenant-id UUID]
+
+Pensado para correr una vez por día (todo producto que se movió desde su último
+snapshot) y, si hace falta, más seguido con un N alto para los productos con
+mucho movimiento. Ver inventory_services.take_stock_snapshots.
+"""
+import argparse
+import asyncio
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import get_engine, get_sessionmaker
+from app.services import inventory_services
+
+
+async def main(min_movements: int, tenant_id: UUID = None) -> int:
+    try:
+        async with get_sessionmaker()() as db:
+            taken = await inventory_services.take_stock_snapshots(db, min_movements=min_movements, tenant_id=tenant_id)
+            await db.commit()
+    finally:
+        await get_engine().dispose()
+    print(f"Snapshots guardados: {taken}")
+    return taken
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Guarda el saldo actual de los productos con movimientos recientes")
+    parser.add_argument("--min-movements", type=int, default=settings.INVENTORY_SNAPSHOT_MIN_MOVEMENTS)
+    parser.add_argument("--tenant-id", type=UUID, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.min_movements, args.tenant_id))
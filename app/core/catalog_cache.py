@@ -0,0 +1,181 @@
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from cachetools import LRUCache, TTLCache
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def stock_epoch(max_age: Optional[int] = None) -> int:
+    """
+    Tramo de tiempo actual para las claves que incluyen stock. Los movimientos de
+    stock no suben la versión de catálogo (serían un UPDATE sobre la fila del
+    tenant por cada venta), así que el stock cacheado se renueva por tiempo: como
+    mucho queda `max_age` segundos viejo. Es el mismo en todos los workers.
+    """
+    max_age = settings.CATALOG_STOCK_MAX_AGE_SECONDS if max_age is None else max_age
+    return int(time.time() // max(max_age, 1))
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class CatalogCache:
+    """
+    LRU en memoria (por worker) de listados de catálogo ya serializados.
+
+    La clave incluye la versión de catálogo del tenant (tenants.catalog_version),
+    que sube con cada escritura del catálogo: una entrada nunca queda vieja,
+    simplemente deja de pedirse y el LRU la desaloja. Los listados que muestran
+    stock suman además el tramo de stock_epoch(). El tamaño se mide en bytes de JSON.
+
+    El ETag es un hash del JSON, guardado junto a él: no depende de la clave, así
+    que una página que no cambió sigue dando 304 aunque cambie el tramo de stock.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.enabled = max_bytes > 0
+        self._entries: LRUCache = LRUCache(maxsize=max(max_bytes, 1), getsizeof=lambda entry: len(entry.body))
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: tuple) -> Optional[CachedPage]:
+        if not self.enabled:
+            return None
+        page = self._entries.get(key)
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    def set(self, key: tuple, body: bytes) -> CachedPage:
+        page = CachedPage(body, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+        # Una página más grande que todo el cache no se guarda
+        if self.enabled and len(body) <= self._entries.maxsize:
+            self._entries[key] = page
+        return page
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "size_bytes": self._entries.currsize,
+            "max_bytes": self._entries.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+        }
+
+    async def respond(
+        self,
+        request: Request,
+        tenant_id: UUID,
+        version: int,
+        build: Callable[[], Awaitable[bytes]],
+        *,
+        epoch: Optional[int] = None,
+    ) -> Response:
+        """
+        Respuesta de un listado de catálogo: el JSON cacheado para esta versión
+        (y tramo de stock, `epoch`) o `build()`, y 304 si el cliente ya tiene
+        ese mismo JSON (If-None-Match).
+        """
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        key = (tenant_id, version, epoch, request.url.path, query)
+        page = self.get(key)
+        if page is None:
+            page = self.set(key, await build())
+        headers = {"ETag": page.etag, "Cache-Control": "private, no-cache"}
+
+        if _etag_matches(request.headers.get("if-none-match"), page.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=page.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class HotSkuCache:
+    """
+    Read-through de productos por SKU para los scanners (mostrador, recepción).
+
+    Igual que CatalogCache, la versión de catálogo forma parte de la clave. La
+    versión misma se recuerda SKU_CACHE_VERSION_TTL_SECONDS por tenant, así que
+    un hit no toca la DB: en el worker que hizo el cambio se ve al confirmar
+    (forget_versions) y en los demás, como mucho ese TTL después. El stock se
+    renueva cada CATALOG_STOCK_MAX_AGE_SECONDS (el llamador pasa stock_epoch()).
+    """
+
+    def __init__(self, maxsize: int, version_ttl: int = 0, timer: Callable[[], float] = time.monotonic):
+        self.enabled = maxsize > 0
+        self._entries: LRUCache = LRUCache(maxsize=max(maxsize, 1))
+        # Versión de catálogo por tenant: un hit no paga la lectura de tenants
+        self._versions: TTLCache = TTLCache(maxsize=max(maxsize, 1), ttl=max(version_ttl, 1), timer=timer)
+        self._versions_enabled = self.enabled and version_ttl > 0
+        self.hits = 0
+        self.misses = 0
+
+    def cached_version(self, tenant_id: UUID) -> Optional[int]:
+        return self._versions.get(tenant_id) if self._versions_enabled else None
+
+    def remember_version(self, tenant_id: UUID, version: int) -> None:
+        if self._versions_enabled:
+            self._versions[tenant_id] = version
+
+    def forget_versions(self, tenant_ids: Iterable[UUID]) -> None:
+        """Después de un COMMIT que subió la versión: este worker la vuelve a leer ya."""
+        for tenant_id in tenant_ids:
+            self._versions.pop(tenant_id, None)
+
+    def get_many(self, tenant_id: UUID, version: Hashable, skus: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Devuelve (encontrados, SKUs que hay que buscar en la DB)."""
+        found, missing = {}, []
+        for sku in skus:
+            product = self._entries.get((tenant_id, version, sku)) if self.enabled else None
+            if product is None:
+                missing.append(sku)
+            else:
+                found[sku] = product
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def set_many(self, tenant_id: UUID, version: Hashable, products: Dict[str, Any]) -> None:
+        if self.enabled:
+            for sku, product in products.items():
+                self._entries[(tenant_id, version, sku)] = product
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_MAX_BYTES)
+hot_sku_cache = HotSkuCache(settings.SKU_CACHE_MAX_SIZE, version_ttl=settings.SKU_CACHE_VERSION_TTL_SECONDS)
@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str
@@ -10,6 +11,91 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "NegociApp"
 
+    # Pool de conexiones. DB_POOLER_MODE="transaction" es para PgBouncer / pooler
+    # de Supabase en modo transacción (sin cache de prepared statements);
+    # "session" o "direct" habilitan el cache de asyncpg.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOLER_MODE: Literal["transaction", "session", "direct"] = "transaction"
+    # Perfil serverless (Vercel): sin pool propio, una conexión por invocación
+    DB_USE_NULL_POOL: bool = False
+
+    # Réplica de lectura opcional para los listados (GET). Después de una
+    # escritura el cliente lee del primario durante READ_AFTER_WRITE_SECONDS.
+    READ_DATABASE_URL: Optional[str] = None
+    READ_AFTER_WRITE_SECONDS: int = 5
+
+    # Instrumentación SQL por request (header Server-Timing + logs). Se marca
+    # posible N+1 cuando la misma sentencia se repite más de N veces.
+    SQL_INSTRUMENTATION: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Listado de productos: tamaño de página
+    PRODUCTS_PAGE_SIZE: int = 50
+    PRODUCTS_MAX_PAGE_SIZE: int = 200
+
+    # Cache de listados de catálogo (productos/proveedores) por versión de
+    # catálogo del tenant, en bytes de JSON. 0 lo desactiva (el ETag/304 sigue).
+    CATALOG_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # El stock no versiona el catálogo (cada venta sería un UPDATE sobre la fila
+    # del tenant): los listados y SKUs cacheados muestran stock de hasta N segundos.
+    CATALOG_STOCK_MAX_AGE_SECONDS: int = 5
+    # Búsqueda por SKU (scanner): productos recientes en memoria. 0 lo desactiva.
+    SKU_CACHE_MAX_SIZE: int = 4096
+    # Segundos que cada worker recuerda la versión de catálogo de un tenant para
+    # la búsqueda por SKU (0 = leerla en cada consulta)
+    SKU_CACHE_VERSION_TTL_SECONDS: int = 2
+    SKU_LOOKUP_MAX_BATCH: int = 500
+
+    # Movimientos de inventario de varias líneas (POST /inventory/transactions/batch)
+    INVENTORY_BATCH_MAX_LINES: int = 500
+    # Movimientos de una línea con UPDATE condicional (sin SELECT ... FOR UPDATE previo)
+    INVENTORY_ATOMIC_MOVEMENTS: bool = True
+
+    # Historial de inventario paginado y snapshots de saldo por producto
+    INVENTORY_HISTORY_PAGE_SIZE: int = 50
+    INVENTORY_HISTORY_MAX_PAGE_SIZE: int = 200
+    # Movimientos desde el último snapshot para volver a cortar (1 = todo lo que se movió)
+    INVENTORY_SNAPSHOT_MIN_MOVEMENTS: int = 1
+    # Particiones mensuales de inventory_transactions (app.cli.inventory_partitions):
+    # meses que se crean por adelantado y meses anteriores al actual que se
+    # conservan (0 = todo). El stock a una fecha solo se calcula dentro de la retención.
+    INVENTORY_PARTITION_MONTHS_AHEAD: int = 3
+    INVENTORY_RETENTION_MONTHS: int = 0
+
+    # Pronóstico de consumo y sugerencias de compra: "sma" (promedio móvil de
+    # FORECAST_WINDOW_DAYS) o "ses" (suavizado exponencial con FORECAST_ALPHA).
+    # Se pide lo necesario para cubrir plazo de entrega + período de revisión,
+    # más stock de seguridad (FORECAST_SERVICE_Z desvíos).
+    FORECAST_METHOD: str = "ses"
+    FORECAST_WINDOW_DAYS: int = 28
+    FORECAST_ALPHA: float = 0.1
+    FORECAST_LEAD_TIME_DAYS: int = 7
+    FORECAST_REVIEW_DAYS: int = 7
+    FORECAST_SERVICE_Z: float = 1.65
+
+    # Importación masiva de productos (CSV): filas por INSERT ... ON CONFLICT y
+    # tope de errores que se detallan en la respuesta
+    PRODUCT_IMPORT_BATCH_SIZE: int = 2000
+    PRODUCT_IMPORT_MAX_ERRORS: int = 500
+
+    # Cache de usuarios autenticados (get_current_user). TTL en 0 lo desactiva.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+
+    # Hilos dedicados a bcrypt (hash/verify fuera del event loop)
+    PASSWORD_HASH_MAX_WORKERS: int = 2
+    # Costo de bcrypt (calibrar con calibrate_bcrypt.py). Los hashes con otro
+    # costo se regeneran en el próximo login.
+    BCRYPT_ROUNDS: int = 12
+
+    # Autorización sin DB: confía en tenant_id/role/versión firmados en el JWT
+    STATELESS_AUTH: bool = False
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 30
+
     class Config:
         env_file = ".env"
         extra = "ignore"
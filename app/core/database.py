@@ -1,27 +1,162 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import time
+from typing import AsyncGenerator, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.core.config import settings
-DATABASE_URL = settings.DATABASE_URL
-if DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
-    connect_args={"statement_cache_size": 0}
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_ = AsyncSession,
-    expire_on_commit=False,
-)
-async def get_db()->AsyncSession:
-    async with AsyncSessionLocal() as session:
+from app.core import sql_stats
+
+def async_database_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+DATABASE_URL = async_database_url(settings.DATABASE_URL)
+READ_DATABASE_URL = async_database_url(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else None
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """QueuePool que además mide cuánto espera cada checkout por una conexión."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def engine_options(url: str) -> dict:
+    options = {"echo": False, "future": True}
+    if not url.startswith("postgresql"):
+        return options
+    connect_args = {}
+    if settings.DB_POOLER_MODE == "transaction":
+        # PgBouncer en modo transacción no soporta prepared statements cacheados
+        connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    if settings.DB_USE_NULL_POOL:
+        # Funciones serverless: cada invocación abre y cierra su conexión y el
+        # pooling queda a cargo del pooler externo (PgBouncer / Supavisor)
+        options.update(poolclass=NullPool, connect_args=connect_args)
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    return options
+
+
+def instrument_engine(db_engine: AsyncEngine) -> AsyncEngine:
+    """Cuenta sentencias y tiempo de DB de la request en curso (ver app.core.sql_stats)."""
+    if settings.SQL_INSTRUMENTATION:
+        event.listen(db_engine.sync_engine, "before_cursor_execute", sql_stats.before_cursor_execute)
+        event.listen(db_engine.sync_engine, "after_cursor_execute", sql_stats.after_cursor_execute)
+        event.listen(db_engine.sync_engine, "handle_error", sql_stats.handle_error)
+    return db_engine
+
+
+# Los engines se crean recién en el primer uso: importar la app (cold start de
+# una función serverless) no construye pools ni carga el driver de la base.
+_engine: Optional[AsyncEngine] = None
+_read_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+_read_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = instrument_engine(create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
+    return _engine
+
+
+def get_read_engine() -> AsyncEngine:
+    global _read_engine
+    # Sin réplica configurada las lecturas van al mismo engine
+    if READ_DATABASE_URL is None:
+        return get_engine()
+    if _read_engine is None:
+        _read_engine = instrument_engine(create_async_engine(READ_DATABASE_URL, **engine_options(READ_DATABASE_URL)))
+    return _read_engine
+
+
+def get_sessionmaker() -> async_sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(bind=get_engine(), class_=AsyncSession, expire_on_commit=False)
+    return _sessionmaker
+
+
+def get_read_sessionmaker() -> async_sessionmaker:
+    global _read_sessionmaker
+    if _read_sessionmaker is None:
+        _read_sessionmaker = async_sessionmaker(bind=get_read_engine(), class_=AsyncSession, expire_on_commit=False)
+    return _read_sessionmaker
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "read_engine": get_read_engine,
+    "AsyncSessionLocal": get_sessionmaker,
+    "ReadSessionLocal": get_read_sessionmaker,
+}
+
+
+def __getattr__(name: str):
+    # Compatibilidad con "from app.core.database import engine / AsyncSessionLocal"
+    # en scripts: el objeto se crea al pedirlo, no al importar el módulo
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def pool_status(db_engine: Optional[AsyncEngine] = None) -> dict:
+    pool = (db_engine or get_engine()).pool
+    status = {"pool_class": type(pool).__name__, "pooler_mode": settings.DB_POOLER_MODE}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedAsyncPool):
+        status.update(
+            checkouts=pool.checkouts,
+            avg_wait_ms=round(pool.total_wait_seconds / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            max_wait_ms=round(pool.max_wait_seconds * 1000, 3),
+        )
+    return status
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Unit of work por request: los servicios solo hacen flush y acá se hace un
+    único commit al final, o rollback si algo falló. Se declara con
+    Depends(get_db, scope="function") para que el commit ocurra antes de enviar
+    la respuesta (si falla, el cliente recibe el error).
+    """
+    async with get_sessionmaker()() as session:
         try:
             yield session
+            await session.commit()
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import Any, Callable, List, Sequence
+
+from fastapi import HTTPException
+
+
+def encode_cursor(kind: str, values: List[Any]) -> str:
+    """
+    Cursor opaco para paginación keyset: los valores de la última fila de la
+    página (en el orden de la clave) serializados en JSON y base64 url-safe.
+    """
+    payload = json.dumps({"k": kind, "v": [str(value) for value in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, types: Sequence[Callable[[str], Any]]) -> List[Any]:
+    """Valores de un cursor de encode_cursor, convertidos con `types` (uno por columna)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != kind or len(payload["v"]) != len(types):
+            raise ValueError(kind)
+        return [convert(value) for convert, value in zip(types, payload["v"])]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
@@ -0,0 +1,118 @@
+import time
+from typing import Callable, Dict, Optional, Set
+from uuid import UUID
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.token_revocation import token_revocations
+from app.models.user import Users
+
+_PENDING_INVALIDATIONS = "principal_invalidations"
+
+# Columnas que se guardan del usuario. El hash de la contraseña queda afuera a
+# propósito: nadie lo lee desde current_user (change_password vuelve a buscarlo).
+_CACHED_COLUMNS = tuple(
+    column.key for column in Users.__table__.columns if column.key != "hashed_password"
+)
+
+
+class PrincipalCache:
+    """
+    Cache en memoria (por worker) de los usuarios resueltos por get_current_user.
+
+    Guarda una copia de las columnas del usuario, indexada por id, y en cada hit
+    arma una instancia nueva de Users "detached" para no compartir objetos ORM
+    entre sesiones. La invalidación es local al proceso: en despliegues con
+    varios workers el TTL acota cuánto puede tardar en verse un cambio.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, timer: Callable[[], float] = time.monotonic):
+        self.enabled = ttl > 0
+        self._entries: TTLCache = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 1), timer=timer)
+        self._by_tenant: Dict[UUID, Set[UUID]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID, tenant_id: Optional[UUID] = None) -> Optional[Users]:
+        if not self.enabled:
+            return None
+        data = self._entries.get(user_id)
+        if data is None or (tenant_id is not None and data["tenant_id"] != tenant_id):
+            self.misses += 1
+            return None
+        self.hits += 1
+        user = Users(**data)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: Users) -> None:
+        if not self.enabled:
+            return
+        data = {key: getattr(user, key) for key in _CACHED_COLUMNS}
+        self._entries[user.id] = data
+        self._by_tenant.setdefault(user.tenant_id, set()).add(user.id)
+
+    def invalidate(self, user_id: UUID) -> None:
+        data = self._entries.pop(user_id, None)
+        if data is not None:
+            self._by_tenant.get(data["tenant_id"], set()).discard(user_id)
+
+    def invalidate_tenant(self, tenant_id: UUID) -> None:
+        for user_id in self._by_tenant.pop(tenant_id, set()):
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_tenant.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_after_commit(
+    session,
+    *,
+    user_id: Optional[UUID] = None,
+    tenant_id: Optional[UUID] = None,
+    revoked_version: Optional[int] = None,
+) -> None:
+    """
+    Anota en la sesión una invalidación del cache de usuarios (de un usuario o de
+    todo un tenant) y, con `revoked_version`, la revocación de sus tokens. Se
+    aplican después del COMMIT (ver _apply_invalidations): antes, otro request
+    podría volver a cachear la fila vieja todavía confirmada, y si el COMMIT
+    falla no queda una revocación de un cambio que no ocurrió.
+    """
+    session.info.setdefault(_PENDING_INVALIDATIONS, []).append((user_id, tenant_id, revoked_version))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    for user_id, tenant_id, revoked_version in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        if tenant_id is not None:
+            principal_cache.invalidate_tenant(tenant_id)
+        if user_id is not None:
+            principal_cache.invalidate(user_id)
+            if revoked_version is not None:
+                token_revocations.revoke(user_id, revoked_version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -1,10 +1,16 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, List, Optional, Tuple, TypeVar
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+T = TypeVar("T")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +18,108 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+def measure_bcrypt_ms(rounds: int, samples: int = 3) -> float:
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = 10,
+    max_rounds: int = 16,
+    samples: int = 3,
+) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    Mide el hash en este hardware y devuelve el costo más alto que entra en el
+    presupuesto de latencia (nunca menos que min_rounds), junto con las mediciones.
+    """
+    chosen = min_rounds
+    timings = []
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure_bcrypt_ms(rounds, samples)
+        timings.append((rounds, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+class PasswordHashPool:
+    """
+    Pool acotado de hilos para bcrypt. Un hash tarda cientos de ms y bloquearía
+    el event loop (y con él los requests de todos los tenants); bcrypt libera el
+    GIL, así que en hilos no frena al resto de la app.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(max_workers, 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+
+    def _job(self, fn: Callable[..., T], args: tuple, enqueued_at: float) -> T:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.total_wait_seconds += time.perf_counter() - enqueued_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._job, fn, args, time.perf_counter())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            }
+
+
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_MAX_WORKERS)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_hash, password)
+
+def issue_access_token(user) -> str:
+    """Token de acceso de `user` con los claims que lee get_current_user (incluida su token_version)."""
+    return create_access_token(
+        data={
+            "sub": str(user.id),
+            "role": user.role,
+            "tenant_id": str(user.tenant_id),
+            "ver": user.token_version,
+        },
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     
@@ -26,4 +134,4 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         to_encode["role"] = role_obj.value if hasattr(role_obj, "value") else str(role_obj)
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
@@ -0,0 +1,79 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+# Placeholders de los distintos drivers ($1 asyncpg, ? sqlite, %(name)s psycopg)
+_PLACEHOLDER = re.compile(r"\$\d+|\?|%\(\w+\)s")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normaliza una sentencia para agrupar las que solo difieren en parámetros o largo de IN (...)."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestSQLStats:
+    """Sentencias y tiempo de DB acumulados durante una request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Formas de sentencia que se repitieron más de `threshold` veces (posible N+1)."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_current: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+@contextmanager
+def track_request() -> Iterator[RequestSQLStats]:
+    """Activa la medición para todo lo que se ejecute dentro (incluidas las tareas hijas)."""
+    stats = RequestSQLStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[RequestSQLStats]:
+    return _current.get()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("sql_stats_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("sql_stats_start")
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def handle_error(exception_context):
+    """
+    Una sentencia que falla no llega a after_cursor_execute: se saca su inicio
+    de la pila (si no, la conexión, que vuelve al pool, acumula entradas y las
+    mediciones siguientes quedan corridas). Cuenta igual, con el tiempo que tardó.
+    """
+    conn = exception_context.connection
+    stats = _current.get()
+    starts = conn.info.get("sql_stats_start") if conn is not None else None
+    if stats is not None and starts and exception_context.statement is not None:
+        stats.record(exception_context.statement, time.perf_counter() - starts.pop())
@@ -1,6 +1,16 @@
-from supabase import create_client, Client
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from app.core.config import settings
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SERVICE_ROLE_KEY)
+if TYPE_CHECKING:
+    from supabase import Client
+
 
+@lru_cache(maxsize=1)
+def get_supabase() -> "Client":
+    # El SDK de Supabase es lo más pesado de importar de toda la app y solo lo
+    # usa la subida de comprobantes: se importa y crea recién en el primer uso.
+    from supabase import create_client
 
+    return create_client(settings.SUPABASE_URL, settings.SERVICE_ROLE_KEY)
@@ -0,0 +1,70 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import DeletedUserToken, Users
+
+
+class TokenRevocations:
+    """
+    Versión vigente de token de los usuarios revocados recientemente (por worker).
+
+    Solo hace falta recordar las revocaciones más nuevas que la vida de un token:
+    lo anterior ya expiró. Las revocaciones hechas en este proceso se aplican al
+    instante y las de otros workers aparecen en el próximo refresh.
+    """
+
+    def __init__(self, refresh_seconds: int, timer: Callable[[], float] = time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self._timer = timer
+        # user_id -> (versión vigente, momento en que se registró)
+        self._versions: Dict[UUID, Tuple[int, float]] = {}
+        self._refreshed_at = None
+        self._refreshing = False
+
+    def revoke(self, user_id: UUID, token_version: int) -> None:
+        current, _ = self._versions.get(user_id, (0, 0.0))
+        self._versions[user_id] = (max(token_version, current), self._timer())
+
+    def is_revoked(self, user_id: UUID, token_version: int) -> bool:
+        current, _ = self._versions.get(user_id, (0, 0.0))
+        return token_version < current
+
+    def is_due(self) -> bool:
+        return self._refreshed_at is None or self._timer() - self._refreshed_at >= self.refresh_seconds
+
+    async def refresh_if_due(self, db: AsyncSession) -> None:
+        if self._refreshing or not self.is_due():
+            return
+        self._refreshing = True
+        try:
+            since = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            # Revocados (desactivación, reset) y borrados, que ya no tienen fila en users
+            result = await db.execute(
+                select(Users.id, Users.token_version).where(Users.tokens_revoked_at >= since)
+                .union_all(
+                    select(DeletedUserToken.user_id, DeletedUserToken.token_version)
+                    .where(DeletedUserToken.revoked_at >= since)
+                )
+            )
+            for user_id, version in result.all():
+                self.revoke(user_id, version)
+            # Lo revocado antes de la vida de un token ya no puede aparecer en uno válido
+            horizon = self._timer() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            self._versions = {
+                user_id: entry for user_id, entry in self._versions.items() if entry[1] >= horizon
+            }
+            self._refreshed_at = self._timer()
+        finally:
+            self._refreshing = False
+
+    def stats(self) -> dict:
+        return {"revoked_users": len(self._versions), "refresh_seconds": self.refresh_seconds}
+
+
+token_revocations = TokenRevocations(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from app.core.config import settings
 from app.api.api import api_router
+from app.middleware.read_after_write import ReadAfterWriteMiddleware
+from app.middleware.sql_timing import SQLTimingMiddleware
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -24,8 +26,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
 
+# Con réplica de lectura, quien escribe lee del primario por unos segundos
+if settings.READ_DATABASE_URL:
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+# Cantidad de queries y tiempo de DB por request (Server-Timing + logs "app.sql")
+if settings.SQL_INSTRUMENTATION:
+    app.add_middleware(SQLTimingMiddleware)
+
 # Incluimos todas las rutas bajo /api/v1
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
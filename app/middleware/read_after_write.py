@@ -0,0 +1,39 @@
+import time
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def prefers_primary(request: Request) -> bool:
+    """True si el cliente escribió hace menos de READ_AFTER_WRITE_SECONDS."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadAfterWriteMiddleware(BaseHTTPMiddleware):
+    """
+    Marca con una cookie a los clientes que acaban de escribir, para que sus
+    próximas lecturas vayan al primario y no vean una réplica atrasada. Va en
+    cookie (y no en memoria) porque la siguiente request puede caer en otro worker.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            window = settings.READ_AFTER_WRITE_SECONDS
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                str(time.time() + window),
+                max_age=window,
+                httponly=True,
+                secure=True,
+                samesite="none",  # el frontend vive en otro dominio
+            )
+        return response
@@ -0,0 +1,48 @@
+import json
+import logging
+import time
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core import sql_stats
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+
+class SQLTimingMiddleware(BaseHTTPMiddleware):
+    """
+    Mide cuántas sentencias SQL y cuánto tiempo de DB consume cada request.
+
+    Lo devuelve en el header Server-Timing (visible en la pestaña Network del
+    navegador), lo registra como una línea JSON en el logger "app.sql" y avisa
+    si una misma sentencia se repitió más de SQL_N_PLUS_ONE_THRESHOLD veces.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        with sql_stats.track_request() as stats:
+            response = await call_next(request)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = stats.seconds * 1000
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+        )
+
+        route = request.scope.get("route")
+        repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        record = {
+            "method": request.method,
+            "path": request.url.path,
+            "route": getattr(route, "path", None),
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(db_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+        logger.info(json.dumps(record))
+        for shape, count in repeated:
+            logger.warning(json.dumps({**record, "n_plus_one": {"count": count, "statement": shape[:500]}}))
+        return response
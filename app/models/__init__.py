@@ -1,13 +1,13 @@
 from app.models.base import Base
 from app.models.enums import PlanType, Roles, PaymentStatus, PaymentType, PurchaseRequestStatus, TransactionType, PurchaseOrderStatus
 from app.models.tenant import Tenants
-from app.models.user import Users
+from app.models.user import Users, DeletedUserToken
 from app.models.payments import Payments
 from app.models.notifications import Notification
 from app.models.products import Products
 from app.models.suppliers import Suppliers
 from app.models.requests import PurchaseRequest, PurchaseRequestItem
-from app.models.orders import PurchaseOrder, PurchaseOrderItem
-from app.models.inventory import InventoryTransaction
+from app.models.orders import PurchaseOrder, PurchaseOrderItem, PurchaseOrderRequest
+from app.models.inventory import InventoryTransaction, InventorySnapshot, InventoryCostLayer
 
 # Ahora Alembic puede ver todos los metadatos al importar 'app.models'
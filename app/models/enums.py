@@ -30,12 +30,15 @@ class NotificationStatus(str, enum.Enum):
 
 class NotificationType (str, enum.Enum):
     RESET_PASSWORD_REQUEST= "RESET_PASSWORD_REQUEST"
+    LOW_STOCK = "LOW_STOCK"
     
 class PurchaseRequestStatus(str, enum.Enum):
     PENDING = "PENDING"
     APPROVED = "APPROVED"
     REJECTED = "REJECTED"
     CANCELED = "CANCELED"
+    # Ya convertida en orden de compra (no se puede volver a pedir)
+    ORDERED = "ORDERED"
 
 class TransactionType(str, enum.Enum):
     IN = "IN"
@@ -1,6 +1,6 @@
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy import Enum as SQLEnum, ForeignKey, Numeric
-from sqlalchemy import Column, String, Boolean, Date,  Integer, DateTime
+from sqlalchemy import Column, String, Boolean, Date,  Integer, DateTime, Index
 from sqlalchemy.orm import relationship
 from uuid import UUID, uuid4
 from app.models.enums import TransactionType
@@ -19,8 +19,45 @@ class InventoryTransaction(Base):
     transaction_type = Column(SQLEnum(TransactionType), nullable=False)
     quantity = Column(Numeric(10,2), nullable=False)
     reference_id = Column(PG_UUID(as_uuid=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(ARG))
+    # Parte de la PK: la tabla está particionada por mes de created_at
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(ARG))
 
     # Relationships
-    product = relationship("Product")
-    tenant = relationship("Tenants")
\ No newline at end of file
+    product = relationship("Products")
+    tenant = relationship("Tenants")
+
+    __table_args__ = (
+        # Historial paginado por producto (keyset sobre created_at, id)
+        Index("ix_inventory_transactions_history", "tenant_id", "product_id", "created_at", "id"),
+        # Particiones mensuales: las crea/archiva app.cli.inventory_partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class InventorySnapshot(Base):
+    """Saldo de un producto en un momento: incluye todos los movimientos con created_at <= taken_at."""
+    __tablename__ = "inventory_snapshots"
+    product_id = Column(PG_UUID(as_uuid=True), ForeignKey("products.id"), primary_key=True)
+    taken_at = Column(DateTime(timezone=True), primary_key=True)
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
+    stock_quantity = Column(Numeric(10,2), nullable=False)
+
+
+class InventoryCostLayer(Base):
+    """
+    Capa de costo: unidades que entraron juntas a un mismo costo (una línea de
+    orden de compra recibida). La valuación FIFO y por promedio ponderado sale de acá.
+    """
+    __tablename__ = "inventory_cost_layers"
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    product_id = Column(PG_UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
+    purchase_order_item_id = Column(PG_UUID(as_uuid=True), ForeignKey("purchase_order_items.id"), nullable=True)
+    quantity = Column(Numeric(10,2), nullable=False)
+    unit_cost = Column(Numeric(10,2), nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(ARG))
+
+    __table_args__ = (
+        # Valuación: capas de cada producto del tenant de la más nueva a la más vieja
+        Index("ix_inventory_cost_layers_valuation", "tenant_id", "product_id", "received_at"),
+    )
@@ -19,6 +19,8 @@ class Notification(Base):
     type = Column(SQLEnum(NotificationType), default=NotificationType.RESET_PASSWORD_REQUEST, nullable=False)
     status = Column(SQLEnum(NotificationStatus), default = NotificationStatus.PENDING, nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(ARG))
+    # Producto que disparó el aviso (LOW_STOCK)
+    product_id = Column(PG_UUID(as_uuid=True), ForeignKey("products.id"), nullable=True)
     # Relationship
     tenant = relationship("Tenants", back_populates="notifications")
     user = relationship("Users", back_populates="notifications")
@@ -38,4 +38,14 @@ class PurchaseOrderItem(Base):
 
     # Relationships
     order = relationship("PurchaseOrder", back_populates="items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Products")
+
+class PurchaseOrderRequest(Base):
+    """
+    Solicitudes de las que salió una orden generada. Una solicitud puede
+    repartirse en varias órdenes (una por proveedor): vuelve a APPROVED recién
+    cuando ninguna de ellas sigue en pie.
+    """
+    __tablename__ = "purchase_order_requests"
+    order_id = Column(PG_UUID(as_uuid=True), ForeignKey("purchase_orders.id"), primary_key=True)
+    request_id = Column(PG_UUID(as_uuid=True), ForeignKey("purchase_requests.id"), primary_key=True, index=True)
@@ -1,25 +1,50 @@
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy import ForeignKey, UniqueConstraint
-from sqlalchemy import Column, String, Boolean, Integer, Numeric
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Numeric
 from sqlalchemy.orm import relationship
 from uuid import UUID, uuid4
 
 from app.models.base import Base
 
+LOW_STOCK_PREDICATE = "archived_at IS NULL AND reorder_point IS NOT NULL AND stock_quantity <= reorder_point"
+
 class Products(Base):
     __tablename__ = "products"
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
     tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
-    sku = Column(String(64), index=True, nullable=False)
+    # Las búsquedas por SKU van por ix_products_tenant_sku (tenant_id, sku)
+    sku = Column(String(64), nullable=False)
     name = Column(String(100), nullable=False)
     unit = Column(String(10), nullable=False, default="u")
     base_price = Column(Numeric(10,2), nullable=False, default=0)
     cost_price = Column(Numeric(10,2), nullable=False, default=0)
-    stock_quantity = Column(Numeric(10,2), nullable=False)
+    stock_quantity = Column(Numeric(10,2), nullable=False, default=0)
+    # Stock mínimo: al bajar a este valor o menos se avisa (None = sin alerta)
+    reorder_point = Column(Numeric(10,2), nullable=True)
     is_raw_material = Column(Boolean, default=False)
     supplier_id = Column(PG_UUID(as_uuid=True), ForeignKey("suppliers.id"), nullable=False)
+    # Baja lógica: el producto sale de los listados pero su historial
+    # (inventory_transactions, purchase_order_items) sigue apuntando a él
+    archived_at = Column(DateTime(timezone=True), nullable=True)
     
-    __table_args__ = (UniqueConstraint("sku", "tenant_id", name="uq_product_sku_tenant"), )
+    __table_args__ = (
+        UniqueConstraint("sku", "tenant_id", name="uq_product_sku_tenant"),
+        # Paginación keyset del listado (orden por nombre o por SKU) y filtro por
+        # proveedor. Parciales: los archivados no ocupan lugar en el índice caliente.
+        Index("ix_products_tenant_name_id", "tenant_id", "name", "id",
+              postgresql_where=text("archived_at IS NULL"), sqlite_where=text("archived_at IS NULL")),
+        Index("ix_products_tenant_sku", "tenant_id", "sku",
+              postgresql_where=text("archived_at IS NULL"), sqlite_where=text("archived_at IS NULL")),
+        Index("ix_products_tenant_supplier", "tenant_id", "supplier_id",
+              postgresql_where=text("archived_at IS NULL"), sqlite_where=text("archived_at IS NULL")),
+        # GET /inventory/low-stock: solo entran los productos por debajo de su punto
+        # de pedido, así que el índice es chico y la consulta no recorre el catálogo
+        Index("ix_products_low_stock", "tenant_id", "name", "id",
+              postgresql_where=text(LOW_STOCK_PREDICATE), sqlite_where=text(LOW_STOCK_PREDICATE)),
+        # Búsqueda por texto parcial (pg_trgm): sirve para ILIKE '%texto%' y similarity()
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_products_sku_trgm", "sku", postgresql_using="gin", postgresql_ops={"sku": "gin_trgm_ops"}),
+    )
     # Relationships
     tenant = relationship("Tenants", back_populates="products")
     supplier = relationship("Suppliers", back_populates="products")
\ No newline at end of file
@@ -33,4 +33,4 @@ class PurchaseRequestItem(Base):
 
     # Relationships
     request = relationship("PurchaseRequest", back_populates="items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Products")
\ No newline at end of file
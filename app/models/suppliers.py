@@ -1,6 +1,6 @@
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy import Enum as SQLEnum, ForeignKey
-from sqlalchemy import Column, String, Boolean, Date
+from sqlalchemy import Enum as SQLEnum, ForeignKey, Index, text
+from sqlalchemy import Column, String, Boolean, Date, DateTime
 from sqlalchemy.orm import relationship
 from uuid import UUID, uuid4
 
@@ -14,7 +14,14 @@ class Suppliers(Base):
     phone = Column(String(20), nullable=True)
     email = Column(String(40), nullable=True)
     cbu = Column(String(22), nullable=True)
+    # Baja lógica (archiva también sus productos, ver supplier_services.delete_supplier)
+    archived_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        Index("ix_suppliers_tenant_active", "tenant_id",
+              postgresql_where=text("archived_at IS NULL"), sqlite_where=text("archived_at IS NULL")),
+    )
     # Relationships
-    tenant = relationship("Tenants", back_populates="suppliers", cascade="all, delete-orphan")
-    products = relationship("Products", back_populates="supplier", cascade="all, delete-orphan") 
+    tenant = relationship("Tenants", back_populates="suppliers")
+    # Sin cascade de borrado: los proveedores se archivan con un UPDATE, nunca se borran por ORM
+    products = relationship("Products", back_populates="supplier") 
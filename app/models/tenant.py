@@ -1,5 +1,5 @@
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import Column, String, Boolean, Date
+from sqlalchemy import Column, String, Boolean, Date, Integer
 from sqlalchemy.orm import relationship
 from uuid import UUID, uuid4
 
@@ -17,12 +17,15 @@ class Tenants(Base):
     contact_name = Column(String(100), nullable=False)
     phone_number = Column(String(30), nullable=True)
     contact_email = Column(String(50), nullable=True)
+    # Sube con cada escritura de productos, proveedores o stock; es la base del
+    # ETag de los listados de catálogo
+    catalog_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     users = relationship("Users", back_populates="tenant", cascade="all, delete-orphan")
     payments = relationship("Payments", back_populates="tenant", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="tenant", cascade="all, delete-orphan")
-    suppliers = relationship("Supplier", back_populates="tenant", cascade="all, delete-orphan")
-    products = relationship("Product", back_populates="tenant", cascade="all, delete-orphan")
+    suppliers = relationship("Suppliers", back_populates="tenant", cascade="all, delete-orphan")
+    products = relationship("Products", back_populates="tenant", cascade="all, delete-orphan")
     requests = relationship("PurchaseRequest", back_populates="tenant", cascade="all, delete-orphan")
  
\ No newline at end of file
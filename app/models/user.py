@@ -1,5 +1,5 @@
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import Column, String, Boolean, ForeignKey
+from sqlalchemy import Column, String, Boolean, ForeignKey, Integer, DateTime
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from uuid import uuid4
@@ -16,8 +16,22 @@ class Users(Base):
     role = Column(SQLEnum(Roles), default=Roles.EMPLOYEE, nullable=False)
     full_name = Column(String(100), nullable=False)
     is_active = Column(Boolean, default=True)
+    # Se incrementa al desactivar o resetear la contraseña: invalida los tokens emitidos
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    tokens_revoked_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
     # Relationship
     tenant = relationship("Tenants", back_populates="users")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
     requests = relationship("PurchaseRequest", back_populates="user", cascade="all, delete-orphan")
+
+
+class DeletedUserToken(Base):
+    """
+    Versión de token vigente de un usuario borrado. Sin la fila en users el
+    refresh de TokenRevocations no vería el borrado: la lee de acá.
+    """
+    __tablename__ = "deleted_user_tokens"
+    user_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    token_version = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, index=True)
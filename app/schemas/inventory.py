@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from app.models.enums import TransactionType
 
 class InventoryTransactionBase(BaseModel):
@@ -17,4 +17,49 @@ class InventoryTransactionSchema(InventoryTransactionBase):
     tenant_id: UUID
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class InventoryMovementLine(InventoryTransactionBase):
+    product_id: UUID
+
+class InventoryTransactionBatchCreate(BaseModel):
+    lines: List[InventoryMovementLine] = Field(..., min_length=1)
+    # Referencia común a todas las líneas (por ejemplo, la orden de compra)
+    reference_id: Optional[UUID] = None
+
+
+class InventoryHistoryPage(BaseModel):
+    items: List[InventoryTransactionSchema]
+    # None cuando no hay más páginas
+    next_cursor: Optional[str] = None
+
+class StockAsOf(BaseModel):
+    product_id: UUID
+    as_of: datetime
+    stock_quantity: float
+
+class ReorderSuggestion(BaseModel):
+    product_id: UUID
+    sku: str
+    name: str
+    supplier_id: UUID
+    stock_quantity: float
+    # Consumo diario pronosticado
+    daily_demand: float
+    # None cuando no hay consumo
+    days_of_cover: Optional[float] = None
+    suggested_quantity: int
+
+class ValuationLine(BaseModel):
+    product_id: UUID
+    sku: str
+    name: str
+    stock_quantity: float
+    # Valor / stock; None sin stock
+    unit_cost: Optional[float] = None
+    value: float
+
+class ValuationReport(BaseModel):
+    method: Literal["fifo", "average"]
+    total_value: float
+    items: List[ValuationLine]
@@ -21,6 +21,7 @@ class NotificationSchema(NotificationBase):
     tenant_id: UUID
     status: NotificationStatus
     created_at: datetime
+    product_id: Optional[UUID] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,7 +1,7 @@
 from datetime import date
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, ConfigDict, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, model_validator
+from typing import Dict, List, Literal, Optional
 
 from app.schemas.suppliers import SuppliersSchema
 
@@ -15,6 +15,7 @@ class ProductsCreate(ProductsBase):
     cost_price: float = Field(..., ge=0)
     is_raw_material: bool = False
     supplier_id: UUID
+    reorder_point: Optional[float] = Field(None, ge=0)
 
 class ProductsUpdate(ProductsBase):
     name: Optional[str] = None
@@ -24,6 +25,7 @@ class ProductsUpdate(ProductsBase):
     cost_price: Optional[float] = Field(None, ge=0)
     is_raw_material: Optional[bool] = None
     supplier_id: Optional[UUID] = None
+    reorder_point: Optional[float] = Field(None, ge=0)
 
 class ProductsSchema(ProductsBase):
     id: UUID
@@ -35,8 +37,84 @@ class ProductsSchema(ProductsBase):
     is_raw_material: bool
     stock_quantity: int
     supplier_id: UUID
+    reorder_point: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
     
 class ProductWithSuppliersSchema (ProductsSchema):
-    supplier: Optional[SuppliersSchema] = None
\ No newline at end of file
+    supplier: Optional[SuppliersSchema] = None
+
+class ProductsPage(BaseModel):
+    items: List[ProductsSchema]
+    # None cuando no hay más páginas
+    next_cursor: Optional[str] = None
+
+
+class ProductSearchResult(ProductsSchema):
+    # Relevancia relativa dentro de la búsqueda (mayor es mejor)
+    score: float
+
+
+class ProductImportError(BaseModel):
+    # Número de fila en el archivo (la fila 1 es el encabezado)
+    row: int
+    sku: Optional[str] = None
+    detail: str
+
+
+class ProductImportReport(BaseModel):
+    total_rows: int
+    created: int
+    updated: int
+    failed: int
+    # Se detallan hasta PRODUCT_IMPORT_MAX_ERRORS errores; `failed` los cuenta a todos
+    errors: List[ProductImportError]
+
+
+# Tope de las columnas de precio (Numeric(10,2))
+MAX_PRICE = 99_999_999.99
+
+
+class ProductsReprice(BaseModel):
+    # Qué precios se tocan y cómo: "percent" suma value% (10 = +10%, -5 = -5%,
+    # de -100 a 10000), "absolute" suma value al precio. Nunca queda un precio negativo.
+    fields: List[Literal["base_price", "cost_price"]] = Field(["base_price"], min_length=1)
+    mode: Literal["percent", "absolute"]
+    value: float = Field(..., allow_inf_nan=False, ge=-MAX_PRICE, le=MAX_PRICE)
+    # Al menos uno de los filtros es obligatorio
+    supplier_id: Optional[UUID] = None
+    is_raw_material: Optional[bool] = None
+    product_ids: Optional[List[UUID]] = Field(None, min_length=1)
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def check_percent(self) -> "ProductsReprice":
+        if self.mode == "percent" and not -100 <= self.value <= 10_000:
+            raise ValueError("En modo percent value va de -100 a 10000")
+        return self
+
+
+class ProductPriceChange(BaseModel):
+    id: UUID
+    sku: str
+    name: str
+    old_base_price: float
+    new_base_price: float
+    old_cost_price: float
+    new_cost_price: float
+
+
+class ProductsRepriceResult(BaseModel):
+    dry_run: bool
+    count: int
+    items: List[ProductPriceChange]
+
+
+class SkuLookupRequest(BaseModel):
+    skus: List[str] = Field(..., min_length=1)
+
+
+class SkuLookupResult(BaseModel):
+    found: Dict[str, ProductsSchema]
+    # SKUs pedidos que no existen (o están archivados)
+    missing: List[str]
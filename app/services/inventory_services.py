@@ -1,18 +1,205 @@
-from typing import List, Optional
-from uuid import UUID
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import case, cast, func, insert, literal, or_, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
-from app.models.inventory import InventoryTransaction
-from app.models.products import Product
+from app.models.inventory import InventorySnapshot, InventoryTransaction
+from app.models.products import Products
 from app.schemas.inventory import InventoryTransactionCreate, InventoryTransactionSchema
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.enums import TransactionType
+from app.services import notification_services
+from app.services.partition_services import retention_start
 
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 ARG = ZoneInfo("America/Argentina/Buenos_Aires")
 
+class Movement(NamedTuple):
+    product_id: UUID
+    transaction_type: TransactionType
+    quantity: Decimal
+    reference_id: Optional[UUID] = None
+
+
+def _clock(db: AsyncSession, *, per_row: bool = True):
+    """
+    Hora para created_at de los movimientos y taken_at de los snapshots. Se toma
+    siempre con los locks de los productos ya tomados: así un movimiento que
+    confirma después de un snapshot tiene created_at > taken_at y viceversa.
+    En Postgres es el reloj de la DB, el mismo para todos los workers y el cron.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return func.clock_timestamp() if per_row else func.statement_timestamp()
+    return datetime.now(ARG)
+
+
+def _stock_delta(movement: Movement) -> Decimal:
+    # ADJUSTMENT solo queda registrado en el historial, no mueve stock
+    if movement.transaction_type == TransactionType.IN:
+        return movement.quantity
+    if movement.transaction_type == TransactionType.OUT:
+        return -movement.quantity
+    return Decimal(0)
+
+
+async def _check_reorder_points(
+    db: AsyncSession,
+    tenant_id: UUID,
+    changes: List[Tuple[UUID, Decimal, Decimal, Optional[Decimal]]],
+) -> None:
+    """
+    Avisos de stock bajo a partir de (producto, stock anterior, stock nuevo, punto de pedido):
+    solo cuenta el cruce, así que un producto que sigue bajo no genera un aviso por movimiento.
+    """
+    dropped = [pid for pid, old, new, point in changes if point is not None and old > point >= new]
+    restocked = [pid for pid, old, new, point in changes if point is not None and old <= point < new]
+    if dropped:
+        await notification_services.notify_low_stock(db, tenant_id, dropped)
+    if restocked:
+        await notification_services.resolve_low_stock(db, tenant_id, restocked)
+
+
+async def _apply_movements(db: AsyncSession, tenant_id: UUID, movements: List[Movement]) -> List[InventoryTransaction]:
+    """
+    Aplica varios movimientos de stock en la transacción en curso, todo o nada.
+
+    1. Bloquea todos los productos afectados con un solo SELECT ... FOR UPDATE
+       ordenado por id: dos batches concurrentes toman los locks en el mismo
+       orden y no pueden trabarse entre sí.
+    2. Recorre los movimientos en orden; un OUT que deja el stock negativo
+       corta todo con 400.
+    3. Escribe el stock final de cada producto (UPDATE por PK en lote) e
+       inserta todas las filas del historial con un único INSERT, con
+       created_at tomado ya con los locks (ver _clock).
+    """
+    product_ids = sorted({movement.product_id for movement in movements})
+    result = await db.execute(
+        select(Products.id, Products.stock_quantity, Products.name, Products.reorder_point)
+        .where(Products.id.in_(product_ids), Products.tenant_id == tenant_id)
+        .order_by(Products.id)
+        .with_for_update()
+    )
+    rows = result.all()
+    stock: Dict[UUID, Decimal] = {row.id: Decimal(row.stock_quantity) for row in rows}
+    names = {row.id: row.name for row in rows}
+    initial = dict(stock)
+    missing = [str(product_id) for product_id in product_ids if product_id not in stock]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Producto no encontrado: {', '.join(missing)}")
+
+    for movement in movements:
+        new_stock = stock[movement.product_id] + _stock_delta(movement)
+        if new_stock < 0:
+            raise HTTPException(status_code=400, detail=f"Stock insuficiente: {names[movement.product_id]}")
+        stock[movement.product_id] = new_stock
+
+    await db.execute(
+        update(Products),
+        [{"id": product_id, "stock_quantity": quantity} for product_id, quantity in stock.items()],
+    )
+    inserted = await db.scalars(
+        insert(InventoryTransaction).values(created_at=_clock(db)).returning(InventoryTransaction),
+        [
+            {
+                "tenant_id": tenant_id,
+                "product_id": movement.product_id,
+                "transaction_type": movement.transaction_type,
+                "quantity": movement.quantity,
+                "reference_id": movement.reference_id,
+            }
+            for movement in movements
+        ],
+    )
+    transactions = list(inserted.all())
+    await _check_reorder_points(db, tenant_id, [
+        (row.id, initial[row.id], stock[row.id], row.reorder_point) for row in rows
+    ])
+    return transactions
+
+
+async def _apply_movement_atomic(db: AsyncSession, tenant_id: UUID, movement: Movement) -> InventoryTransaction:
+    """
+    Camino rápido para un movimiento de una sola línea, sin SELECT ... FOR UPDATE.
+
+    El chequeo de stock va dentro del propio UPDATE (stock_quantity + delta >= 0),
+    así que la fila del producto queda bloqueada solo desde esa sentencia hasta el
+    COMMIT, sin idas y vueltas con la app en el medio. En Postgres el UPDATE y el
+    INSERT del historial salen en una sola sentencia (CTE con RETURNING); en otros
+    motores son dos sentencias seguidas. created_at se toma después del UPDATE,
+    con la fila ya bloqueada. Si el UPDATE no toca ninguna fila se consulta el
+    producto solo para elegir entre 404 y 400.
+    """
+    products = Products.__table__
+    delta = _stock_delta(movement)
+    moved = (
+        update(products)
+        .where(
+            products.c.id == movement.product_id,
+            products.c.tenant_id == tenant_id,
+            products.c.stock_quantity + delta >= 0,
+        )
+        .values(stock_quantity=products.c.stock_quantity + delta)
+        .returning(products.c.id, products.c.stock_quantity, products.c.reorder_point)
+    )
+    ledger = {
+        "id": uuid4(),
+        "tenant_id": tenant_id,
+        "product_id": movement.product_id,
+        "transaction_type": movement.transaction_type,
+        "quantity": movement.quantity,
+        "reference_id": movement.reference_id,
+    }
+    transactions = InventoryTransaction.__table__
+
+    if db.get_bind().dialect.name == "postgresql":
+        moved = moved.cte("moved")
+        # Los parámetros van con CAST: en el SELECT del INSERT Postgres no infiere el tipo de la columna
+        values = select(
+            *(
+                moved.c.id if name == "product_id" else cast(literal(value, transactions.c[name].type), transactions.c[name].type)
+                for name, value in ledger.items()
+            ),
+            # Se evalúa por cada fila que devuelve el UPDATE, o sea con el lock ya tomado
+            _clock(db),
+        )
+        ledger_insert = (
+            insert(transactions)
+            .from_select([*ledger, "created_at"], values)
+            .returning(transactions.c.created_at)
+            .cte("ledger")
+        )
+        result = await db.execute(
+            select(moved.c.stock_quantity, moved.c.reorder_point, ledger_insert.c.created_at)
+        )
+        row = result.first()
+        if row is not None:
+            ledger["created_at"] = row.created_at
+    else:
+        row = (await db.execute(moved)).first()
+        if row is not None:
+            ledger["created_at"] = _clock(db)
+            await db.execute(insert(transactions).values(**ledger))
+    applied = row is not None
+
+    if not applied:
+        product = await db.execute(
+            select(Products.name).where(Products.id == movement.product_id, Products.tenant_id == tenant_id)
+        )
+        name = product.scalar_one_or_none()
+        if name is None:
+            raise HTTPException(status_code=404, detail=f"Producto no encontrado: {movement.product_id}")
+        raise HTTPException(status_code=400, detail=f"Stock insuficiente: {name}")
+
+    new_stock = Decimal(row.stock_quantity)
+    await _check_reorder_points(db, tenant_id, [(movement.product_id, new_stock - delta, new_stock, row.reorder_point)])
+    return InventoryTransaction(**ledger)
+
+
 async def register_transaction(
     db: AsyncSession, 
     product_id: UUID, 
@@ -21,41 +208,213 @@ async def register_transaction(
     tenant_id: UUID, 
     reference_id: Optional[UUID]
 ):
-    result = await db.execute(
-        select(Product)
-        .with_for_update()
-        .where(
-            Product.id == product_id,
-            Product.tenant_id == tenant_id
-        )
-    )
-    product = result.scalars().first()
-    if not product:
-        raise HTTPException(status_code=404,  detail="Producto no encontrado")
     if quantity <=0:
         raise HTTPException(status_code=404, detail="Se debe agregar una cantidad superior a 0")
-    if transaction_type == TransactionType.IN:
-        product.stock_quantity += quantity
-    if transaction_type == TransactionType.OUT:
-        if product.stock_quantity < quantity:
-            raise HTTPException(status_code=400, detail="Stock insuficiente")
-        product.stock_quantity -= quantity
-    new_transaction = InventoryTransaction(
-        tenant_id = tenant_id,
-        product_id = product_id,
-        transaction_type = transaction_type,
-        quantity = quantity,
-        reference_id = reference_id
-    )
-    await db.add(new_transaction)
-    await db.add(product)
-    await db.commit()
-    await db.refresh(new_transaction)
-    return new_transaction
-
-async def get_product_history(db: AsyncSession, product_id: UUID, tenant_id:UUID):
-    product_history = await db.execute(select(InventoryTransaction).where(
+    movement = Movement(product_id, transaction_type, Decimal(str(quantity)), reference_id)
+    if settings.INVENTORY_ATOMIC_MOVEMENTS:
+        return await _apply_movement_atomic(db, tenant_id, movement)
+    transactions = await _apply_movements(db, tenant_id, [movement])
+    return transactions[0]
+
+
+async def register_transactions(
+    db: AsyncSession,
+    tenant_id: UUID,
+    lines: List[Movement],
+    *,
+    enforce_max_lines: bool = True,
+) -> List[InventoryTransaction]:
+    """
+    Movimiento de varias líneas (recepción, conteo, ajuste masivo) en una sola
+    transacción. El tope de INVENTORY_BATCH_MAX_LINES es para lo que llega por la
+    API; los llamadores internos (recepción de órdenes) lo saltean.
+    """
+    if not lines:
+        raise HTTPException(status_code=400, detail="El movimiento no tiene líneas")
+    if enforce_max_lines and len(lines) > settings.INVENTORY_BATCH_MAX_LINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Un movimiento puede tener hasta {settings.INVENTORY_BATCH_MAX_LINES} líneas",
+        )
+    return await _apply_movements(db, tenant_id, lines)
+
+def _signed_quantity():
+    """Efecto de cada fila del historial sobre el stock (ADJUSTMENT no mueve stock)."""
+    return case(
+        (InventoryTransaction.transaction_type == TransactionType.IN, InventoryTransaction.quantity),
+        (InventoryTransaction.transaction_type == TransactionType.OUT, -InventoryTransaction.quantity),
+        else_=0,
+    )
+
+
+async def get_product_history(
+    db: AsyncSession,
+    product_id: UUID,
+    tenant_id: UUID,
+    *,
+    limit: int = settings.INVENTORY_HISTORY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[InventoryTransaction], Optional[str]]:
+    """
+    Una página del historial del producto, del movimiento más nuevo al más viejo,
+    y el cursor de la siguiente. Keyset sobre ix_inventory_transactions_history
+    (tenant_id, product_id, created_at, id): cada página lee solo sus filas.
+    """
+    query = select(InventoryTransaction).where(
         InventoryTransaction.product_id == product_id,
         InventoryTransaction.tenant_id == tenant_id
-    ).order_by(InventoryTransaction.created_at.desc()))
-    return product_history.scalars().all()
\ No newline at end of file
+    )
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, "history", (datetime.fromisoformat, UUID))
+        query = query.where(
+            tuple_(InventoryTransaction.created_at, InventoryTransaction.id) < (last_created_at, last_id),
+            # Redundante con la tupla, pero Postgres solo descarta particiones
+            # (meses de created_at) con una comparación directa sobre la columna
+            InventoryTransaction.created_at <= last_created_at,
+        )
+    query = query.order_by(InventoryTransaction.created_at.desc(), InventoryTransaction.id.desc())
+
+    result = await db.execute(query.limit(limit + 1))
+    transactions = list(result.scalars().all())
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor("history", [last.created_at.isoformat(), last.id])
+    return transactions, next_cursor
+
+
+async def get_low_stock_products(
+    db: AsyncSession,
+    tenant_id: UUID,
+    *,
+    limit: int = settings.PRODUCTS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Products], Optional[str]]:
+    """
+    Productos activos con stock en o por debajo de su punto de pedido, por nombre.
+    Las condiciones son las del índice parcial ix_products_low_stock, así que la
+    consulta lee solo ese índice (que contiene únicamente estos productos).
+    """
+    query = select(Products).where(
+        Products.tenant_id == tenant_id,
+        Products.archived_at.is_(None),
+        Products.reorder_point.is_not(None),
+        Products.stock_quantity <= Products.reorder_point,
+    )
+    if cursor:
+        last_name, last_id = decode_cursor(cursor, "low-stock", (str, UUID))
+        query = query.where(tuple_(Products.name, Products.id) > (last_name, last_id))
+    result = await db.execute(query.order_by(Products.name, Products.id).limit(limit + 1))
+    products = list(result.scalars().all())
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor("low-stock", [products[-1].name, products[-1].id])
+    return products, next_cursor
+
+
+async def get_stock_as_of(db: AsyncSession, product_id: UUID, tenant_id: UUID, as_of: datetime) -> Decimal:
+    """
+    Stock del producto en `as_of` sin recorrer todo el historial.
+
+    Parte del snapshot más cercano anterior y suma los movimientos entre el
+    snapshot y `as_of`. Si no hay snapshot anterior, parte del siguiente (o del
+    stock actual) y resta los movimientos posteriores a `as_of`. Con retención
+    de historial (INVENTORY_RETENTION_MONTHS) solo hay datos desde el inicio de
+    la retención: antes de eso no se puede calcular.
+    """
+    retained_since = retention_start(datetime.now(ARG).date(), settings.INVENTORY_RETENTION_MONTHS)
+    if retained_since is not None and (as_of if as_of.tzinfo else as_of.replace(tzinfo=ARG)) < retained_since:
+        raise HTTPException(status_code=400, detail="La fecha es anterior al historial conservado")
+    product = await db.execute(
+        select(Products.stock_quantity).where(Products.id == product_id, Products.tenant_id == tenant_id)
+    )
+    current = product.scalar_one_or_none()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+
+    snapshots = select(InventorySnapshot.stock_quantity, InventorySnapshot.taken_at).where(
+        InventorySnapshot.product_id == product_id, InventorySnapshot.tenant_id == tenant_id
+    )
+    deltas = select(func.coalesce(func.sum(_signed_quantity()), 0)).where(
+        InventoryTransaction.tenant_id == tenant_id, InventoryTransaction.product_id == product_id
+    )
+
+    earlier = snapshots.where(InventorySnapshot.taken_at <= as_of)
+    if retained_since is not None:
+        # Desde un snapshot anterior a la retención faltarían movimientos archivados
+        earlier = earlier.where(InventorySnapshot.taken_at >= retained_since)
+    before = (await db.execute(earlier.order_by(InventorySnapshot.taken_at.desc()).limit(1))).first()
+    if before is not None:
+        moved = await db.scalar(deltas.where(
+            InventoryTransaction.created_at > before.taken_at, InventoryTransaction.created_at <= as_of
+        ))
+        return Decimal(before.stock_quantity) + Decimal(moved)
+
+    after = (await db.execute(
+        snapshots.where(InventorySnapshot.taken_at > as_of).order_by(InventorySnapshot.taken_at).limit(1)
+    )).first()
+    query = deltas.where(InventoryTransaction.created_at > as_of)
+    if after is not None:
+        query = query.where(InventoryTransaction.created_at <= after.taken_at)
+    moved = await db.scalar(query)
+    return Decimal(after.stock_quantity if after is not None else current) - Decimal(moved)
+
+
+async def take_stock_snapshots(
+    db: AsyncSession,
+    *,
+    min_movements: int = settings.INVENTORY_SNAPSHOT_MIN_MOVEMENTS,
+    tenant_id: Optional[UUID] = None,
+) -> int:
+    """
+    Guarda el saldo actual de los productos con al menos `min_movements`
+    movimientos desde su último snapshot, con un INSERT en lote.
+    Devuelve cuántos snapshots se guardaron.
+
+    Con min_movements=1 es el corte diario (todo lo que se movió); con un N
+    mayor se puede correr seguido para cortar solo los productos más movidos.
+
+    Los productos se leen con FOR SHARE y taken_at se toma recién con esos locks:
+    un movimiento en curso termina antes de la lectura (y su created_at queda
+    antes de taken_at) y uno nuevo espera al COMMIT del snapshot (y queda
+    después). Sin eso un movimiento podía quedar afuera del saldo y también
+    fuera de lo que get_stock_as_of suma desde el snapshot.
+    """
+    last_taken_at = (
+        select(func.max(InventorySnapshot.taken_at))
+        .where(InventorySnapshot.product_id == Products.id)
+        .correlate(Products)
+        .scalar_subquery()
+    )
+    # Cuenta como mucho min_movements filas por producto, no todo el historial
+    recent = (
+        select(InventoryTransaction.id)
+        .where(
+            InventoryTransaction.tenant_id == Products.tenant_id,
+            InventoryTransaction.product_id == Products.id,
+            or_(last_taken_at.is_(None), InventoryTransaction.created_at > last_taken_at),
+        )
+        .limit(min_movements)
+        .correlate(Products)
+        .subquery()
+    )
+    moved = select(func.count()).select_from(recent).scalar_subquery()
+
+    query = select(Products.id, Products.tenant_id, Products.stock_quantity).where(moved >= min_movements)
+    if tenant_id is not None:
+        query = query.where(Products.tenant_id == tenant_id)
+    # Mismo orden de locks que _apply_movements
+    rows = (await db.execute(query.order_by(Products.id).with_for_update(read=True))).all()
+    if not rows:
+        return 0
+
+    await db.execute(
+        insert(InventorySnapshot).values(taken_at=_clock(db, per_row=False)),
+        [
+            {"product_id": row.id, "tenant_id": row.tenant_id, "stock_quantity": row.stock_quantity}
+            for row in rows
+        ],
+    )
+    return len(rows)
@@ -1,4 +1,5 @@
 from uuid import UUID
+from sqlalchemy import insert, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.notifications import Notification
@@ -6,90 +7,128 @@ from app.models.enums import NotificationStatus, NotificationType, Roles
 from app.schemas.notification import NotificationCreate
 from app.services import user_services
 from fastapi import HTTPException
-from typing import Optional
+from typing import List, Optional, Sequence
 
 async def create_reset_request(
     db: AsyncSession,
     username: str,
 ):
-    try:
-        user_exist = await user_services.get_by_username(db, username)
-        if not user_exist:
-            # We return None or raise 404. For security, maybe just return None?
-            # But the caller might want to know.
-            return None 
+    user_exist = await user_services.get_by_username(db, username)
+    if not user_exist:
+        # We return None or raise 404. For security, maybe just return None?
+        # But the caller might want to know.
+        return None 
 
-        existing = await db.execute(
-            select(Notification).where(
-                Notification.user_id == user_exist.id,
-                Notification.status == NotificationStatus.PENDING,
-                Notification.type == NotificationType.RESET_PASSWORD_REQUEST
-            )
+    existing = await db.execute(
+        select(Notification).where(
+            Notification.user_id == user_exist.id,
+            Notification.status == NotificationStatus.PENDING,
+            Notification.type == NotificationType.RESET_PASSWORD_REQUEST
         )
-        if existing.scalars().first():
-            # Already exists, just return it or ignore
-            return existing.scalars().first()
+    )
+    if existing.scalars().first():
+        # Already exists, just return it or ignore
+        return existing.scalars().first()
 
-        new_notification = Notification(
-            user_id=user_exist.id,
-            tenant_id=user_exist.tenant_id,
-            type=NotificationType.RESET_PASSWORD_REQUEST,
-            status=NotificationStatus.PENDING
-        )
-        db.add(new_notification)
-        await db.commit()
-        await db.refresh(new_notification)
-        return new_notification
-    except Exception as e:
-        await db.rollback()
-        raise e
+    new_notification = Notification(
+        user_id=user_exist.id,
+        tenant_id=user_exist.tenant_id,
+        type=NotificationType.RESET_PASSWORD_REQUEST,
+        status=NotificationStatus.PENDING
+    )
+    db.add(new_notification)
+    await db.flush()
+    await db.refresh(new_notification)
+    return new_notification
 
 async def get_notifications(
     db: AsyncSession,
     tenant_id: Optional[UUID],
     status: Optional[NotificationStatus],
-    creator_role: Optional[Roles] = None
+    creator_role: Optional[Roles] = None,
+    include_types: Sequence[NotificationType] = (),
 ):
-    try:
-        query = select(Notification)
-        if tenant_id:
-            query = query.where(Notification.tenant_id == tenant_id)
-        if status:
-            query = query.where(Notification.status == status)
-        if creator_role:
-             # Use explicit join for reliability with AsyncSession
-             from app.models.user import Users
-             query = query.join(Notification.user).where(Users.role == creator_role)
-             
-        
-        notifications = await db.execute(query)
-        results = notifications.scalars().all()
+    query = select(Notification)
+    if tenant_id:
+        query = query.where(Notification.tenant_id == tenant_id)
+    if status:
+        query = query.where(Notification.status == status)
+    if creator_role:
+         # Use explicit join for reliability with AsyncSession
+         from app.models.user import Users
+         # include_types: avisos del sistema (LOW_STOCK) dirigidos al dueño, no creados por el rol
+         query = query.join(Notification.user).where(
+             or_(Users.role == creator_role, Notification.type.in_(include_types))
+         )
+
+
+    notifications = await db.execute(query)
+    results = notifications.scalars().all()
 
-        return results
-    except Exception as e:
-        await db.rollback()
-        raise e
+    return results
 
 async def resolve_notification(
     db: AsyncSession,
     id: UUID,
     status: NotificationStatus
 ):
-    try:
-        result = await db.execute(select(Notification).where(Notification.id == id))
-        change_password_request = result.scalar_one_or_none()
+    result = await db.execute(select(Notification).where(Notification.id == id))
+    change_password_request = result.scalar_one_or_none()
+
+    if not change_password_request:
+        raise HTTPException (status_code=404, detail="Solicitud inexistente")
+    if change_password_request.status != NotificationStatus.PENDING:
+        raise HTTPException (status_code=400, detail="Solo se pueden cambiar de estado las solicitudes pendientes")
+    change_password_request.status = status
+    db.add(change_password_request)
+    await db.flush()
+    await db.refresh(change_password_request)
+    return change_password_request
+
 
-        if not change_password_request:
-            raise HTTPException (status_code=404, detail="Solicitud inexistente")
-        if change_password_request.status != NotificationStatus.PENDING:
-            raise HTTPException (status_code=400, detail="Solo se pueden cambiar de estado las solicitudes pendientes")
-        change_password_request.status = status
-        db.add(change_password_request)
-        await db.commit()
-        await db.refresh(change_password_request)
-        return change_password_request
-    except Exception as e:
-        await db.rollback()
-        raise e
+async def notify_low_stock(db: AsyncSession, tenant_id: UUID, product_ids: List[UUID]) -> None:
+    """
+    Aviso LOW_STOCK a los usuarios COMPANY del tenant por cada producto que acaba
+    de cruzar su punto de pedido. No duplica si el producto ya tiene uno pendiente.
+    """
+    from app.models.user import Users
 
-    
\ No newline at end of file
+    owners = (await db.execute(
+        select(Users.id).where(Users.tenant_id == tenant_id, Users.role == Roles.COMPANY)
+    )).scalars().all()
+    pending = set((await db.execute(
+        select(Notification.product_id).where(
+            Notification.tenant_id == tenant_id,
+            Notification.type == NotificationType.LOW_STOCK,
+            Notification.status == NotificationStatus.PENDING,
+            Notification.product_id.in_(product_ids),
+        )
+    )).scalars().all())
+    rows = [
+        {
+            "user_id": owner_id,
+            "tenant_id": tenant_id,
+            "product_id": product_id,
+            "type": NotificationType.LOW_STOCK,
+            "status": NotificationStatus.PENDING,
+        }
+        for product_id in product_ids if product_id not in pending
+        for owner_id in owners
+    ]
+    if rows:
+        await db.execute(insert(Notification), rows)
+
+
+async def resolve_low_stock(db: AsyncSession, tenant_id: UUID, product_ids: List[UUID]) -> None:
+    """Cierra los avisos LOW_STOCK pendientes de productos que volvieron a estar sobre su punto de pedido."""
+    await db.execute(
+        update(Notification)
+        .where(
+            Notification.tenant_id == tenant_id,
+            Notification.type == NotificationType.LOW_STOCK,
+            Notification.status == NotificationStatus.PENDING,
+            Notification.product_id.in_(product_ids),
+        )
+        .values(status=NotificationStatus.RESOLVED)
+        .execution_options(synchronize_session=False)
+    )
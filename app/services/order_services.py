@@ -1,173 +1,301 @@
-from typing import List, Optional, Dict
-from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Dict, Set
+from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo
+from sqlalchemy import bindparam, case, cast, delete, func, insert, literal, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
 
 from app.models.enums import PurchaseOrderStatus, PurchaseRequestStatus, TransactionType
-from app.models.orders import PurchaseOrder, PurchaseOrderItem
-from app.models.requests import PurchaseRequest, PurchaseRequestItem, Product
-from app.services.inventory_services import register_transaction
+from app.models.orders import PurchaseOrder, PurchaseOrderItem, PurchaseOrderRequest
+from app.models.requests import PurchaseRequest, PurchaseRequestItem
+from app.models.products import Products
+from app.services import valuation_services
+from app.services.inventory_services import Movement, register_transactions
 from app.schemas.orders import OrderUpdate
 
+ARG = ZoneInfo("America/Argentina/Buenos_Aires")
+
+# Órdenes que todavía no recibieron nada: se pueden borrar y, al borrarlas o
+# cancelarlas, sus solicitudes se pueden volver a pedir
+_UNRECEIVED_STATUSES = (PurchaseOrderStatus.DRAFT, PurchaseOrderStatus.SENT)
+
 async def create_orders_from_requests(
     db: AsyncSession, 
     tenant_id: UUID, 
     request_ids: List[UUID]
 ) -> List[PurchaseOrder]:
-    # 1. Traer todas las requests validas de una sola vez (Usamos joinedload para traer items y productos para evitar N+1)
-    result = await db.execute(
-        select(PurchaseRequest)
-        .options(
-            joinedload(PurchaseRequest.items)
-            .joinedload(PurchaseRequestItem.product)
+    """
+    Genera una orden DRAFT por proveedor con lo pedido en las solicitudes
+    aprobadas, sumado por producto al costo actual. Las solicitudes quedan
+    ORDERED para que no se vuelvan a pedir, vinculadas a las órdenes que
+    generaron (PurchaseOrderRequest): si esas órdenes se borran o cancelan
+    vuelven a APPROVED.
+
+    Pocas sentencias sin importar el tamaño: un UPDATE que marca las solicitudes,
+    una agregación por (proveedor, producto), un INSERT de órdenes (ids generados
+    acá), uno de ítems y un INSERT ... SELECT de los vínculos. El commit lo hace get_db.
+    """
+    request_ids = set(request_ids)
+    try:
+        # 1. Marcar las solicitudes: el UPDATE condicional también las bloquea, así
+        # que dos generaciones concurrentes no pueden consumir la misma solicitud
+        consumed = await db.execute(
+            update(PurchaseRequest)
+            .where(
+                PurchaseRequest.id.in_(request_ids),
+                PurchaseRequest.tenant_id == tenant_id,
+                PurchaseRequest.status == PurchaseRequestStatus.APPROVED,
+            )
+            .values(status=PurchaseRequestStatus.ORDERED)
+            .returning(PurchaseRequest.id)
+            .execution_options(synchronize_session=False)
         )
-        .where(
-            PurchaseRequest.id.in_(request_ids),
-            PurchaseRequest.tenant_id == tenant_id
+        rejected = request_ids - set(consumed.scalars().all())
+        if rejected:
+            await _raise_unorderable_requests(db, tenant_id, rejected)
+
+        # 2. Agrupación por proveedor y producto en la base
+        result = await db.execute(
+            select(
+                Products.supplier_id,
+                Products.id.label("product_id"),
+                Products.name,
+                Products.cost_price,
+                func.sum(PurchaseRequestItem.quantity).label("quantity"),
+            )
+            .join(Products, Products.id == PurchaseRequestItem.product_id)
+            .where(PurchaseRequestItem.request_id.in_(request_ids), Products.tenant_id == tenant_id)
+            .group_by(Products.supplier_id, Products.id, Products.name, Products.cost_price)
+            .order_by(Products.supplier_id, Products.name)
         )
-    )
-    requests = result.scalars().unique().all()
-    # 2. Validaciones
-    if len(requests) != len(request_ids):
-        found_ids = {r.id for r in requests}
-        missing_ids = set(request_ids) - found_ids
-        raise HTTPException(status_code=404, detail=f"No se encontraron las solicitudes: {missing_ids}")
-    for req in requests:
-        if req.status != PurchaseRequestStatus.APPROVED:
-            raise HTTPException(status_code=400, detail=f"La solicitud {req.id} no está aprobada (Estado: {req.status})")
-    
-    # 3. Agrupación por Proveedor (Estructura: { supplier_id: { product_id: { 'quantity': total_qty } } })
-    items_by_supplier: Dict[UUID, Dict[UUID, float]] = {}
-    for req in requests:
-        for item in req.items:
-            product = item.product
-            if not product.supplier_id:
-                raise HTTPException(status_code=400, detail=f"El producto {product.name} no tiene proveedor asignado")
-            
-            supplier_id = product.supplier_id
-            
-            if supplier_id not in items_by_supplier:
-                items_by_supplier[supplier_id] = {}
-            
-            if product.id not in items_by_supplier[supplier_id]:
-                items_by_supplier[supplier_id][product.id] = 0
-            
-            items_by_supplier[supplier_id][product.id] += float(item.quantity)
-    
-    # 4. Creación de Órdenes
-    created_orders = []
-    try:
-        for supplier_id, products_dict in items_by_supplier.items():
-            new_order = PurchaseOrder(
-                tenant_id=tenant_id,
-                supplier_id=supplier_id,
-                status=PurchaseOrderStatus.DRAFT,
-                notes=f"Generada automáticamente desde {len(request_ids)} solicitudes" 
+        lines = result.all()
+        without_supplier = next((line for line in lines if line.supplier_id is None), None)
+        if without_supplier is not None:
+            raise HTTPException(status_code=400, detail=f"El producto {without_supplier.name} no tiene proveedor asignado")
+
+        # 3. Órdenes e ítems, un INSERT cada uno
+        order_ids: Dict[UUID, UUID] = {}
+        for line in lines:
+            order_ids.setdefault(line.supplier_id, uuid4())
+        if not order_ids:
+            return []
+        created_at = datetime.now(ARG)
+        await db.execute(insert(PurchaseOrder), [
+            {
+                "id": order_id,
+                "tenant_id": tenant_id,
+                "supplier_id": supplier_id,
+                "status": PurchaseOrderStatus.DRAFT,
+                "notes": f"Generada automáticamente desde {len(request_ids)} solicitudes",
+                "created_at": created_at,
+            }
+            for supplier_id, order_id in order_ids.items()
+        ])
+        await db.execute(insert(PurchaseOrderItem), [
+            {
+                "order_id": order_ids[line.supplier_id],
+                "product_id": line.product_id,
+                "quantity": line.quantity,
+                # El costo actual como precio de compra inicial
+                "unit_price": line.cost_price or 0,
+                "received_quantity": 0,
+            }
+            for line in lines
+        ])
+        # Cada solicitud queda vinculada a las órdenes de los proveedores de sus productos
+        order_id_literals = {
+            supplier_id: literal(order_id, PurchaseOrder.id.type) for supplier_id, order_id in order_ids.items()
+        }
+        if db.get_bind().dialect.name == "postgresql":
+            # Sin CAST Postgres toma los parámetros del SELECT como text
+            order_id_literals = {
+                supplier_id: cast(value, PurchaseOrder.id.type) for supplier_id, value in order_id_literals.items()
+            }
+        order_of_supplier = case(
+            *((Products.supplier_id == supplier_id, value) for supplier_id, value in order_id_literals.items())
+        )
+        await db.execute(
+            insert(PurchaseOrderRequest).from_select(
+                ["order_id", "request_id"],
+                select(order_of_supplier, PurchaseRequestItem.request_id)
+                .join(Products, Products.id == PurchaseRequestItem.product_id)
+                .where(PurchaseRequestItem.request_id.in_(request_ids), Products.tenant_id == tenant_id)
+                .distinct(),
+            )
+        )
+
+        # 4. Las órdenes con proveedor e ítems para la respuesta
+        result = await db.execute(
+            select(PurchaseOrder)
+            .where(PurchaseOrder.id.in_(order_ids.values()))
+            .options(
+                joinedload(PurchaseOrder.items).joinedload(PurchaseOrderItem.product),
+                joinedload(PurchaseOrder.supplier),
             )
-            db.add(new_order)
-            await db.flush() # Para tener el ID de la orden
-
-            # Crear Items de Orden
-            for product_id, quantity in products_dict.items():
-                # Buscamos el producto en la sesión para sacar el precio de costo actual
-                product = await db.get(Product, product_id) 
-                
-                order_item = PurchaseOrderItem(
-                    order_id=new_order.id,
-                    product_id=product_id,
-                    quantity=quantity,
-                    unit_price=product.cost_price, # Usamos el costo actual como precio de compra inicial
-                    received_quantity=0
-                )
-                db.add(order_item)
-            
-            created_orders.append(new_order)
-
-        # 5. Commit de toda la operación
-        await db.commit()
-        for order in created_orders:
-            await db.refresh(order)
-        return created_orders
+        )
+        orders = {order.id: order for order in result.scalars().unique().all()}
+        return [orders[order_id] for order_id in order_ids.values()]
 
+    except HTTPException:
+        # El rollback (también de las solicitudes ya marcadas) lo hace get_db
+        raise
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creando órdenes: {str(e)}")
 
+
+async def _raise_unorderable_requests(db: AsyncSession, tenant_id: UUID, request_ids: Set[UUID]) -> None:
+    """Error por las solicitudes que no se pudieron consumir: inexistentes (404) o no aprobadas (400)."""
+    result = await db.execute(
+        select(PurchaseRequest.id, PurchaseRequest.status).where(
+            PurchaseRequest.id.in_(request_ids), PurchaseRequest.tenant_id == tenant_id
+        )
+    )
+    statuses = dict(result.all())
+    missing_ids = request_ids - statuses.keys()
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"No se encontraron las solicitudes: {missing_ids}")
+    request_id, status = next(iter(statuses.items()))
+    raise HTTPException(status_code=400, detail=f"La solicitud {request_id} no está aprobada (Estado: {status})")
+
+
+async def _release_requests(db: AsyncSession, order_id: UUID) -> None:
+    """
+    La orden se borra o se cancela sin haber recibido nada: sus solicitudes
+    vuelven a APPROVED, salvo las que siguen en otra orden vigente (una
+    solicitud con productos de dos proveedores generó dos órdenes).
+    """
+    other_links = PurchaseOrderRequest.__table__.alias("other_links")
+    still_ordered = (
+        select(other_links.c.request_id)
+        .join(PurchaseOrder, PurchaseOrder.id == other_links.c.order_id)
+        .where(
+            other_links.c.request_id == PurchaseRequest.id,
+            other_links.c.order_id != order_id,
+            PurchaseOrder.status != PurchaseOrderStatus.CANCELLED,
+        )
+    )
+    await db.execute(
+        update(PurchaseRequest)
+        .where(
+            PurchaseRequest.id.in_(
+                select(PurchaseOrderRequest.request_id).where(PurchaseOrderRequest.order_id == order_id)
+            ),
+            PurchaseRequest.status == PurchaseRequestStatus.ORDERED,
+            ~still_ordered.exists(),
+        )
+        .values(status=PurchaseRequestStatus.APPROVED)
+        .execution_options(synchronize_session=False)
+    )
+
+
 async def receive_order(
     db: AsyncSession,
     tenant_id: UUID,
     order_id: UUID,
     received_items: List[Dict[str, any]]
 ) -> PurchaseOrder:
-    # 1. Obtener orden con items
-    result = await db.execute(
-        select(PurchaseOrder)
-        .options(joinedload(PurchaseOrder.items))
-        .where(
-            PurchaseOrder.id == order_id,
-            PurchaseOrder.tenant_id == tenant_id
-        )
+    """
+    Recepción de una orden de compra, todo o nada en la transacción de get_db
+    (un solo commit): si una línea falla no queda nada recibido a medias.
+
+    1. Bloquea la orden (dos recepciones de la misma orden van en fila).
+    2. Mueve el stock de todas las líneas juntas: un SELECT ... FOR UPDATE
+       ordenado de los productos, un UPDATE en lote y un INSERT del historial
+       (inventory_services.register_transactions).
+    3. Suma lo recibido a los ítems y registra las capas de costo en lote.
+    4. Recalcula el estado de la orden en la base a partir de sus ítems.
+    """
+    # 1. Orden bloqueada e ítems
+    status = await db.scalar(
+        select(PurchaseOrder.status)
+        .where(PurchaseOrder.id == order_id, PurchaseOrder.tenant_id == tenant_id)
+        .with_for_update()
     )
-    order = result.scalars().unique().first()
-    if not order:
+    if status is None:
         raise HTTPException(status_code=404, detail="Orden de compra no encontrada")
-    if order.status == PurchaseOrderStatus.CANCELLED:
+    if status == PurchaseOrderStatus.CANCELLED:
         raise HTTPException(status_code=400, detail="No se puede recibir una orden cancelada")
+    result = await db.execute(
+        select(PurchaseOrderItem.id, PurchaseOrderItem.product_id, PurchaseOrderItem.unit_price)
+        .where(PurchaseOrderItem.order_id == order_id)
+    )
+    order_items_map = {item.product_id: item for item in result.all()}
+
+    # 2. Cantidades recibidas por producto (una línea repetida se suma)
+    received_by_product: Dict[UUID, Decimal] = {}
+    for received in received_items:
+        product_id = received.get('product_id')
+        quantity = Decimal(str(received.get('quantity', 0)))
+        if quantity <= 0:
+            continue
+        if product_id not in order_items_map:
+            raise HTTPException(status_code=400, detail=f"El producto {product_id} no pertenece a esta orden")
+        received_by_product[product_id] = received_by_product.get(product_id, Decimal(0)) + quantity
 
-    # 2. Procesar items recibidos
-    # Mapa rápido para buscar items por producto
-    order_items_map = {item.product_id: item for item in order.items}
     try:
-        for received in received_items:
-            product_id = received.get('product_id')
-            quantity = float(received.get('quantity', 0))
-            
-            if quantity <= 0:
-                continue
-
-            if product_id not in order_items_map:
-                raise HTTPException(status_code=400, detail=f"El producto {product_id} no pertenece a esta orden")
-            
-            item = order_items_map[product_id]
-            # Actualizar cantidad recibida en la orden
-            item.received_quantity += quantity
-            
-            # 3. IMPACTO EN INVENTARIO (CRÍTICO)
-            await register_transaction(
-                db=db,
-                product_id=product_id,
-                quantity=quantity,
-                transaction_type=TransactionType.IN,
-                tenant_id=tenant_id,
-                reference_id=order.id
+        if received_by_product:
+            # 3. IMPACTO EN INVENTARIO (CRÍTICO): todas las líneas en un solo movimiento
+            # Sin el tope de líneas de la API: una orden puede tener cualquier cantidad de ítems
+            await register_transactions(db, tenant_id, [
+                Movement(product_id, TransactionType.IN, quantity, reference_id=order_id)
+                for product_id, quantity in received_by_product.items()
+            ], enforce_max_lines=False)
+            items = PurchaseOrderItem.__table__
+            await db.execute(
+                update(items)
+                .where(items.c.id == bindparam("item_id"))
+                .values(received_quantity=items.c.received_quantity + bindparam("received")),
+                [
+                    {"item_id": order_items_map[product_id].id, "received": quantity}
+                    for product_id, quantity in received_by_product.items()
+                ],
             )
+            # Capas de costo para la valuación, al precio de la orden
+            await valuation_services.record_cost_layers(db, tenant_id, [
+                {
+                    "product_id": product_id,
+                    "purchase_order_item_id": order_items_map[product_id].id,
+                    "quantity": quantity,
+                    "unit_cost": order_items_map[product_id].unit_price,
+                }
+                for product_id, quantity in received_by_product.items()
+            ])
+
+        # 4. Estado de la orden: RECEIVED si no falta nada, PARTIALLY_RECEIVED si llegó algo
+        order_lines = select(PurchaseOrderItem.id).where(PurchaseOrderItem.order_id == PurchaseOrder.id)
+        await db.execute(
+            update(PurchaseOrder)
+            .where(PurchaseOrder.id == order_id)
+            .values(status=case(
+                (~order_lines.where(PurchaseOrderItem.received_quantity < PurchaseOrderItem.quantity).exists(),
+                 literal(PurchaseOrderStatus.RECEIVED, PurchaseOrder.status.type)),
+                (order_lines.where(PurchaseOrderItem.received_quantity > 0).exists(),
+                 literal(PurchaseOrderStatus.PARTIALLY_RECEIVED, PurchaseOrder.status.type)),
+                else_=PurchaseOrder.status,
+            ))
+            .execution_options(synchronize_session=False)
+        )
 
-        # 4. Actualizar Estado de la Orden
-        all_received = True
-        any_received = False
-        
-        for item in order.items:
-            if item.received_quantity > 0:
-                any_received = True
-            if item.received_quantity < item.quantity:
-                all_received = False
-        
-        if all_received:
-            order.status = PurchaseOrderStatus.RECEIVED
-        elif any_received:
-            order.status = PurchaseOrderStatus.PARTIALLY_RECEIVED
-        
-        # Guardar cambios
-        await db.commit()
-        await db.refresh(order)
-        return order
+        # La orden ya cargada en la sesión (si la hay) quedó vieja: se recarga
+        result = await db.execute(
+            select(PurchaseOrder)
+            .where(PurchaseOrder.id == order_id)
+            .options(
+                joinedload(PurchaseOrder.items).joinedload(PurchaseOrderItem.product),
+                joinedload(PurchaseOrder.supplier),
+            )
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().unique().one()
 
+    except HTTPException:
+        # El rollback (stock, ítems y capas) lo hace get_db
+        raise
     except Exception as e:
-        await db.rollback()
-        if isinstance(e, HTTPException):
-            raise e
         raise HTTPException(status_code=500, detail=f"Error recibiendo orden: {str(e)}")
 
 async def get_orders(
@@ -214,11 +342,16 @@ async def update_order(
         raise HTTPException(status_code=404, detail="Orden no encontrada")
     
     update_data = order_update.model_dump(exclude_unset=True)
+    if order.status == PurchaseOrderStatus.CANCELLED and update_data.get("status", order.status) != order.status:
+        # Sus solicitudes ya volvieron a APPROVED y pueden estar en otra orden
+        raise HTTPException(status_code=400, detail="No se puede reabrir una orden cancelada")
+    if update_data.get("status") == PurchaseOrderStatus.CANCELLED and order.status in _UNRECEIVED_STATUSES:
+        await _release_requests(db, order.id)
     
     for key, value in update_data.items():
         setattr(order, key, value)
 
-    await db.commit()
+    await db.flush()
     await db.refresh(order)
     return order
 
@@ -231,9 +364,11 @@ async def delete_order(
      if not order:
         raise HTTPException(status_code=404, detail="Orden no encontrada")
      
-     if order.status not in [PurchaseOrderStatus.DRAFT, PurchaseOrderStatus.SENT]:
+     if order.status not in _UNRECEIVED_STATUSES:
          raise HTTPException(status_code=400, detail="Solo se pueden eliminar órdenes en borrador o enviadas")
      
-     await db.delete(order)
-     await db.commit()
+     await _release_requests(db, order.id)
+     await db.execute(delete(PurchaseOrderRequest).where(PurchaseOrderRequest.order_id == order.id))
+     await db.execute(delete(PurchaseOrderItem).where(PurchaseOrderItem.order_id == order.id))
+     await db.execute(delete(PurchaseOrder).where(PurchaseOrder.id == order.id))
      return True
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Mantenimiento de las particiones mensuales de inventory_transactions (solo Postgres).
+
+La tabla está particionada por RANGE (created_at), una partición por mes
+calendario en hora Argentina: inventory_transactions_pYYYYMM. Las consultas que
+filtran por created_at (historial con cursor, stock a una fecha, pronóstico)
+leen solo las particiones del rango.
+
+- Se crean por adelantado las particiones de los próximos meses; lo que cae
+  fuera de ellas va a inventory_transactions_default.
+- Con retención, los meses viejos se desadjuntan y pasan al esquema `archive`
+  (o se borran). Ver app.cli.inventory_partitions.
+"""
+import re
+from datetime import date, datetime
+from typing import Iterable, List, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ARG = ZoneInfo("America/Argentina/Buenos_Aires")
+
+PARENT_TABLE = "inventory_transactions"
+ARCHIVE_SCHEMA = "archive"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+class PartitionPlan(NamedTuple):
+    create: List[Partition]
+    detach: List[str]
+
+
+def add_months(month: date, months: int) -> date:
+    """Primer día del mes que queda `months` meses después (o antes) de `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def monthly_partition(month: date) -> Partition:
+    """Partición del mes de `month`: de las 00:00 del día 1 a las 00:00 del día 1 siguiente."""
+    start = add_months(month, 0)
+    end = add_months(start, 1)
+    return Partition(
+        f"{PARENT_TABLE}_p{start:%Y%m}",
+        datetime(start.year, start.month, 1, tzinfo=ARG),
+        datetime(end.year, end.month, 1, tzinfo=ARG),
+    )
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Mes de una partición mensual por su nombre; None para la default u otras tablas."""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def retention_start(today: date, retain_months: int) -> Optional[datetime]:
+    """
+    Desde cuándo se conserva el historial: el mes actual más los `retain_months`
+    anteriores. None si se conserva todo (retain_months = 0).
+    """
+    if retain_months <= 0:
+        return None
+    return monthly_partition(add_months(today, -retain_months)).start
+
+
+def partition_plan(today: date, existing: Iterable[str], months_ahead: int, retain_months: int) -> PartitionPlan:
+    """
+    Qué hay que hacer hoy: crear las particiones que faltan desde el mes actual
+    hasta `months_ahead` meses adelante y desadjuntar las mensuales anteriores a
+    la retención, de la más vieja a la más nueva.
+    """
+    existing = set(existing)
+    create = [
+        partition
+        for partition in (monthly_partition(add_months(today, offset)) for offset in range(months_ahead + 1))
+        if partition.name not in existing
+    ]
+    detach = []
+    cutoff = retention_start(today, retain_months)
+    if cutoff is not None:
+        months = {name: partition_month(name) for name in existing}
+        detach = sorted(
+            (name for name, month in months.items() if month is not None and month < cutoff.date()),
+            key=months.get,
+        )
+    return PartitionPlan(create, detach)
+
+
+async def get_existing_partitions(db: AsyncSession) -> List[str]:
+    """Nombres de las particiones adjuntas a inventory_transactions."""
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return list(result.scalars().all())
+
+
+async def apply_partition_plan(db: AsyncSession, plan: PartitionPlan, *, drop: bool = False) -> None:
+    """
+    Ejecuta el plan en la transacción en curso. Los nombres salen de
+    monthly_partition / partition_month, así que se pueden interpolar.
+
+    Crear una partición falla si inventory_transactions_default ya tiene filas de
+    ese mes (el mantenimiento no corrió a tiempo): hay que moverlas a mano antes.
+    DETACH toma un lock exclusivo breve sobre la tabla padre; conviene correrlo
+    fuera del horario de carga.
+    """
+    for partition in plan.create:
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {PARENT_TABLE}"
+            f" FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+        ))
+    if plan.detach and not drop:
+        await db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+    for name in plan.detach:
+        await db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            await db.execute(text(f"DROP TABLE {name}"))
+        else:
+            await db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
@@ -1,56 +1,229 @@
-from typing import List, Optional
+import csv
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Literal, Optional, Tuple
 from uuid import UUID
+from pydantic import ValidationError
+from sqlalchemy import Numeric, case, cast, func, literal, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
-from app.models.products import Product
-from app.schemas.products import ProductsCreate,  ProductsUpdate
+from app.core.catalog_cache import hot_sku_cache, stock_epoch
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.schemas.products import (
+    MAX_PRICE,
+    ProductImportError,
+    ProductImportReport,
+    ProductPriceChange,
+    ProductsCreate,
+    ProductsReprice,
+    ProductsRepriceResult,
+    ProductsSchema,
+    ProductsUpdate,
+)
 from app.services.supplier_services import get_supplier_by_id
+from app.services.tenant_services import bump_catalog_version, get_catalog_version
 
-async def create_product(db:AsyncSession, product_data:ProductsCreate, tenant_id:UUID)->Product:
+async def create_product(db:AsyncSession, product_data:ProductsCreate, tenant_id:UUID)->Products:
+    """
+    Alta de un producto. Si el SKU es de un producto archivado, se reactiva esa
+    misma fila con los datos nuevos (como en la importación CSV): uq_product_sku_tenant
+    sigue incluyendo a los archivados y el historial queda atado al SKU. Un SKU
+    activo da 409.
+    """
+    result = await db.execute(
+        select(Products)
+        .where(Products.tenant_id == tenant_id, Products.sku == product_data.sku)
+        .with_for_update()
+        # delete_product archiva sin sincronizar la sesión
+        .execution_options(populate_existing=True)
+    )
+    product = result.scalar_one_or_none()
+    if product is not None and product.archived_at is None:
+        raise HTTPException(status_code=409, detail=f"Ya existe un producto con el SKU {product_data.sku}")
     try:
-        new_product = Product(**product_data.model_dump())
-        new_product.tenant_id = tenant_id
-        await db.add(new_product)
-        await db.commit()
-        await db.refresh(new_product)
-        return new_product
+        if product is None:
+            product = Products(**product_data.model_dump(), tenant_id=tenant_id)
+            db.add(product)
+        else:
+            # El stock no se toca: solo cambia con movimientos de inventario
+            for column, value in product_data.model_dump().items():
+                setattr(product, column, value)
+            product.archived_at = None
+        await db.flush()
+    except IntegrityError:
+        # Otro alta con el mismo SKU confirmó primero
+        raise HTTPException(status_code=409, detail=f"Ya existe un producto con el SKU {product_data.sku}")
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    await bump_catalog_version(db, tenant_id)
+    await db.refresh(product)
+    return product
+
+async def get_products(
+    db: AsyncSession,
+    tenant_id: UUID,
+    *,
+    limit: int = settings.PRODUCTS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    order_by: Literal["name", "sku"] = "name",
+    supplier_id: Optional[UUID] = None,
+    is_raw_material: Optional[bool] = None,
+    low_stock: bool = False,
+    prefix: Optional[str] = None,
+) -> Tuple[List[Products], Optional[str]]:
+    """
+    Una página de productos del tenant y el cursor de la siguiente.
+
+    Paginación keyset sobre (tenant_id, name, id) o (tenant_id, sku): la página
+    N cuesta lo mismo que la primera porque se sigue el índice desde la última
+    fila vista en lugar de saltear filas con OFFSET.
+    """
+    query = select(Products).where(Products.tenant_id == tenant_id, Products.archived_at.is_(None))
+    if supplier_id is not None:
+        query = query.where(Products.supplier_id == supplier_id)
+    if is_raw_material is not None:
+        query = query.where(Products.is_raw_material == is_raw_material)
+    if low_stock:
+        # Misma definición que ix_products_low_stock y GET /inventory/low-stock
+        query = query.where(Products.reorder_point.is_not(None), Products.stock_quantity <= Products.reorder_point)
+    if prefix:
+        query = query.where(or_(
+            Products.name.istartswith(prefix, autoescape=True),
+            Products.sku.istartswith(prefix, autoescape=True),
+        ))
+
+    if order_by == "sku":
+        if cursor:
+            (last_sku,) = decode_cursor(cursor, "sku", (str,))
+            query = query.where(Products.sku > last_sku)
+        query = query.order_by(Products.sku)
+    else:
+        if cursor:
+            last_name, last_id = decode_cursor(cursor, "name", (str, UUID))
+            query = query.where(tuple_(Products.name, Products.id) > (last_name, last_id))
+        query = query.order_by(Products.name, Products.id)
 
-async def get_products(db:AsyncSession, tenant_id: UUID) ->List[Product]:
     try:
-        result = await db.execute(select(Product).where(Product.tenant_id == tenant_id))
-        return result.scalars().all()
+        # Se pide una fila de más para saber si hay otra página sin contar
+        result = await db.execute(query.limit(limit + 1))
+        products = list(result.scalars().all())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        next_cursor = (
+            encode_cursor("sku", [last.sku]) if order_by == "sku"
+            else encode_cursor("name", [last.name, last.id])
+        )
+    return products, next_cursor
+
+async def search_products(db: AsyncSession, tenant_id: UUID, text: str, limit: int = 20) -> List[Tuple[Products, float]]:
+    """
+    Productos del tenant cuyo nombre o SKU contienen `text`, ordenados por relevancia.
+
+    Primero el SKU exacto, después los que empiezan con el texto y después el
+    resto. En Postgres se desempata por similitud de trigramas (pg_trgm), que
+    además deja pasar errores de tipeo ("yrba" -> "Yerba"); en SQLite (tests)
+    se desempata por largo del nombre.
+    """
+    text = text.strip()
+    contains = or_(
+        Products.name.icontains(text, autoescape=True),
+        Products.sku.icontains(text, autoescape=True),
+    )
+    prefix_rank = case(
+        (func.lower(Products.sku) == text.lower(), 2),
+        (or_(
+            Products.name.istartswith(text, autoescape=True),
+            Products.sku.istartswith(text, autoescape=True),
+        ), 1),
+        else_=0,
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        similarity = func.greatest(func.similarity(Products.name, text), func.similarity(Products.sku, text))
+        match = or_(contains, Products.name.op("%")(text))
+        score = prefix_rank + similarity
+    else:
+        match = contains
+        score = prefix_rank + literal(1.0) / (func.length(Products.name) + 1)
+
+    query = (
+        select(Products, score.label("score"))
+        .where(Products.tenant_id == tenant_id, Products.archived_at.is_(None), match)
+        .order_by(score.desc(), Products.name, Products.id)
+        .limit(limit)
+    )
+    try:
+        result = await db.execute(query)
+        return [(product, float(score)) for product, score in result.all()]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def lookup_skus(db: AsyncSession, tenant_id: UUID, skus: List[str]) -> Dict[str, ProductsSchema]:
+    """
+    Productos activos del tenant por SKU exacto, vía el cache de SKUs calientes.
+
+    Lo que falta en el cache sale de una sola query sobre el índice parcial
+    (tenant_id, sku). La versión de catálogo del tenant sale del cache (o de una
+    lectura por PK cada SKU_CACHE_VERSION_TTL_SECONDS), así que un hit no toca
+    la DB; el stock se renueva cada CATALOG_STOCK_MAX_AGE_SECONDS (stock_epoch).
+    """
+    skus = list(dict.fromkeys(sku.strip() for sku in skus if sku.strip()))
+    if len(skus) > settings.SKU_LOOKUP_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"Se pueden consultar hasta {settings.SKU_LOOKUP_MAX_BATCH} SKUs por vez")
+    try:
+        catalog_version = hot_sku_cache.cached_version(tenant_id)
+        if catalog_version is None:
+            catalog_version = await get_catalog_version(db, tenant_id)
+            hot_sku_cache.remember_version(tenant_id, catalog_version)
+        version = (catalog_version, stock_epoch())
+        found, missing = hot_sku_cache.get_many(tenant_id, version, skus)
+        if missing:
+            result = await db.execute(select(Products).where(
+                Products.tenant_id == tenant_id,
+                Products.sku.in_(missing),
+                Products.archived_at.is_(None),
+            ))
+            loaded = {product.sku: ProductsSchema.model_validate(product) for product in result.scalars().all()}
+            hot_sku_cache.set_many(tenant_id, version, loaded)
+            found.update(loaded)
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    return found
 
-async def get_products_by_supplier(db:AsyncSession, tenant_id: UUID, supplier_id:UUID) ->List[Product]:
+async def get_products_by_supplier(db:AsyncSession, tenant_id: UUID, supplier_id:UUID) ->List[Products]:
     try:
-        result = await db.execute(select(Product).where(
-            Product.tenant_id == tenant_id,
-            Product.supplier_id == supplier_id
+        result = await db.execute(select(Products).where(
+            Products.tenant_id == tenant_id,
+            Products.supplier_id == supplier_id,
+            Products.archived_at.is_(None)
             ))
         return result.scalars().all()
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def get_product_by_id(db:AsyncSession, product_id: UUID, tenant_id:UUID)->Product:
+async def get_product_by_id(db:AsyncSession, product_id: UUID, tenant_id:UUID)->Products:
     try:
-        result = await db.execute(select(Product).where(
-            Product.id == product_id,
-            Product.tenant_id == tenant_id
+        result = await db.execute(select(Products).where(
+            Products.id == product_id,
+            Products.tenant_id == tenant_id,
+            Products.archived_at.is_(None)
             ))
         return result.scalars().first()
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def update_product(db:AsyncSession, product_data:ProductsUpdate, product_id:UUID, tenant_id: UUID) -> Optional[Product]:
+async def update_product(db:AsyncSession, product_data:ProductsUpdate, product_id:UUID, tenant_id: UUID) -> Optional[Products]:
     try:
         product_to_update = await get_product_by_id(db, product_id, tenant_id)
         if not product_to_update:
@@ -59,39 +232,286 @@ async def update_product(db:AsyncSession, product_data:ProductsUpdate, product_i
         for field, value in update_data.items():
             setattr(product_to_update, field, value)
 
-        await db.add(product_to_update)
-        await db.commit()
+        db.add(product_to_update)
+        await db.flush()
+        await bump_catalog_version(db, tenant_id)
         await db.refresh(product_to_update)
         return product_to_update
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def delete_product(db:AsyncSession, product_id:UUID, tenant_id:UUID)-> None:
+async def delete_product(db:AsyncSession, product_id:UUID, tenant_id:UUID)-> dict:
+    # Baja lógica: el historial de movimientos y pedidos sigue apuntando al producto
     try:
-        product_to_delete = await get_product_by_id(db, product_id, tenant_id)
-        if not product_to_delete:
-            raise HTTPException(status_code=404, detail="Producto no encontrado")
-        
-        await db.delete(product_to_delete)
-        await db.commit()
-        return {"message": "Producto eliminado correctamente"}
+        result = await db.execute(
+            update(Products)
+            .where(
+                Products.id == product_id,
+                Products.tenant_id == tenant_id,
+                Products.archived_at.is_(None),
+            )
+            .values(archived_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    await bump_catalog_version(db, tenant_id)
+    return {"message": "Producto eliminado correctamente"}
 
-async def delete_all_products_by_supplier(db:AsyncSession, tenant_id:UUID, supplier_id:UUID) -> None:
+async def delete_all_products_by_supplier(db:AsyncSession, tenant_id:UUID, supplier_id:UUID) -> dict:
+    supplier = await get_supplier_by_id(db, supplier_id, tenant_id)
+    if not supplier:
+        raise HTTPException(status_code=404, detail="Proveedor no encontrado")
+    # Un solo UPDATE para todos los productos del proveedor, sin cargarlos en la sesión
     try:
-        supplier = await get_supplier_by_id(db, supplier_id, tenant_id)
-        if not supplier:
-            raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-        list_of_products_to_delete = await get_products_by_supplier(db, tenant_id, supplier_id)
-        if not list_of_products_to_delete:
-            raise HTTPException(status_code=404, detail="No hay productos asociados al proveedor")
-        for product in list_of_products_to_delete:
-            await db.delete(product)
-        await db.commit()
-        return {"message": "productos eliminados correctamente"}
+        result = await db.execute(
+            update(Products)
+            .where(
+                Products.tenant_id == tenant_id,
+                Products.supplier_id == supplier_id,
+                Products.archived_at.is_(None),
+            )
+            .values(archived_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
     except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="No hay productos asociados al proveedor")
+    await bump_catalog_version(db, tenant_id)
+    return {"message": "productos eliminados correctamente", "archived": result.rowcount}
+
+# Columnas que se actualizan cuando el SKU ya existe. El stock no se toca: solo
+# cambia con movimientos de inventario. Un SKU archivado que vuelve a importarse
+# se reactiva.
+_IMPORT_UPDATE_COLUMNS = ("name", "unit", "base_price", "cost_price", "is_raw_material", "supplier_id", "archived_at")
+
+
+def _upsert_statement(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    statement = insert(Products)
+    return statement.on_conflict_do_update(
+        index_elements=["sku", "tenant_id"],  # uq_product_sku_tenant
+        set_={column: statement.excluded[column] for column in _IMPORT_UPDATE_COLUMNS},
+    )
+
+
+async def _supplier_lookup(db: AsyncSession, tenant_id: UUID) -> Dict[str, UUID]:
+    """Proveedores del tenant indexados por id y por nombre (sin mayúsculas), en una sola query."""
+    result = await db.execute(
+        select(Suppliers.id, Suppliers.name).where(Suppliers.tenant_id == tenant_id, Suppliers.archived_at.is_(None))
+    )
+    lookup = {}
+    for supplier_id, name in result.all():
+        lookup[str(supplier_id)] = supplier_id
+        lookup[name.strip().lower()] = supplier_id
+    return lookup
+
+
+def _parse_import_row(row: Dict[str, Optional[str]], suppliers: Dict[str, UUID]) -> ProductsCreate:
+    values = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+    supplier = values.pop("supplier", None) or values.pop("supplier_id", None)
+    if supplier is None:
+        raise ValueError("Falta el proveedor (columna supplier o supplier_id)")
+    supplier_id = suppliers.get(supplier.lower())
+    if supplier_id is None:
+        raise ValueError(f"Proveedor no encontrado: {supplier}")
+    return ProductsCreate(**values, supplier_id=supplier_id)
+
+
+def _decoded_lines(file: BinaryIO) -> Iterator[str]:
+    """
+    Líneas del archivo en UTF-8 (con o sin BOM). Se decodifica de a una para
+    poder decir en qué fila está el problema: un CSV guardado desde Excel
+    suele venir en cp1252.
+    """
+    for number, line in enumerate(file, start=1):
+        try:
+            yield line.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Fila {number}: el archivo no está en UTF-8 (guardalo como \"CSV UTF-8\")",
+            )
+
+
+async def import_products_csv(db: AsyncSession, file: BinaryIO, tenant_id: UUID) -> ProductImportReport:
+    """
+    Alta/actualización masiva de productos desde un CSV.
+
+    El archivo se lee de a PRODUCT_IMPORT_BATCH_SIZE filas (nunca entero en
+    memoria); cada fila se valida con ProductsCreate y las válidas de cada
+    lote se escriben con un único INSERT ... ON CONFLICT (sku, tenant_id)
+    DO UPDATE. Columnas: sku, name, unit, base_price, cost_price,
+    is_raw_material (opcional) y supplier (nombre o id del proveedor).
+    Las filas con errores se informan y no frenan al resto; un archivo que no
+    está en UTF-8 o no es un CSV válido da 400 con la fila.
+    """
+    suppliers = await _supplier_lookup(db, tenant_id)
+    reader = csv.DictReader(_decoded_lines(file))
+    try:
+        fieldnames = reader.fieldnames
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"Fila {reader.reader.line_num}: CSV inválido ({e})")
+    missing = {"sku", "name", "unit", "base_price", "cost_price"} - set(fieldnames or [])
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Faltan columnas en el CSV: {', '.join(sorted(missing))}")
+
+    total = created = updated = failed = 0
+    errors: List[ProductImportError] = []
+    row_number = 1
+    while True:
+        try:
+            batch = list(islice(reader, settings.PRODUCT_IMPORT_BATCH_SIZE))
+        except csv.Error as e:
+            raise HTTPException(status_code=400, detail=f"Fila {reader.reader.line_num}: CSV inválido ({e})")
+        if not batch:
+            break
+        # Por SKU: si se repite dentro del lote gana la última fila y cuenta como
+        # actualización (un INSERT ... ON CONFLICT no puede tocar dos veces la misma fila)
+        valid: Dict[str, dict] = {}
+        for row in batch:
+            row_number += 1
+            total += 1
+            try:
+                product = _parse_import_row(row, suppliers)
+            except (ValidationError, ValueError) as e:
+                failed += 1
+                if len(errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+                    detail = "; ".join(
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                    ) if isinstance(e, ValidationError) else str(e)
+                    errors.append(ProductImportError(row=row_number, sku=row.get("sku"), detail=detail))
+                continue
+            if product.sku in valid:
+                updated += 1
+            valid[product.sku] = {**product.model_dump(), "tenant_id": tenant_id, "stock_quantity": 0, "archived_at": None}
+        if not valid:
+            continue
+
+        try:
+            existing = await db.execute(
+                select(func.count()).select_from(Products).where(
+                    Products.tenant_id == tenant_id,
+                    Products.sku.in_(list(valid)),
+                )
+            )
+            already = existing.scalar_one()
+            await db.execute(_upsert_statement(db), list(valid.values()))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        updated += already
+        created += len(valid) - already
+
+    if created or updated:
+        await bump_catalog_version(db, tenant_id)
+    return ProductImportReport(total_rows=total, created=created, updated=updated, failed=failed, errors=errors)
+
+
+def _repriced(column, change: ProductsReprice):
+    """Expresión SQL del nuevo precio a partir de la columna actual (sin bajar de 0)."""
+    if change.mode == "percent":
+        price = func.round(column * cast(1 + change.value / 100, Numeric(12, 6)), 2)
+    else:
+        price = column + cast(change.value, Numeric(10, 2))
+    return case((price < 0, 0), else_=price)
+
+
+def _check_max_price(highest) -> None:
+    if highest > MAX_PRICE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El ajuste deja precios por encima del máximo ({MAX_PRICE:,.2f})",
+        )
+
+
+def _reprice_filters(table, change: ProductsReprice, tenant_id: UUID) -> list:
+    filters = [table.c.tenant_id == tenant_id, table.c.archived_at.is_(None)]
+    if change.supplier_id is not None:
+        filters.append(table.c.supplier_id == change.supplier_id)
+    if change.is_raw_material is not None:
+        filters.append(table.c.is_raw_material == change.is_raw_material)
+    if change.product_ids:
+        filters.append(table.c.id.in_(change.product_ids))
+    return filters
+
+
+async def reprice_products(db: AsyncSession, change: ProductsReprice, tenant_id: UUID) -> ProductsRepriceResult:
+    """
+    Ajuste masivo de base_price / cost_price en una sola sentencia.
+
+    En Postgres es un UPDATE ... FROM products AS old ... RETURNING que devuelve
+    precio anterior y nuevo de cada fila. En dry_run (y en SQLite, cuyo
+    RETURNING no puede leer la tabla del FROM) el mismo cálculo sale de un
+    SELECT que proyecta los precios nuevos. Si algún precio nuevo pasa MAX_PRICE
+    se responde 400 sin escribir nada (en Postgres, para una suba, lo chequea un
+    MAX() previo).
+    """
+    if change.supplier_id is None and change.is_raw_material is None and not change.product_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Indicá al menos un filtro: supplier_id, is_raw_material o product_ids",
+        )
+
+    products = Products.__table__
+    old = products.alias("old")
+    filters = _reprice_filters(old, change, tenant_id)
+
+    new_prices = {
+        field: _repriced(old.c[field], change) if field in change.fields else old.c[field]
+        for field in ("base_price", "cost_price")
+    }
+    projected = select(
+        old.c.id,
+        old.c.sku,
+        old.c.name,
+        old.c.base_price.label("old_base_price"),
+        new_prices["base_price"].label("new_base_price"),
+        old.c.cost_price.label("old_cost_price"),
+        new_prices["cost_price"].label("new_cost_price"),
+    ).where(*filters).order_by(old.c.name, old.c.id)
+
+    try:
+        if db.get_bind().dialect.name == "postgresql" and not change.dry_run:
+            if change.value > 0:
+                # Solo una suba puede pasarse del tope de la columna; mejor un 400 que el error de la DB
+                highest = (await db.execute(
+                    select(*(func.max(new_prices[field]) for field in change.fields)).where(*filters)
+                )).one()
+                _check_max_price(max((price for price in highest if price is not None), default=0))
+            statement = (
+                update(products)
+                .where(products.c.id == old.c.id, *filters)
+                .values({field: new_prices[field] for field in change.fields})
+                .returning(
+                    products.c.id,
+                    products.c.sku,
+                    products.c.name,
+                    old.c.base_price.label("old_base_price"),
+                    products.c.base_price.label("new_base_price"),
+                    old.c.cost_price.label("old_cost_price"),
+                    products.c.cost_price.label("new_cost_price"),
+                )
+            )
+            rows = (await db.execute(statement)).mappings().all()
+        else:
+            rows = (await db.execute(projected)).mappings().all()
+            _check_max_price(max((max(row["new_base_price"], row["new_cost_price"]) for row in rows), default=0))
+            if not change.dry_run and rows:
+                await db.execute(
+                    update(products)
+                    .where(*_reprice_filters(products, change, tenant_id))
+                    .values({field: _repriced(products.c[field], change) for field in change.fields})
+                )
+        if not change.dry_run and rows:
+            await bump_catalog_version(db, tenant_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    items = [ProductPriceChange(**row) for row in rows]
+    return ProductsRepriceResult(dry_run=change.dry_run, count=len(items), items=items)
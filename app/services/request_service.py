@@ -6,7 +6,7 @@ from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
 
 from app.models.requests import PurchaseRequest, PurchaseRequestItem
-from app.models.products import Product
+from app.models.products import Products
 from app.models.enums import PurchaseRequestStatus, Roles
 from app.schemas.requests import RequestCreate, RequestUpdate, RequestSchema
 
@@ -31,12 +31,11 @@ async def create_request(
                 quantity=item.quantity
             )
             db.add(new_item)
-        await db.commit()
+        await db.flush()
         await db.refresh(new_request)
         return new_request
         
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creando solicitud: {str(e)}")
 
 async def get_requests(
@@ -52,7 +51,7 @@ async def get_requests(
         query = query.options(
             joinedload(PurchaseRequest.items)
             .joinedload(PurchaseRequestItem.product)
-            .joinedload(Product.supplier)
+            .joinedload(Products.supplier)
         ).order_by(PurchaseRequest.created_at.desc())
 
         result = await db.execute(query)
@@ -72,7 +71,7 @@ async def get_request_by_id(
         ).options(
             joinedload(PurchaseRequest.items)
             .joinedload(PurchaseRequestItem.product)
-            .joinedload(Product.supplier)
+            .joinedload(Products.supplier)
         )
         
         result = await db.execute(query)
@@ -95,14 +94,12 @@ async def delete_request(
             raise HTTPException(status_code=400, detail="No se puede eliminar una solicitud que no esté PENDING")
 
         await db.delete(request)
-        await db.commit()
+        await db.flush()
         return {"message": "Solicitud eliminada correctamente"}
         
     except HTTPException as he:
-        await db.rollback()
         raise he
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error eliminando solicitud: {str(e)}")
 
 async def update_request_status(
@@ -119,13 +116,11 @@ async def update_request_status(
             raise HTTPException(status_code=400, detail="Solo se pueden actualizar solicitudes Pendientes")
         
         request.status = new_status
-        await db.commit()
+        await db.flush()
         await db.refresh(request)
         return request
         
     except HTTPException as he:
-        await db.rollback()
         raise he
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error actualizando estado: {str(e)}")
@@ -1,6 +1,6 @@
 from uuid import uuid4, UUID
 from fastapi import UploadFile, HTTPException
-from app.core.supabase_client import supabase
+from app.core.supabase_client import get_supabase
 
 BUCKET_NAME = "payments"
 
@@ -20,6 +20,7 @@ async def upload_payment_proof(
         file_extension = file.filename.split(".")[-1]
         file_path = f"payments/{tenant_id}/{uuid4()}.{file_extension}"
 
+        supabase = get_supabase()
         res = supabase.storage.from_(BUCKET_NAME).upload(
             path = file_path,
             file = file_content,
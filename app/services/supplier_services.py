@@ -1,44 +1,49 @@
 from typing import List, Optional
 from uuid import UUID
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
-from app.models.suppliers import Supplier
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.services.tenant_services import bump_catalog_version
 from app.schemas.suppliers import SuppliersCreate, SuppliersUpdate
 
-async def create_supplier(db:AsyncSession, supplier_data:SuppliersCreate, tenant_id:UUID)->Supplier:
+async def create_supplier(db:AsyncSession, supplier_data:SuppliersCreate, tenant_id:UUID)->Suppliers:
     try:
-        new_supplier = Supplier(**supplier_data.model_dump())
+        new_supplier = Suppliers(**supplier_data.model_dump())
         new_supplier.tenant_id = tenant_id
-        await db.add(new_supplier)
-        await db.commit()
+        db.add(new_supplier)
+        await db.flush()
+        await bump_catalog_version(db, tenant_id)
         await db.refresh(new_supplier)
         return new_supplier
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def get_suppliers(db:AsyncSession, tenant_id:UUID) ->List[Supplier]:
+async def get_suppliers(db:AsyncSession, tenant_id:UUID) ->List[Suppliers]:
     try:
-        result = await db.execute(select(Supplier).where(Supplier.tenant_id == tenant_id))
+        result = await db.execute(select(Suppliers).where(
+            Suppliers.tenant_id == tenant_id,
+            Suppliers.archived_at.is_(None)
+            ))
         return result.scalars().all()
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def get_supplier_by_id(db:AsyncSession, supplier_id: UUID, tenant_id:UUID) -> Optional[Supplier]:
+async def get_supplier_by_id(db:AsyncSession, supplier_id: UUID, tenant_id:UUID) -> Optional[Suppliers]:
     try:
-        result = await db.execute(select(Supplier).where(
-            Supplier.id == supplier_id,
-            Supplier.tenant_id == tenant_id
+        result = await db.execute(select(Suppliers).where(
+            Suppliers.id == supplier_id,
+            Suppliers.tenant_id == tenant_id,
+            Suppliers.archived_at.is_(None)
             ))
         return result.scalars().first()
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def update_supplier(db:AsyncSession, supplier_data:SuppliersUpdate, supplier_id: UUID, tenant_id:UUID) -> Supplier:
+async def update_supplier(db:AsyncSession, supplier_data:SuppliersUpdate, supplier_id: UUID, tenant_id:UUID) -> Suppliers:
     try:
         supplier_to_update = await get_supplier_by_id(db, supplier_id,tenant_id)
         if not supplier_to_update:
@@ -47,24 +52,47 @@ async def update_supplier(db:AsyncSession, supplier_data:SuppliersUpdate, suppli
         for field, value in update_data.items():
             setattr(supplier_to_update, field, value)
 
-        await db.add(supplier_to_update)
-        await db.commit()
+        db.add(supplier_to_update)
+        await db.flush()
+        await bump_catalog_version(db, tenant_id)
         await db.refresh(supplier_to_update)
         return supplier_to_update
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 async def delete_supplier(db:AsyncSession, supplier_id: UUID, tenant_id:UUID) ->dict:
+    """
+    Baja lógica del proveedor y de sus productos: dos UPDATE set-based en la
+    misma transacción, sin cargar nada en la sesión. El historial de stock y
+    de pedidos sigue siendo válido porque ninguna fila se borra.
+    """
     try:
-        supplier_to_delete = await get_supplier_by_id(db, supplier_id,tenant_id)
-        if not supplier_to_delete:
-            raise HTTPException(status_code=404, detail="Empresa no encontrada")
-        
-        await db.delete(supplier_to_delete)
-        await db.commit()
-        return {"message": "Proveedor eliminado correctamente"}
+        archived = await db.execute(
+            update(Suppliers)
+            .where(
+                Suppliers.id == supplier_id,
+                Suppliers.tenant_id == tenant_id,
+                Suppliers.archived_at.is_(None),
+            )
+            .values(archived_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if archived.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Proveedor no encontrado")
+        products = await db.execute(
+            update(Products)
+            .where(
+                Products.tenant_id == tenant_id,
+                Products.supplier_id == supplier_id,
+                Products.archived_at.is_(None),
+            )
+            .values(archived_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await bump_catalog_version(db, tenant_id)
+        return {"message": "Proveedor eliminado correctamente", "archived_products": products.rowcount}
+    except HTTPException:
+        raise
     except Exception as e:
-        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,8 +1,10 @@
 from uuid import UUID
 from datetime import timedelta, date
 import calendar
+from sqlalchemy import event, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from app.models.tenant import Tenants
@@ -10,7 +12,53 @@ from app.models.user import Users
 from app.schemas.tenant import TenantCreate, TenantUpdate
 from app.schemas.user import UserCreate
 from app.models.enums import Roles
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.core import catalog_cache
+from app.core.principal_cache import invalidate_after_commit
+
+_CATALOG_BUMPS = "catalog_version_bumps"
+_CATALOG_BUMPED = "catalog_version_bumped"
+
+async def get_catalog_version(db: AsyncSession, tenant_id: UUID) -> int:
+    result = await db.execute(select(Tenants.catalog_version).where(Tenants.id == tenant_id))
+    return result.scalar_one_or_none() or 0
+
+async def bump_catalog_version(db: AsyncSession, tenant_id: UUID) -> None:
+    """
+    Invalida los listados de catálogo cacheados del tenant.
+
+    No escribe en el momento: anota el tenant en la sesión y el UPDATE sale justo
+    antes del COMMIT (ver _flush_catalog_bumps). Así el lock sobre la fila del
+    tenant, que comparten todas las escrituras del tenant, se sostiene solo lo que
+    tarda el COMMIT y no toda la transacción; varias escrituras en la misma
+    transacción suben la versión una sola vez.
+    """
+    db.info.setdefault(_CATALOG_BUMPS, set()).add(tenant_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _flush_catalog_bumps(session: Session) -> None:
+    tenant_ids = session.info.pop(_CATALOG_BUMPS, None)
+    if tenant_ids:
+        session.execute(
+            update(Tenants)
+            .where(Tenants.id.in_(sorted(tenant_ids)))
+            .values(catalog_version=Tenants.catalog_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        session.info[_CATALOG_BUMPED] = tenant_ids
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_bumped_versions(session: Session) -> None:
+    # La versión recordada por el cache de SKUs de este worker ya es vieja
+    catalog_cache.hot_sku_cache.forget_versions(session.info.pop(_CATALOG_BUMPED, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_bumps(session: Session) -> None:
+    session.info.pop(_CATALOG_BUMPS, None)
+    session.info.pop(_CATALOG_BUMPED, None)
 
 async def get_all_tenants(db: AsyncSession):
     try:
@@ -28,95 +76,75 @@ async def get_tenant(db: AsyncSession, tenant_id: UUID):
 
 async def create_tenant_with_admin(db: AsyncSession, tenant_data: TenantCreate, admin_user_data: UserCreate) -> Tenants:
     # Inicio de Transacción Atómica implícita en AsyncSession
-    try:
-        # 1. Crear Empresa
-        new_tenant = Tenants(**tenant_data.model_dump())
-        db.add(new_tenant)
-        await db.flush() # Para obtener el ID del tenant antes del commit
-
-        # 2. Preparar Usuario Admin (Vinculado al Tenant)
-        # Verificamos duplicado de usuario aquí también por seguridad
-        q = await db.execute(select(Users).where(Users.username == admin_user_data.username))
-        if q.scalars().first():
-            raise HTTPException(status_code=400, detail="El usuario ya existe")
-
-        hashed_pw = get_password_hash(admin_user_data.password)
-        
-        new_admin = Users(
-            tenant_id=new_tenant.id,
-            username=admin_user_data.username,
-            full_name=admin_user_data.full_name,
-            role=Roles.COMPANY, # <--- FIXED: COMPANY role for Tenant Owner
-            hashed_password=hashed_pw
-        )
-        db.add(new_admin)
+    # 1. Crear Empresa
+    new_tenant = Tenants(**tenant_data.model_dump())
+    db.add(new_tenant)
+    await db.flush() # Para obtener el ID del tenant antes del commit
+
+    # 2. Preparar Usuario Admin (Vinculado al Tenant)
+    # Verificamos duplicado de usuario aquí también por seguridad
+    q = await db.execute(select(Users).where(Users.username == admin_user_data.username))
+    if q.scalars().first():
+        raise HTTPException(status_code=400, detail="El usuario ya existe")
+
+    hashed_pw = await get_password_hash_async(admin_user_data.password)
+
+    new_admin = Users(
+        tenant_id=new_tenant.id,
+        username=admin_user_data.username,
+        full_name=admin_user_data.full_name,
+        role=Roles.COMPANY, # <--- FIXED: COMPANY role for Tenant Owner
+        hashed_password=hashed_pw
+    )
+    db.add(new_admin)
+
+    await db.flush()
+    await db.refresh(new_tenant)
+    return new_tenant
 
-        await db.commit()
-        await db.refresh(new_tenant)
-        return new_tenant
+async def update_tenant(db: AsyncSession, tenant_id: UUID, tenant_update: TenantUpdate):
+    tenant = await get_tenant(db, tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
 
-    except Exception as e:
-        await db.rollback()
-        raise e
+    update_data = tenant_update.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(tenant, field, value)
 
-async def update_tenant(db: AsyncSession, tenant_id: UUID, tenant_update: TenantUpdate):
-    try:
-        tenant = await get_tenant(db, tenant_id)
-        if not tenant:
-            raise HTTPException(status_code=404, detail="Empresa no encontrada")
-
-        update_data = tenant_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(tenant, field, value)
-
-        db.add(tenant)
-        await db.commit()
-        await db.refresh(tenant)
-        return tenant
-    except Exception as e:
-        await db.rollback()
-        raise e
+    db.add(tenant)
+    await db.flush()
+    await db.refresh(tenant)
+    return tenant
 
 async def delete_tenant(db: AsyncSession, tenant_id: UUID):
-    try:
-        tenant = await get_tenant(db, tenant_id)
-        if not tenant:
-            raise HTTPException(status_code=404, detail="Empresa no encontrada")
-        
-        await db.delete(tenant)
-        await db.commit()
-        return {"message": "Empresa eliminada correctamente"}
-    except Exception as e:
-        await db.rollback()
-        raise e
+    tenant = await get_tenant(db, tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+
+    await db.delete(tenant)
+    await db.flush()
+    invalidate_after_commit(db, tenant_id=tenant_id)
+    return {"message": "Empresa eliminada correctamente"}
 
 async def deactivate_tenant(db: AsyncSession, tenant_id: UUID):
-    try:
-        tenant = await get_tenant(db, tenant_id)
-        if not tenant:
-            raise HTTPException(status_code=404, detail="Empresa no encontrada")
-    
-        tenant.is_active = False # Baja Lógica
-        db.add(tenant)
-        await db.commit()
-        return tenant
-    except Exception as e:
-        await db.rollback()
-        raise e
+    tenant = await get_tenant(db, tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+
+    tenant.is_active = False # Baja Lógica
+    db.add(tenant)
+    await db.flush()
+    return tenant
 
 async def activate_tenant(db: AsyncSession, tenant_id: UUID):
-    try:
-        tenant = await get_tenant(db, tenant_id)
-        if not tenant:
-            raise HTTPException(status_code=404, detail="Empresa no encontrada")
-    
-        tenant.is_active = True
-        db.add(tenant)
-        await db.commit()
-        return tenant
-    except Exception as e:
-        await db.rollback()
-        raise e
+    tenant = await get_tenant(db, tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+
+    tenant.is_active = True
+    db.add(tenant)
+    await db.flush()
+    return tenant
 
 def add_months(source_date: date, months: int) -> date:
     month = source_date.month - 1 + months
@@ -126,25 +154,21 @@ def add_months(source_date: date, months: int) -> date:
     return date(year, month, day)
 
 async def extend_subscription(db: AsyncSession, tenant_id: UUID, days: int = 0, months: int = 0):
-    try: 
-        tenant = await get_tenant(db, tenant_id)
-        if not tenant:
-            raise HTTPException(status_code=404, detail="Empresa no encontrada")
-        
-        current_end = tenant.subscription_end
-        base_date = current_end if current_end and current_end >= date.today() else date.today()
-        
-        if months > 0:
-            new_end_date = add_months(base_date, months)
-        else:
-            new_end_date = base_date + timedelta(days=days)
-
-        tenant.subscription_end = new_end_date
-        
-        db.add(tenant)
-        await db.commit()
-        await db.refresh(tenant)
-        return tenant
-    except Exception as e:
-        await db.rollback()
-        raise e
\ No newline at end of file
+    tenant = await get_tenant(db, tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+
+    current_end = tenant.subscription_end
+    base_date = current_end if current_end and current_end >= date.today() else date.today()
+
+    if months > 0:
+        new_end_date = add_months(base_date, months)
+    else:
+        new_end_date = base_date + timedelta(days=days)
+
+    tenant.subscription_end = new_end_date
+
+    db.add(tenant)
+    await db.flush()
+    await db.refresh(tenant)
+    return tenant
@@ -1,13 +1,22 @@
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
-from app.models.user import Users
+from app.core.config import settings
+from app.models.user import DeletedUserToken, Users
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, issue_access_token, verify_password_async
+from app.core.principal_cache import invalidate_after_commit
 from app.models.enums import Roles
 
+def revoke_tokens(user: Users) -> None:
+    # Los tokens firmados con una versión anterior dejan de ser válidos
+    user.token_version = (user.token_version or 0) + 1
+    user.tokens_revoked_at = datetime.now(timezone.utc)
+
 async def get_by_username(db: AsyncSession, username: str):
     try:
         result = await db.execute(select(Users).where(Users.username == username))
@@ -23,141 +32,135 @@ async def get_by_id(db: AsyncSession, user_id: UUID):
         raise HTTPException(status_code=500, detail=str(e))
 
 async def create_user(db: AsyncSession, user_data: UserCreate) -> Users:
-    try:
-        # 1. Validar si ya existe (Eficiente: SELECT 1)
-        existing_user = await get_by_username(db, user_data.username)
-        if existing_user:
-            raise HTTPException(status_code=400, detail="El nombre de usuario ya existe")
-
-        # 2. Hashear password
-        hashed_pw = get_password_hash(user_data.password)
-
-        # 3. Crear usando model_dump
-        db_obj = Users(
-            **user_data.model_dump(exclude={"password"}), # Excluimos pass plano
-            hashed_password=hashed_pw
-        )
-        
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
-    except Exception as e:
-        await db.rollback()
-        raise e
+    # 1. Validar si ya existe (Eficiente: SELECT 1)
+    existing_user = await get_by_username(db, user_data.username)
+    if existing_user:
+        raise HTTPException(status_code=400, detail="El nombre de usuario ya existe")
+
+    # 2. Hashear password
+    hashed_pw = await get_password_hash_async(user_data.password)
+
+    # 3. Crear usando model_dump
+    db_obj = Users(
+        **user_data.model_dump(exclude={"password"}), # Excluimos pass plano
+        hashed_password=hashed_pw
+    )
+
+    db.add(db_obj)
+    await db.flush()
+    await db.refresh(db_obj)
+    return db_obj
 
 async def update_user(db: AsyncSession, user_id: UUID, user_update: UserUpdate) -> Users:
-    try:
-        user = await get_by_id(db, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-
-        update_data = user_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(user, field, value)
-
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        return user
-    except Exception as e:
-        await db.rollback()
-        raise e
+    user = await get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    update_data = user_update.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(user, field, value)
+    if update_data.get("is_active") is False:
+        revoke_tokens(user)
+
+    db.add(user)
+    await db.flush()
+    invalidate_after_commit(db, user_id=user_id, revoked_version=user.token_version)
+    await db.refresh(user)
+    return user
 
 async def delete_user(db: AsyncSession, user_id: UUID):
-    try:
-        user = await get_by_id(db, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        
-        await db.delete(user)
-        await db.commit()
-        return {"message": "Usuario eliminado correctamente"}
-    except Exception as e:
-        await db.rollback()
-        raise
+    user = await get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    # Sin fila en users el refresh de revocaciones no vería el borrado: queda
+    # registrado aparte para los demás workers (lo que ya expiró se limpia)
+    revoked_version = (user.token_version or 0) + 1
+    now = datetime.now(timezone.utc)
+    await db.execute(delete(DeletedUserToken).where(
+        DeletedUserToken.revoked_at < now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    ))
+    await db.merge(DeletedUserToken(user_id=user_id, token_version=revoked_version, revoked_at=now))
+    await db.delete(user)
+    await db.flush()
+    invalidate_after_commit(db, user_id=user_id, revoked_version=revoked_version)
+    return {"message": "Usuario eliminado correctamente"}
 
 async def disable_user(db: AsyncSession, user_id: UUID):
-    try:
-        user = await get_by_id(db, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-        user.is_active = False
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        return user
-    except Exception as e:
-        await db.rollback()
-        raise
+    user = await get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    user.is_active = False
+    revoke_tokens(user)
+    db.add(user)
+    await db.flush()
+    invalidate_after_commit(db, user_id=user_id, revoked_version=user.token_version)
+    await db.refresh(user)
+    return user
 
 async def enable_user(db: AsyncSession, user_id: UUID):
-    try:
-        user = await get_by_id(db, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-        user.is_active = True
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        return user
-    except Exception as e:
-        await db.rollback()
-        raise
+    user = await get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    user.is_active = True
+    db.add(user)
+    await db.flush()
+    invalidate_after_commit(db, user_id=user_id)
+    await db.refresh(user)
+    return user
 
 async def get_all_users(db: AsyncSession):
-    try:
-        result = await db.execute(select(Users))
-        return result.scalars().all()
-    except Exception as e:
-        await db.rollback()
-        raise
+    result = await db.execute(select(Users))
+    return result.scalars().all()
 
 async def get_all_users_by_tenant_id(db: AsyncSession, tenant_id: UUID):
-    try:
-        result = await db.execute(select(Users).where(Users.tenant_id == tenant_id))
-        return result.scalars().all()
-    except Exception as e:
-        await db.rollback()
-        raise
+    result = await db.execute(select(Users).where(Users.tenant_id == tenant_id))
+    return result.scalars().all()
 
 async def change_password(db: AsyncSession, user_id: UUID, current_password: str, new_password: str):
-    try:
-        user = await get_by_id(db, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        if not verify_password(current_password, user.hashed_password):
-            raise HTTPException(status_code=400, detail="La contraseña actual es incorrecta")
-        user.hashed_password = get_password_hash(new_password)
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        return {"message": "Contraseña actualizada correctamente"}
-    except Exception as e:
-        await db.rollback()
-        raise e
+    user = await get_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if not await verify_password_async(current_password, user.hashed_password):
+        raise HTTPException(status_code=400, detail="La contraseña actual es incorrecta")
+    user.hashed_password = await get_password_hash_async(new_password)
+    # Los tokens anteriores (incluido uno robado) dejan de valer; el que llamó recibe uno nuevo
+    revoke_tokens(user)
+    db.add(user)
+    await db.flush()
+    invalidate_after_commit(db, user_id=user_id, revoked_version=user.token_version)
+    await db.refresh(user)
+    return {
+        "message": "Contraseña actualizada correctamente",
+        "access_token": issue_access_token(user),
+        "token_type": "bearer",
+    }
+
+async def rehash_password(db: AsyncSession, user: Users, plain_password: str):
+    user.hashed_password = await get_password_hash_async(plain_password)
+    db.add(user)
+    await db.flush()
+    return user
 
 async def reset_password(db: AsyncSession, current_user: Users, target_user_id: UUID, new_password: str):
-    try:
-        target_user = await get_by_id(db, target_user_id)
-        if not target_user:
-            raise HTTPException(status_code=404, detail="Usuario destino no encontrado")
-        if current_user.role == Roles.COMPANY:
-            if target_user.tenant_id != current_user.tenant_id:
-                raise HTTPException(status_code=403, detail="No puedes modificar usuarios de otra empresa")
-            if target_user.role != Roles.EMPLOYEE:
-                raise HTTPException(status_code=403, detail="Solo puedes resetear contraseñas de empleados")
-        elif current_user.role == Roles.ADMIN:
-            pass
-        else:
-            raise HTTPException(status_code=403, detail="No tienes permisos para realizar esta acción")
-        target_user.hashed_password = get_password_hash(new_password)
-        db.add(target_user)
-        await db.commit()
-        await db.refresh(target_user)
-        return {"message": "Contraseña reseteada correctamente"}
-    except Exception as e:
-        await db.rollback()
-        raise e
+    target_user = await get_by_id(db, target_user_id)
+    if not target_user:
+        raise HTTPException(status_code=404, detail="Usuario destino no encontrado")
+    if current_user.role == Roles.COMPANY:
+        if target_user.tenant_id != current_user.tenant_id:
+            raise HTTPException(status_code=403, detail="No puedes modificar usuarios de otra empresa")
+        if target_user.role != Roles.EMPLOYEE:
+            raise HTTPException(status_code=403, detail="Solo puedes resetear contraseñas de empleados")
+    elif current_user.role == Roles.ADMIN:
+        pass
+    else:
+        raise HTTPException(status_code=403, detail="No tienes permisos para realizar esta acción")
+    target_user.hashed_password = await get_password_hash_async(new_password)
+    revoke_tokens(target_user)
+    db.add(target_user)
+    await db.flush()
+    invalidate_after_commit(db, user_id=target_user_id, revoked_version=target_user.token_version)
+    await db.refresh(target_user)
+    return {"message": "Contraseña reseteada correctamente"}
@@ -0,0 +1,127 @@
+"""
+Valuación de inventario a partir de las capas de costo (inventory_cost_layers).
+
+- FIFO: el stock actual son las unidades de las capas más nuevas (las viejas
+  salieron primero). Una suma acumulada por producto, de la capa más nueva a la
+  más vieja (función ventana), dice cuánto de cada capa sigue en stock.
+- Promedio ponderado: costo medio de todas las capas recibidas del producto.
+
+El stock que no está cubierto por capas (stock inicial, ajustes) se valúa a
+Products.cost_price. Todo el reporte sale de una sola consulta.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Literal
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.inventory import InventoryCostLayer
+from app.models.products import Products
+from app.schemas.inventory import ValuationLine, ValuationReport
+
+ARG = ZoneInfo("America/Argentina/Buenos_Aires")
+ValuationMethod = Literal["fifo", "average"]
+
+
+async def record_cost_layers(db: AsyncSession, tenant_id: UUID, layers: List[Dict]) -> None:
+    """
+    Registra capas de costo (product_id, quantity, unit_cost y opcionalmente
+    purchase_order_item_id) con un solo INSERT, en la transacción en curso.
+    """
+    if not layers:
+        return
+    received_at = datetime.now(ARG)
+    await db.execute(insert(InventoryCostLayer), [
+        {"tenant_id": tenant_id, "received_at": received_at, **layer} for layer in layers
+    ])
+
+
+def _fifo_values(tenant_id: UUID):
+    """(product_id, valor, unidades cubiertas) de las capas que siguen en stock según FIFO."""
+    newer_or_same = func.sum(InventoryCostLayer.quantity).over(
+        partition_by=InventoryCostLayer.product_id,
+        order_by=(InventoryCostLayer.received_at.desc(), InventoryCostLayer.id.desc()),
+        rows=(None, 0),
+    )
+    layers = (
+        select(
+            InventoryCostLayer.product_id,
+            InventoryCostLayer.quantity,
+            InventoryCostLayer.unit_cost,
+            # Unidades de capas más nuevas que esta
+            (newer_or_same - InventoryCostLayer.quantity).label("newer"),
+        )
+        .where(InventoryCostLayer.tenant_id == tenant_id)
+        .subquery()
+    )
+    remaining = Products.stock_quantity - layers.c.newer
+    in_stock = case(
+        (remaining <= 0, 0),
+        (remaining >= layers.c.quantity, layers.c.quantity),
+        else_=remaining,
+    )
+    return (
+        select(
+            layers.c.product_id,
+            func.sum(in_stock * layers.c.unit_cost).label("value"),
+            func.sum(in_stock).label("covered"),
+        )
+        .join(Products, Products.id == layers.c.product_id)
+        .group_by(layers.c.product_id)
+        .subquery()
+    )
+
+
+def _average_values(tenant_id: UUID):
+    """(product_id, valor, unidades cubiertas) con el costo promedio ponderado de las capas."""
+    average_cost = (
+        select(
+            InventoryCostLayer.product_id,
+            (func.sum(InventoryCostLayer.quantity * InventoryCostLayer.unit_cost)
+             / func.sum(InventoryCostLayer.quantity)).label("unit_cost"),
+        )
+        .where(InventoryCostLayer.tenant_id == tenant_id, InventoryCostLayer.quantity > 0)
+        .group_by(InventoryCostLayer.product_id)
+        .subquery()
+    )
+    return (
+        select(
+            average_cost.c.product_id,
+            (Products.stock_quantity * average_cost.c.unit_cost).label("value"),
+            Products.stock_quantity.label("covered"),
+        )
+        .join(Products, Products.id == average_cost.c.product_id)
+        .subquery()
+    )
+
+
+async def get_valuation_report(db: AsyncSession, tenant_id: UUID, method: ValuationMethod = "fifo") -> ValuationReport:
+    """Valor del stock actual de cada producto activo del tenant y el total."""
+    layered = _fifo_values(tenant_id) if method == "fifo" else _average_values(tenant_id)
+    uncovered = Products.stock_quantity - func.coalesce(layered.c.covered, 0)
+    value = func.coalesce(layered.c.value, 0) + uncovered * Products.cost_price
+    result = await db.execute(
+        select(Products.id, Products.sku, Products.name, Products.stock_quantity, value.label("value"))
+        .outerjoin(layered, layered.c.product_id == Products.id)
+        .where(Products.tenant_id == tenant_id, Products.archived_at.is_(None))
+        .order_by(Products.name, Products.id)
+    )
+
+    items = []
+    total = Decimal(0)
+    for row in result.all():
+        stock, row_value = Decimal(str(row.stock_quantity)), Decimal(str(row.value)).quantize(Decimal("0.01"))
+        total += row_value
+        items.append(ValuationLine(
+            product_id=row.id,
+            sku=row.sku,
+            name=row.name,
+            stock_quantity=float(stock),
+            unit_cost=float((row_value / stock).quantize(Decimal("0.01"))) if stock else None,
+            value=float(row_value),
+        ))
+    return ValuationReport(method=method, total_value=float(total), items=items)
@@ -0,0 +1,60 @@
+"""
+Hashes por segundo que sostiene un worker para cada costo de bcrypt.
+
+    python -m benchmarks.bench_bcrypt_cost [--min-rounds 8] [--max-rounds 14] [--seconds 2]
+
+"1 hilo" es el techo de un hash a la vez; "pool" usa el PasswordHashPool con
+PASSWORD_HASH_MAX_WORKERS hilos, que es lo que tiene un worker de uvicorn.
+"""
+import argparse
+import asyncio
+import time
+
+import benchmarks.common  # noqa: F401  (variables de entorno por defecto)
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import PasswordHashPool
+
+
+def single_thread_rate(context: CryptContext, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        context.hash("bench-password")
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def pool_rate(context: CryptContext, pool: PasswordHashPool, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal count
+        while time.perf_counter() - start < seconds:
+            await pool.run(context.hash, "bench-password")
+            count += 1
+
+    await asyncio.gather(*(worker() for _ in range(pool.max_workers)))
+    return count / (time.perf_counter() - start)
+
+
+async def main(min_rounds: int, max_rounds: int, seconds: float):
+    pool = PasswordHashPool(settings.PASSWORD_HASH_MAX_WORKERS)
+    print(f"{'rounds':>6}{'ms/hash':>10}{'hash/s 1 hilo':>16}{f'hash/s pool ({pool.max_workers})':>20}")
+    for rounds in range(min_rounds, max_rounds + 1):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        single = single_thread_rate(context, seconds)
+        pooled = await pool_rate(context, pool, seconds)
+        marker = "  <-- BCRYPT_ROUNDS" if rounds == settings.BCRYPT_ROUNDS else ""
+        print(f"{rounds:>6}{1000 / single:>10.1f}{single:>16.1f}{pooled:>20.1f}{marker}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-rounds", type=int, default=8)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.min_rounds, args.max_rounds, args.seconds))
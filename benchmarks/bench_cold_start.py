@@ -0,0 +1,107 @@
+"""
+Cold start de la app: tiempo desde que arranca el proceso hasta la primera respuesta.
+
+    python -m benchmarks.bench_cold_start [--runs 5] [--path /] [--top 15]
+
+Cada corrida es un intérprete nuevo (como una invocación fría en Vercel) que
+importa app.main y atiende un GET con httpx sobre ASGI, sin levantar un
+servidor. Además se usa `python -X importtime` para mostrar qué módulos se
+llevan el tiempo de import, así una dependencia pesada que vuelve a cargarse
+al importar la app queda a la vista.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import benchmarks.common  # noqa: F401  (variables de entorno por defecto)
+
+_PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+imported_at = time.perf_counter()
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(sys.argv[1])
+    return response.status_code
+
+status = asyncio.run(first_request())
+print(json.dumps({
+    "wall_at_response": time.time(),
+    "import_s": imported_at - start,
+    "request_s": time.perf_counter() - imported_at,
+    "status": status,
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """Devuelve (módulo, self_us, cumulative_us) por cada línea de -X importtime."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if self_us.isdigit():
+            modules.append((name, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_once(path: str) -> tuple:
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, path],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["cold_start_s"] = result.pop("wall_at_response") - started
+    return result, parse_importtime(proc.stderr)
+
+
+def main(runs: int, path: str, top: int):
+    results, modules = [], []
+    for _ in range(runs):
+        result, imports = run_once(path)
+        results.append(result)
+        modules = imports
+
+    print(f"GET {path} -> {results[-1]['status']} ({runs} procesos)")
+    for key, label in (("cold_start_s", "proceso -> 1ra respuesta"), ("import_s", "import app.main"), ("request_s", "1er request")):
+        values = [r[key] * 1000 for r in results]
+        print(f"  {label:<26} mediana {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+
+    print(f"\nMódulos de la app por tiempo acumulado de import (última corrida, top {top}):")
+    own = sorted((m for m in modules if m[0].strip().startswith("app")), key=lambda m: m[2], reverse=True)
+    for name, _, cumulative in own[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+
+    print(f"\nPaquetes externos por tiempo acumulado de import (top {top}):")
+    packages = {}
+    for name, _, cumulative in modules:
+        name = name.strip()
+        if "." not in name and not name.startswith(("app", "_")):
+            packages[name] = max(packages.get(name, 0), cumulative)
+    for name, cumulative in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    lazy = [name for name in ("supabase", "asyncpg") if any(m[0].strip() == name for m in modules)]
+    print("\nCargados al importar (deberían ser lazy):", ", ".join(lazy) if lazy else "ninguno")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    main(args.runs, args.path, args.top)
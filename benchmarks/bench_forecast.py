@@ -0,0 +1,105 @@
+"""
+Pronóstico de consumo y sugerencias de compra para un tenant grande.
+
+    python -m benchmarks.bench_forecast [--products 10000] [--days 730] [--density 0.4]
+
+1. Cálculo: arma en memoria dos años de salidas diarias (una fila por producto y
+   día con consumo, `density` de los días) y mide forecast_demand +
+   reorder_quantities con cada método sobre todos los productos.
+2. De punta a punta: carga en la base los días que el pronóstico realmente lee
+   (history_days) y mide get_reorder_suggestions, consulta incluida.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import insert
+
+from benchmarks.common import StatementCounter, bench_sessionmaker, create_bench_engine
+
+from app.core.config import settings
+from app.models.enums import TransactionType
+from app.models.inventory import InventoryTransaction
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.services import forecast_services
+from app.services.forecast_services import Consumption, forecast_demand, history_days, reorder_quantities
+
+
+def synthetic_consumption(products: int, days: int, density: float, rng) -> Consumption:
+    product_index, day_index = np.nonzero(rng.random((products, days)) < density)
+    return Consumption(product_index, day_index, rng.gamma(2.0, 3.0, size=product_index.size).round(2))
+
+
+def bench_compute(products: int, days: int, density: float, repeat: int = 5):
+    rng = np.random.default_rng(7)
+    consumption = synthetic_consumption(products, days, density, rng)
+    stock = rng.integers(0, 500, size=products).astype(float)
+    reorder_point = np.where(rng.random(products) < 0.2, 20.0, np.nan)
+    print(f"Cálculo: {products} productos x {days} días ({consumption.quantity.size} filas)")
+    for method in ("sma", "ses"):
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            demand, std = forecast_demand(consumption, products, days, method=method,
+                                          window=settings.FORECAST_WINDOW_DAYS, alpha=settings.FORECAST_ALPHA)
+            _, quantity = reorder_quantities(stock, reorder_point, demand, std,
+                                             lead_time_days=settings.FORECAST_LEAD_TIME_DAYS,
+                                             review_days=settings.FORECAST_REVIEW_DAYS,
+                                             service_z=settings.FORECAST_SERVICE_Z)
+            elapsed.append(time.perf_counter() - start)
+        print(f"  {method}  {min(elapsed) * 1000:8.1f} ms  ({int((quantity > 0).sum())} productos a pedir)")
+
+
+async def bench_end_to_end(products: int, density: float):
+    engine = await create_bench_engine()
+    sessionmaker = bench_sessionmaker(engine)
+    counter = StatementCounter(engine)
+    rng = np.random.default_rng(11)
+    days = max(history_days(method, settings.FORECAST_WINDOW_DAYS, settings.FORECAST_ALPHA) for method in ("sma", "ses"))
+
+    async with sessionmaker() as db:
+        tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+        supplier = Suppliers(id=uuid4(), tenant_id=tenant.id, name="Proveedor")
+        db.add_all([tenant, supplier])
+        await db.flush()
+        product_ids = [uuid4() for _ in range(products)]
+        await db.execute(insert(Products), [
+            {"id": product_id, "tenant_id": tenant.id, "supplier_id": supplier.id, "sku": f"SKU-{n:06d}",
+             "name": f"Producto {n:06d}", "unit": "u", "stock_quantity": int(rng.integers(0, 500))}
+            for n, product_id in enumerate(product_ids)
+        ])
+        today = datetime.now(forecast_services.ARG)
+        product_index, day_index = np.nonzero(rng.random((products, days)) < density)
+        rows = [
+            {"tenant_id": tenant.id, "product_id": product_ids[p], "transaction_type": TransactionType.OUT,
+             "quantity": 1 + d % 7, "created_at": today - timedelta(days=int(d))}
+            for p, d in zip(product_index.tolist(), day_index.tolist())
+        ]
+        for offset in range(0, len(rows), 20_000):
+            await db.execute(insert(InventoryTransaction), rows[offset:offset + 20_000])
+        await db.commit()
+
+    print(f"De punta a punta ({engine.dialect.name}): {products} productos, {len(rows)} salidas en {days} días")
+    for method in ("sma", "ses"):
+        async with sessionmaker() as db:
+            counter.reset()
+            start = time.perf_counter()
+            suggestions = await forecast_services.get_reorder_suggestions(db, tenant.id, method=method)
+            elapsed = time.perf_counter() - start
+        print(f"  {method}  {elapsed * 1000:8.1f} ms  {counter.count} sentencias  ({len(suggestions)} sugerencias)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--density", type=float, default=0.4)
+    args = parser.parse_args()
+    bench_compute(args.products, args.days, args.density)
+    asyncio.run(bench_end_to_end(args.products, args.density))
@@ -0,0 +1,109 @@
+"""
+Latencia de un endpoint ajeno (GET /) durante una ráfaga de logins.
+
+    python -m benchmarks.bench_login_storm [--logins 40] [--concurrency 20]
+
+Compara el login verificando bcrypt dentro del event loop (como antes) contra
+verify_password_async, que lo manda al pool de hilos. Reporta p50/p99 del
+endpoint ajeno mientras dura la ráfaga.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.common import bench_sessionmaker, create_bench_engine
+
+from app.api import deps
+from app.api.v1.endpoints import auth
+from app.core import security
+from app.main import app
+from app.models.enums import Roles
+from app.models.tenant import Tenants
+from app.models.user import Users
+
+
+async def blocking_verify(plain_password: str, hashed_password: str) -> bool:
+    return security.verify_password(plain_password, hashed_password)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def storm(client: httpx.AsyncClient, logins: int, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with slots:
+            response = await client.post("/api/v1/auth/login", data={"username": "bench", "password": "secreto"})
+            assert response.status_code == 200, response.text
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def probe(client: httpx.AsyncClient, done: asyncio.Event, samples: list):
+    while not done.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def run_mode(client, logins, concurrency):
+    samples = []
+    done = asyncio.Event()
+    prober = asyncio.create_task(probe(client, done, samples))
+    start = time.perf_counter()
+    await storm(client, logins, concurrency)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    return samples, elapsed
+
+
+async def main(logins: int, concurrency: int):
+    engine = await create_bench_engine()
+    sessionmaker = bench_sessionmaker(engine)
+    async with sessionmaker() as db:
+        tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+        db.add_all([tenant, Users(
+            tenant_id=tenant.id,
+            username="bench",
+            hashed_password=security.get_password_hash("secreto"),
+            role=Roles.COMPANY,
+            full_name="Bench User",
+        )])
+        await db.commit()
+
+    async def bench_db():
+        async with sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[deps.get_db] = bench_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'modo':<22}{'muestras':>10}{'p50 ms':>10}{'p99 ms':>10}{'ráfaga s':>10}")
+        original = auth.verify_password_async
+        for label, verify in (("bcrypt en event loop", blocking_verify), ("bcrypt en pool", original)):
+            auth.verify_password_async = verify
+            samples, elapsed = await run_mode(client, logins, concurrency)
+            print(f"{label:<22}{len(samples):>10}{statistics.median(samples):>10.1f}"
+                  f"{percentile(samples, 99):>10.1f}{elapsed:>10.2f}")
+        auth.verify_password_async = original
+    print(f"pool: {security.password_hash_pool.stats()}")
+    app.dependency_overrides.pop(deps.get_db, None)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,83 @@
+"""
+Generación de órdenes de compra desde muchas solicitudes aprobadas.
+
+    python -m benchmarks.bench_order_generation [--requests 1000] [--items 20] [--products 2000] [--suppliers 25]
+
+Carga `requests` solicitudes aprobadas de `items` ítems cada una (productos al
+azar de `suppliers` proveedores) y mide create_orders_from_requests de punta a
+punta, commit incluido: tiempo y sentencias SQL, que no deberían crecer con la
+cantidad de solicitudes ni de productos.
+"""
+import argparse
+import asyncio
+import random
+import time
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+
+from benchmarks.common import StatementCounter, bench_sessionmaker, create_bench_engine
+
+from app.models.enums import PurchaseRequestStatus, Roles
+from app.models.orders import PurchaseOrderItem
+from app.models.products import Products
+from app.models.requests import PurchaseRequest, PurchaseRequestItem
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.models.user import Users
+from app.services import order_services
+
+
+async def main(requests: int, items: int, products: int, suppliers: int):
+    engine = await create_bench_engine()
+    sessionmaker = bench_sessionmaker(engine)
+    counter = StatementCounter(engine)
+    rng = random.Random(3)
+
+    async with sessionmaker() as db:
+        tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+        user = Users(id=uuid4(), tenant_id=tenant.id, username="bench", hashed_password="x", full_name="Bench", role=Roles.COMPANY)
+        db.add_all([tenant, user])
+        await db.flush()
+        supplier_ids = [uuid4() for _ in range(suppliers)]
+        await db.execute(insert(Suppliers), [
+            {"id": supplier_id, "tenant_id": tenant.id, "name": f"Proveedor {n}"} for n, supplier_id in enumerate(supplier_ids)
+        ])
+        product_ids = [uuid4() for _ in range(products)]
+        await db.execute(insert(Products), [
+            {"id": product_id, "tenant_id": tenant.id, "supplier_id": supplier_ids[n % suppliers], "sku": f"SKU-{n:06d}",
+             "name": f"Producto {n:06d}", "unit": "u", "cost_price": 100 + n % 50}
+            for n, product_id in enumerate(product_ids)
+        ])
+        request_ids = [uuid4() for _ in range(requests)]
+        await db.execute(insert(PurchaseRequest), [
+            {"id": request_id, "tenant_id": tenant.id, "user_id": user.id, "status": PurchaseRequestStatus.APPROVED}
+            for request_id in request_ids
+        ])
+        await db.execute(insert(PurchaseRequestItem), [
+            {"request_id": request_id, "product_id": product_id, "quantity": rng.randint(1, 20)}
+            for request_id in request_ids
+            for product_id in rng.sample(product_ids, items)
+        ])
+        await db.commit()
+
+    print(f"{engine.dialect.name}: {requests} solicitudes x {items} ítems, {products} productos de {suppliers} proveedores")
+    async with sessionmaker() as db:
+        counter.reset()
+        start = time.perf_counter()
+        orders = await order_services.create_orders_from_requests(db, tenant.id, request_ids)
+        await db.commit()
+        elapsed = time.perf_counter() - start
+        lines = await db.scalar(select(func.count()).select_from(PurchaseOrderItem))
+    print(f"  {elapsed * 1000:8.1f} ms  {counter.count} sentencias  ({len(orders)} órdenes, {lines} ítems)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--suppliers", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.items, args.products, args.suppliers))
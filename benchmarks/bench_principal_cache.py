@@ -0,0 +1,73 @@
+"""
+Consultas a la DB por request autenticado, con y sin el cache de usuarios.
+
+    python -m benchmarks.bench_principal_cache [--requests 500]
+
+Simula N requests llamando a get_current_user con una sesión nueva por request
+(igual que la dependencia get_db) y cuenta las sentencias SQL emitidas.
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from benchmarks.common import StatementCounter, bench_sessionmaker, create_bench_engine
+
+from app.api.deps import get_current_user
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.models.enums import Roles
+from app.models.tenant import Tenants
+from app.models.user import Users
+
+
+async def seed(sessionmaker) -> Users:
+    async with sessionmaker() as db:
+        tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+        user = Users(
+            id=uuid4(),
+            tenant_id=tenant.id,
+            username="bench",
+            hashed_password="x",
+            role=Roles.EMPLOYEE,
+            full_name="Bench User",
+            is_active=True,
+        )
+        db.add_all([tenant, user])
+        await db.commit()
+        return user
+
+
+async def run_requests(sessionmaker, token: str, requests: int, cached: bool, counter: StatementCounter):
+    principal_cache.clear()
+    counter.reset()
+    start = time.perf_counter()
+    for _ in range(requests):
+        if not cached:
+            principal_cache.clear()
+        async with sessionmaker() as db:
+            await get_current_user(db, token)
+    elapsed = time.perf_counter() - start
+    return counter.count / requests, elapsed / requests * 1000
+
+
+async def main(requests: int):
+    engine = await create_bench_engine()
+    sessionmaker = bench_sessionmaker(engine)
+    user = await seed(sessionmaker)
+    token = create_access_token({"sub": str(user.id), "role": user.role})
+    counter = StatementCounter(engine)
+
+    print(f"{'modo':<12}{'queries/request':>18}{'ms/request':>14}")
+    for label, cached in (("sin cache", False), ("con cache", True)):
+        queries, ms = await run_requests(sessionmaker, token, requests, cached, counter)
+        print(f"{label:<12}{queries:>18.3f}{ms:>14.3f}")
+    print(f"stats: {principal_cache.stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,81 @@
+"""
+Importación masiva de productos desde CSV: filas por segundo.
+
+    python -m benchmarks.bench_product_import [--rows 50000] [--batch-size 2000]
+
+Genera un CSV en un archivo temporal (como lo deja FastAPI al recibir el
+upload), lo importa dos veces sobre un tenant vacío (la primera crea todo, la
+segunda actualiza todo por el mismo SKU) y compara contra el camino de a un
+producto por vez (create_product) sobre una muestra.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from uuid import uuid4
+
+from benchmarks.common import StatementCounter, bench_sessionmaker, create_bench_engine
+
+from app.core.config import settings
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.schemas.products import ProductsCreate
+from app.services import product_services
+
+
+def write_csv(rows: int, supplier_names: list):
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    file.write(b"sku,name,unit,base_price,cost_price,is_raw_material,supplier\n")
+    for index in range(rows):
+        supplier = supplier_names[index % len(supplier_names)]
+        file.write(f"SKU-{index:07d},Producto {index},u,{100 + index % 50},{60 + index % 30},false,{supplier}\n".encode())
+    file.seek(0)
+    return file
+
+
+async def main(rows: int, batch_size: int, sample: int):
+    settings.PRODUCT_IMPORT_BATCH_SIZE = batch_size
+    engine = await create_bench_engine()
+    sessionmaker = bench_sessionmaker(engine)
+    counter = StatementCounter(engine)
+    async with sessionmaker() as db:
+        tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+        suppliers = [Suppliers(id=uuid4(), tenant_id=tenant.id, name=f"Proveedor {n}") for n in range(20)]
+        db.add_all([tenant, *suppliers])
+        await db.commit()
+    names = [supplier.name for supplier in suppliers]
+
+    print(f"{engine.dialect.name}: {rows} filas, lotes de {batch_size}")
+    for label in ("alta", "actualización"):
+        file = write_csv(rows, names)
+        counter.reset()
+        async with sessionmaker() as db:
+            start = time.perf_counter()
+            report = await product_services.import_products_csv(db, file, tenant.id)
+            await db.commit()
+            elapsed = time.perf_counter() - start
+        print(
+            f"  {label:<14} {elapsed:6.2f} s  {rows / elapsed:10.0f} filas/s  {counter.count:5d} sentencias"
+            f"  (creados {report.created}, actualizados {report.updated}, errores {report.failed})"
+        )
+
+    async with sessionmaker() as db:
+        start = time.perf_counter()
+        for index in range(sample):
+            await product_services.create_product(db, ProductsCreate(
+                sku=f"ONE-{index:07d}", name=f"Uno {index}", unit="u",
+                base_price=100, cost_price=60, supplier_id=suppliers[0].id,
+            ), tenant.id)
+            await db.commit()
+        elapsed = time.perf_counter() - start
+    print(f"  de a uno       {sample / elapsed:10.0f} filas/s (muestra de {sample}, proyectado {rows} filas: {rows / (sample / elapsed):.0f} s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=settings.PRODUCT_IMPORT_BATCH_SIZE)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch_size, args.sample))
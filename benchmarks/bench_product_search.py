@@ -0,0 +1,97 @@
+"""
+Latencia de GET /products/search sobre un tenant con 100k productos.
+
+    python -m benchmarks.bench_product_search [--products 100000] [--repeat 50]
+
+Siembra el catálogo con inserts masivos y mide product_services.search_products
+para consultas típicas del mostrador (prefijo, pedazo del nombre, SKU exacto,
+error de tipeo). En SQLite no hay índice de trigramas: el número que importa
+es el de Postgres (BENCH_DATABASE_URL) con la migración de pg_trgm aplicada.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from benchmarks.common import bench_sessionmaker, create_bench_engine
+from sqlalchemy import insert
+
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.services import product_services
+
+WORDS = [
+    "Harina", "Yerba", "Azúcar", "Leche", "Queso", "Manteca", "Aceite", "Arroz", "Fideos", "Galletitas",
+    "Gaseosa", "Cerveza", "Vino", "Jabón", "Detergente", "Lavandina", "Café", "Té", "Mermelada", "Dulce",
+]
+BRANDS = ["Del Valle", "La Serenísima", "Marolio", "Arcor", "Molinos", "Ledesma", "Cañuelas", "Taragüí"]
+QUERIES = {
+    "prefijo": "Yerb",
+    "parcial": "seren",
+    "sku exacto": "SKU-0042137",
+    "tipeo": "Galetitas",
+    "una letra": "a",
+}
+
+
+async def seed(sessionmaker, products: int):
+    rng = random.Random(7)
+    async with sessionmaker() as db:
+        tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+        supplier = Suppliers(id=uuid4(), tenant_id=tenant.id, name="Distribuidora")
+        db.add_all([tenant, supplier])
+        await db.flush()
+        batch = []
+        for index in range(products):
+            batch.append({
+                "id": uuid4(),
+                "tenant_id": tenant.id,
+                "supplier_id": supplier.id,
+                "sku": f"SKU-{index:07d}",
+                "name": f"{rng.choice(WORDS)} {rng.choice(BRANDS)} {rng.randint(100, 5000)}g",
+                "unit": "u",
+                "base_price": 100,
+                "cost_price": 60,
+                "stock_quantity": rng.randint(0, 200),
+                "is_raw_material": False,
+            })
+            if len(batch) == 10_000:
+                await db.execute(insert(Products), batch)
+                batch = []
+        if batch:
+            await db.execute(insert(Products), batch)
+        await db.commit()
+        return tenant.id
+
+
+async def main(products: int, repeat: int, limit: int):
+    engine = await create_bench_engine()
+    sessionmaker = bench_sessionmaker(engine)
+    start = time.perf_counter()
+    tenant_id = await seed(sessionmaker, products)
+    print(f"{engine.dialect.name}: {products} productos sembrados en {time.perf_counter() - start:.1f} s\n")
+
+    print(f"{'consulta':<12}{'q':<16}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    async with sessionmaker() as db:
+        for label, query in QUERIES.items():
+            timings, hits = [], 0
+            for _ in range(repeat):
+                begin = time.perf_counter()
+                hits = len(await product_services.search_products(db, tenant_id, query, limit))
+                timings.append((time.perf_counter() - begin) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{label:<12}{query:<16}{hits:>6}{statistics.median(timings):>10.2f}{p95:>10.2f}{timings[-1]:>10.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.repeat, args.limit))
@@ -0,0 +1,116 @@
+"""
+Movimientos de stock concurrentes sobre pocos productos: SELECT ... FOR UPDATE vs UPDATE condicional.
+
+    python -m benchmarks.bench_stock_contention [--writers 50] [--seconds 10] [--products 1]
+
+Cada writer abre su sesión, registra una salida de 1 unidad con
+register_transaction y confirma, en loop. Se corre dos veces, con
+INVENTORY_ATOMIC_MOVEMENTS apagado (lee con FOR UPDATE, decide en Python,
+escribe) y prendido (un solo UPDATE condicional + historial). Reporta
+movimientos por segundo, latencia p50/p99 y que el stock final cuadre con el
+historial.
+
+Con SQLite todas las escrituras se serializan en un lock de la base y los
+números no dicen nada de contención por fila (además SQLite ignora FOR UPDATE,
+así que ese camino pierde actualizaciones y el stock no cuadra). El benchmark
+tiene sentido con BENCH_DATABASE_URL apuntando a un Postgres.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from benchmarks.common import bench_database_url, bench_sessionmaker, create_bench_engine
+
+from app.core.config import settings
+from app.models.enums import TransactionType
+from app.models.inventory import InventoryTransaction
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.services import inventory_services
+
+INITIAL_STOCK = 10_000_000
+
+
+async def writer(sessionmaker, tenant_id, product_ids, index, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        product_id = product_ids[index % len(product_ids)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            async with sessionmaker() as db:
+                await inventory_services.register_transaction(db, product_id, 1, TransactionType.OUT, tenant_id, None)
+                await db.commit()
+        except (HTTPException, DBAPIError):
+            # Stock insuficiente, deadlock o "database is locked" de SQLite
+            errors.append(index)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(sessionmaker, tenant_id, product_ids, writers, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        writer(sessionmaker, tenant_id, product_ids, index, deadline, latencies, errors) for index in range(writers)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def check_ledger(sessionmaker, tenant_id):
+    async with sessionmaker() as db:
+        stock = await db.execute(select(func.sum(Products.stock_quantity)).where(Products.tenant_id == tenant_id))
+        moved = await db.execute(
+            select(func.coalesce(func.sum(InventoryTransaction.quantity), 0)).where(InventoryTransaction.tenant_id == tenant_id)
+        )
+        return stock.scalar_one(), moved.scalar_one()
+
+
+async def main(writers: int, seconds: float, products: int):
+    url = bench_database_url()
+    # Una conexión por writer para que el pool no sea el cuello de botella (SQLite usa NullPool)
+    pool = {} if url.startswith("sqlite") else {"pool_size": writers, "max_overflow": 0}
+    engine = await create_bench_engine(url, **pool)
+    sessionmaker = bench_sessionmaker(engine)
+
+    print(f"{engine.dialect.name}: {writers} writers, {products} producto(s), {seconds:.0f} s por camino")
+    for atomic in (False, True):
+        settings.INVENTORY_ATOMIC_MOVEMENTS = atomic
+        async with sessionmaker() as db:
+            tenant = Tenants(id=uuid4(), name="Bench", contact_name="Bench")
+            supplier = Suppliers(id=uuid4(), tenant_id=tenant.id, name="Proveedor")
+            rows = [
+                Products(id=uuid4(), tenant_id=tenant.id, supplier_id=supplier.id, sku=f"HOT-{n}",
+                         name=f"Producto {n}", unit="u", stock_quantity=INITIAL_STOCK)
+                for n in range(products)
+            ]
+            db.add_all([tenant, supplier, *rows])
+            await db.commit()
+
+        latencies, errors, elapsed = await run(sessionmaker, tenant.id, [row.id for row in rows], writers, seconds)
+        stock, moved = await check_ledger(sessionmaker, tenant.id)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+        label = "UPDATE condicional" if atomic else "FOR UPDATE"
+        print(
+            f"  {label:<18} {len(latencies) / elapsed:8.0f} mov/s  p50 {statistics.median(latencies or [0]) * 1000:7.1f} ms"
+            f"  p99 {p99 * 1000:7.1f} ms  fallidos {len(errors)}"
+            f"  {'cuadra' if stock + moved == INITIAL_STOCK * products else 'NO CUADRA'}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--products", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.seconds, args.products))
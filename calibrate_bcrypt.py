@@ -0,0 +1,29 @@
+import argparse
+import logging
+
+from app.core.config import settings
+from app.core.security import calibrate_bcrypt_rounds
+
+# Configuración de Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra el costo de bcrypt para este hardware")
+    parser.add_argument("--target-ms", type=float, default=250, help="Latencia objetivo por hash en ms")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=3, help="Mediciones por costo (se usa la mediana)")
+    args = parser.parse_args()
+
+    rounds, timings = calibrate_bcrypt_rounds(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
+    for cost, elapsed in timings:
+        marker = " <-- elegido" if cost == rounds else ""
+        logger.info(f"rounds={cost:>2}  {elapsed:8.1f} ms/hash{marker}")
+    if timings[0][1] > args.target_ms:
+        logger.warning(f"⚠️ Ni el costo mínimo ({args.min_rounds}) entra en {args.target_ms} ms")
+    logger.info(f"Costo actual: BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}")
+    logger.info(f"✅ Sugerido para el .env: BCRYPT_ROUNDS={rounds}")
+
+if __name__ == "__main__":
+    main()
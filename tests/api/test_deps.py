@@ -0,0 +1,159 @@
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api import deps
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token, get_password_hash_async
+from app.core.token_revocation import TokenRevocations, token_revocations
+from app.models.base import Base
+from app.models.enums import Roles
+from app.models.tenant import Tenants
+from app.models.user import Users
+from app.services import user_services
+
+
+@pytest_asyncio.fixture
+async def sessionmaker():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    maker.statements = statements
+    principal_cache.clear()
+    yield maker
+    principal_cache.clear()
+    await engine.dispose()
+
+
+async def seed_user(maker) -> Users:
+    async with maker() as db:
+        tenant = Tenants(id=uuid4(), name="Kiosco", contact_name="Dueño")
+        user = Users(
+            id=uuid4(),
+            tenant_id=tenant.id,
+            username=f"empleado-{uuid4().hex[:6]}",
+            hashed_password="x",
+            role=Roles.EMPLOYEE,
+            full_name="Empleado",
+        )
+        db.add_all([tenant, user])
+        await db.commit()
+        return user
+
+
+def token_for(user: Users) -> str:
+    return create_access_token({
+        "sub": str(user.id),
+        "role": user.role,
+        "tenant_id": str(user.tenant_id),
+        "ver": user.token_version,
+    })
+
+
+@pytest.mark.asyncio
+async def test_disabled_user_token_is_rejected(sessionmaker):
+    user = await seed_user(sessionmaker)
+    token = token_for(user)
+    async with sessionmaker() as db:
+        assert (await deps.get_current_user(db, token)).id == user.id
+        await user_services.disable_user(db, user.id)
+        await db.commit()
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException) as exc:
+            await deps.get_current_user(db, token)
+    assert exc.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidation_and_revocation_wait_for_commit(sessionmaker):
+    user = await seed_user(sessionmaker)
+    token = token_for(user)
+    async with sessionmaker() as db:
+        await deps.get_current_user(db, token)
+        await user_services.disable_user(db, user.id)
+        # Hasta el COMMIT el cambio no existe para los demás requests
+        assert principal_cache.get(user.id) is not None
+        await db.rollback()
+    assert principal_cache.get(user.id) is not None
+    assert not token_revocations.is_revoked(user.id, user.token_version)
+
+    async with sessionmaker() as db:
+        await user_services.disable_user(db, user.id)
+        await db.commit()
+    assert principal_cache.get(user.id) is None
+    assert token_revocations.is_revoked(user.id, user.token_version)
+
+
+@pytest.mark.asyncio
+async def test_stateless_mode_skips_users_table_and_honours_revocation(sessionmaker, monkeypatch):
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    user = await seed_user(sessionmaker)
+    token = token_for(user)
+
+    async with sessionmaker() as db:
+        await token_revocations.refresh_if_due(db)
+        sessionmaker.statements.clear()
+        principal = await deps.get_current_user(db, token)
+    assert principal.id == user.id
+    assert principal.tenant_id == user.tenant_id
+    assert principal.role == Roles.EMPLOYEE
+    assert sessionmaker.statements == []
+
+    token_revocations.revoke(user.id, user.token_version + 1)
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException):
+            await deps.get_current_user(db, token)
+
+
+@pytest.mark.asyncio
+async def test_stateless_mode_checks_cached_principal_and_sees_deletions(sessionmaker, monkeypatch):
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    user = await seed_user(sessionmaker)
+    token = token_for(user)
+
+    # Un principal cacheado inactivo para la misma versión no se devuelve
+    principal_cache.set(Users(id=user.id, tenant_id=user.tenant_id, username=user.username, role=user.role,
+                              full_name=user.full_name, is_active=False, token_version=user.token_version))
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException):
+            await deps.get_current_user(db, token)
+
+    async with sessionmaker() as db:
+        await user_services.delete_user(db, user.id)
+        await db.commit()
+    # Otro worker se entera del borrado en su refresh
+    other_worker = TokenRevocations(refresh_seconds=60)
+    async with sessionmaker() as db:
+        await other_worker.refresh_if_due(db)
+    assert other_worker.is_revoked(user.id, user.token_version)
+
+
+@pytest.mark.asyncio
+async def test_changing_password_revokes_older_tokens_and_issues_a_new_one(sessionmaker, monkeypatch):
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    user = await seed_user(sessionmaker)
+    async with sessionmaker() as db:
+        await db.execute(update(Users).where(Users.id == user.id).values(
+            hashed_password=await get_password_hash_async("vieja-clave")
+        ))
+        await db.commit()
+    stolen = token_for(user)
+
+    async with sessionmaker() as db:
+        result = await user_services.change_password(db, user.id, "vieja-clave", "nueva-clave")
+        await db.commit()
+
+    async with sessionmaker() as db:
+        with pytest.raises(HTTPException) as exc:
+            await deps.get_current_user(db, stolen)
+        assert exc.value.status_code == 403
+        assert (await deps.get_current_user(db, result["access_token"])).id == user.id
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import sqlalchemy
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from app.models.enums import NotificationStatus, NotificationType, Roles, TransactionType
+from app.models.inventory import InventorySnapshot, InventoryTransaction
+from app.models.notifications import Notification
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.models.user import Users
+from app.services import inventory_services, tenant_services
+from app.services.inventory_services import Movement
+
+
+async def seed_products(db, stock=(10, 5)):
+    tenant = Tenants(id=uuid4(), name="Depósito", contact_name="Dueño")
+    supplier = Suppliers(id=uuid4(), tenant_id=tenant.id, name="Mayorista")
+    products = [
+        Products(id=uuid4(), tenant_id=tenant.id, supplier_id=supplier.id, sku=f"P{index}", name=f"Producto {index}",
+                 unit="u", stock_quantity=quantity)
+        for index, quantity in enumerate(stock)
+    ]
+    db.add_all([tenant, supplier, *products])
+    await db.flush()
+    return tenant, products
+
+
+async def stock_of(db, product):
+    return (await db.execute(select(Products.stock_quantity).where(Products.id == product.id))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_every_line_and_writes_ledger(async_db):
+    tenant, (rice, oil) = await seed_products(async_db)
+    lines = [
+        Movement(rice.id, TransactionType.OUT, Decimal(4)),
+        Movement(oil.id, TransactionType.IN, Decimal(3)),
+        Movement(rice.id, TransactionType.OUT, Decimal(6)),
+    ]
+
+    transactions = await inventory_services.register_transactions(async_db, tenant.id, lines)
+
+    assert [t.quantity for t in transactions] == [4, 3, 6]
+    assert await stock_of(async_db, rice) == 0
+    assert await stock_of(async_db, oil) == 8
+
+
+@pytest.mark.asyncio
+async def test_batch_is_all_or_nothing(async_db):
+    tenant, (rice, oil) = await seed_products(async_db)
+    lines = [
+        Movement(oil.id, TransactionType.IN, Decimal(3)),
+        Movement(rice.id, TransactionType.OUT, Decimal(11)),
+    ]
+
+    with pytest.raises(HTTPException) as exc:
+        await inventory_services.register_transactions(async_db, tenant.id, lines)
+
+    assert exc.value.status_code == 400
+    assert await stock_of(async_db, oil) == 5
+    assert (await async_db.execute(select(func.count()).select_from(InventoryTransaction))).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_single_movement_uses_conditional_update(async_db):
+    tenant, (rice, _) = await seed_products(async_db)
+
+    transaction = await inventory_services.register_transaction(async_db, rice.id, 4, TransactionType.OUT, tenant.id, None)
+    assert (transaction.product_id, transaction.quantity) == (rice.id, 4)
+    assert await stock_of(async_db, rice) == 6
+
+    with pytest.raises(HTTPException) as exc:
+        await inventory_services.register_transaction(async_db, rice.id, 7, TransactionType.OUT, tenant.id, None)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        await inventory_services.register_transaction(async_db, uuid4(), 1, TransactionType.IN, tenant.id, None)
+    assert exc.value.status_code == 404
+    assert await stock_of(async_db, rice) == 6
+    assert (await async_db.execute(select(func.count()).select_from(InventoryTransaction))).scalar_one() == 1
+
+
+@pytest.mark.asyncio
+async def test_stock_movements_do_not_bump_catalog_version(async_db):
+    tenant, (rice, oil) = await seed_products(async_db)
+    await async_db.commit()
+    before = await tenant_services.get_catalog_version(async_db, tenant.id)
+
+    await inventory_services.register_transaction(async_db, rice.id, 1, TransactionType.OUT, tenant.id, None)
+    await inventory_services.register_transactions(async_db, tenant.id, [Movement(oil.id, TransactionType.IN, Decimal(2))])
+    await async_db.commit()
+
+    assert await tenant_services.get_catalog_version(async_db, tenant.id) == before
+
+
+@pytest.mark.asyncio
+async def test_history_pages_and_stock_as_of_from_snapshots(async_db):
+    tenant, (rice,) = await seed_products(async_db, stock=(0,))
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async_db.add_all([
+        InventoryTransaction(tenant_id=tenant.id, product_id=rice.id, transaction_type=kind, quantity=quantity,
+                             created_at=base + timedelta(days=day))
+        for day, kind, quantity in [(1, TransactionType.IN, 10), (2, TransactionType.OUT, 3),
+                                    (3, TransactionType.ADJUSTMENT, 1), (4, TransactionType.IN, 5)]
+    ])
+    await async_db.execute(update(Products).where(Products.id == rice.id).values(stock_quantity=12))
+
+    first, cursor = await inventory_services.get_product_history(async_db, rice.id, tenant.id, limit=3)
+    rest, end = await inventory_services.get_product_history(async_db, rice.id, tenant.id, limit=3, cursor=cursor)
+    assert [float(t.quantity) for t in first + rest] == [5, 1, 3, 10] and end is None
+
+    # Sin snapshots se parte del stock actual hacia atrás
+    assert await inventory_services.get_stock_as_of(async_db, rice.id, tenant.id, base + timedelta(days=2, hours=1)) == 7
+    async_db.add(InventorySnapshot(tenant_id=tenant.id, product_id=rice.id, stock_quantity=7, taken_at=base + timedelta(days=2)))
+    await async_db.flush()
+    assert await inventory_services.get_stock_as_of(async_db, rice.id, tenant.id, base + timedelta(days=4)) == 12
+    assert await inventory_services.get_stock_as_of(async_db, rice.id, tenant.id, base + timedelta(days=1)) == 10
+
+    # Desde el snapshot hubo dos movimientos
+    assert await inventory_services.take_stock_snapshots(async_db, min_movements=3) == 0
+    assert await inventory_services.take_stock_snapshots(async_db, min_movements=2) == 1
+    assert await inventory_services.take_stock_snapshots(async_db) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("atomic", [True, False])
+async def test_snapshot_and_movements_take_their_time_under_the_row_locks(async_db, monkeypatch, atomic):
+    monkeypatch.setattr(inventory_services.settings, "INVENTORY_ATOMIC_MOVEMENTS", atomic)
+    tenant, (rice,) = await seed_products(async_db, stock=(10,))
+    events = []
+    ticks = (datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minute) for minute in range(100))
+
+    class Clock:
+        @staticmethod
+        def now(tz=None):
+            events.append("now")
+            return next(ticks)
+
+    def record(conn, cursor, statement, *args):
+        events.append(statement.split(None, 3)[:3])
+
+    monkeypatch.setattr(inventory_services, "datetime", Clock)
+    engine = async_db.bind.sync_engine
+    sqlalchemy.event.listen(engine, "before_cursor_execute", record)
+    try:
+        sold = await inventory_services.register_transaction(async_db, rice.id, 4, TransactionType.OUT, tenant.id, None)
+        movement_events = list(events)
+        del events[:]
+        assert await inventory_services.take_stock_snapshots(async_db) == 1
+        snapshot_events = list(events)
+        restocked = await inventory_services.register_transaction(async_db, rice.id, 2, TransactionType.IN, tenant.id, None)
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", record)
+
+    # El movimiento toma la hora después de bloquear la fila; el snapshot, después de leer con FOR SHARE
+    first_update = next(i for i, e in enumerate(movement_events) if e[:2] == ["UPDATE", "products"])
+    assert first_update < movement_events.index("now")
+    read = next(i for i, e in enumerate(snapshot_events) if e != "now" and e[0] == "SELECT")
+    insert = next(i for i, e in enumerate(snapshot_events) if e[:3] == ["INSERT", "INTO", "inventory_snapshots"])
+    assert read < snapshot_events.index("now") < insert
+
+    # SQLite devuelve las fechas sin zona
+    taken_at, sold_at, restocked_at = (
+        moment.replace(tzinfo=timezone.utc)
+        for moment in ((await async_db.execute(select(InventorySnapshot.taken_at))).scalar_one(),
+                       sold.created_at, restocked.created_at)
+    )
+    assert sold_at < taken_at < restocked_at
+    assert await inventory_services.get_stock_as_of(async_db, rice.id, tenant.id, taken_at) == 6
+    assert await inventory_services.get_stock_as_of(async_db, rice.id, tenant.id, restocked_at) == 8
+
+
+@pytest.mark.asyncio
+async def test_crossing_reorder_point_notifies_owner_once_and_resolves_on_restock(async_db):
+    tenant, (rice, oil) = await seed_products(async_db)
+    owner = Users(tenant_id=tenant.id, username="dueno", hashed_password="x", full_name="Dueño", role=Roles.COMPANY)
+    async_db.add(owner)
+    await async_db.execute(update(Products).values(reorder_point=4))
+
+    async def pending():
+        result = await async_db.execute(select(Notification.product_id, Notification.user_id).where(
+            Notification.type == NotificationType.LOW_STOCK, Notification.status == NotificationStatus.PENDING
+        ))
+        return result.all()
+
+    await inventory_services.register_transaction(async_db, rice.id, 5, TransactionType.OUT, tenant.id, None)
+    assert await pending() == []
+    await inventory_services.register_transaction(async_db, rice.id, 2, TransactionType.OUT, tenant.id, None)
+    await inventory_services.register_transactions(async_db, tenant.id, [Movement(rice.id, TransactionType.OUT, Decimal(1))])
+    assert await pending() == [(rice.id, owner.id)]
+
+    low, _ = await inventory_services.get_low_stock_products(async_db, tenant.id)
+    assert [product.id for product in low] == [rice.id]
+
+    await inventory_services.register_transactions(async_db, tenant.id, [Movement(rice.id, TransactionType.IN, Decimal(5))])
+    assert await pending() == []
+    assert (await inventory_services.get_low_stock_products(async_db, tenant.id))[0] == []
@@ -0,0 +1,127 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.models.enums import PurchaseOrderStatus, PurchaseRequestStatus, Roles
+from app.models.inventory import InventoryCostLayer, InventoryTransaction
+from app.models.orders import PurchaseOrder, PurchaseOrderItem
+from app.models.products import Products
+from app.models.requests import PurchaseRequest, PurchaseRequestItem
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.models.user import Users
+from app.schemas.orders import OrderUpdate
+from app.services import inventory_services, order_services
+
+
+async def seed_requests(db):
+    tenant = Tenants(id=uuid4(), name="Panadería", contact_name="Dueño")
+    mill, dairy = (Suppliers(id=uuid4(), tenant_id=tenant.id, name=name) for name in ("Molino", "Tambo"))
+    user = Users(id=uuid4(), tenant_id=tenant.id, username="panadero", hashed_password="x", full_name="P", role=Roles.EMPLOYEE)
+    flour = Products(id=uuid4(), tenant_id=tenant.id, supplier_id=mill.id, sku="HAR", name="Harina", unit="kg", cost_price=300)
+    milk = Products(id=uuid4(), tenant_id=tenant.id, supplier_id=dairy.id, sku="LEC", name="Leche", unit="l", cost_price=150)
+    requests = [PurchaseRequest(id=uuid4(), tenant_id=tenant.id, user_id=user.id, status=status)
+                for status in (PurchaseRequestStatus.APPROVED, PurchaseRequestStatus.APPROVED, PurchaseRequestStatus.PENDING)]
+    db.add_all([tenant, mill, dairy, user, flour, milk, *requests])
+    await db.flush()
+    db.add_all([
+        PurchaseRequestItem(request_id=requests[0].id, product_id=flour.id, quantity=10),
+        PurchaseRequestItem(request_id=requests[0].id, product_id=milk.id, quantity=4),
+        PurchaseRequestItem(request_id=requests[1].id, product_id=flour.id, quantity=5),
+        PurchaseRequestItem(request_id=requests[2].id, product_id=milk.id, quantity=1),
+    ])
+    await db.flush()
+    return tenant, requests, flour, milk
+
+
+@pytest.mark.asyncio
+async def test_orders_are_grouped_by_supplier_and_requests_cannot_be_ordered_twice(async_db):
+    tenant, requests, flour, milk = await seed_requests(async_db)
+    approved = [requests[0].id, requests[1].id]
+
+    orders = await order_services.create_orders_from_requests(async_db, tenant.id, approved)
+
+    lines = {item.product_id: (float(item.quantity), float(item.unit_price)) for order in orders for item in order.items}
+    assert len(orders) == 2 and {order.status for order in orders} == {PurchaseOrderStatus.DRAFT}
+    assert lines == {flour.id: (15, 300), milk.id: (4, 150)}
+    for request in requests[:2]:
+        await async_db.refresh(request)
+        assert request.status == PurchaseRequestStatus.ORDERED
+
+    for request_ids, status_code in ((approved, 400), ([requests[2].id], 400), ([uuid4()], 404)):
+        with pytest.raises(HTTPException) as exc:
+            await order_services.create_orders_from_requests(async_db, tenant.id, request_ids)
+        assert exc.value.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_receiving_moves_stock_and_recomputes_status_in_one_pass(async_db):
+    tenant, requests, flour, milk = await seed_requests(async_db)
+    orders = await order_services.create_orders_from_requests(async_db, tenant.id, [requests[0].id, requests[1].id])
+    order = next(order for order in orders if order.items[0].product_id == flour.id)
+
+    partial = await order_services.receive_order(async_db, tenant.id, order.id, [{"product_id": flour.id, "quantity": 5}])
+    assert partial.status == PurchaseOrderStatus.PARTIALLY_RECEIVED
+
+    # Dos líneas del mismo producto se suman en un solo movimiento
+    received = await order_services.receive_order(async_db, tenant.id, order.id, [
+        {"product_id": flour.id, "quantity": 4}, {"product_id": flour.id, "quantity": 6},
+    ])
+    assert received.status == PurchaseOrderStatus.RECEIVED
+    assert float(received.items[0].received_quantity) == 15
+
+    stock = await async_db.scalar(select(Products.stock_quantity).where(Products.id == flour.id))
+    movements = await async_db.scalar(
+        select(func.count()).select_from(InventoryTransaction).where(InventoryTransaction.reference_id == order.id)
+    )
+    layers = await async_db.scalar(select(func.sum(InventoryCostLayer.quantity)).where(InventoryCostLayer.product_id == flour.id))
+    assert (float(stock), movements, float(layers)) == (15, 2, 15)
+
+    with pytest.raises(HTTPException) as exc:
+        await order_services.receive_order(async_db, tenant.id, order.id, [{"product_id": milk.id, "quantity": 1}])
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_receiving_is_not_limited_by_the_batch_line_cap(async_db, monkeypatch):
+    tenant, _, flour, milk = await seed_requests(async_db)
+    order = PurchaseOrder(id=uuid4(), tenant_id=tenant.id, supplier_id=flour.supplier_id, status=PurchaseOrderStatus.SENT)
+    async_db.add_all([order, *(PurchaseOrderItem(order_id=order.id, product_id=p.id, quantity=3, unit_price=10) for p in (flour, milk))])
+    await async_db.flush()
+    monkeypatch.setattr(inventory_services.settings, "INVENTORY_BATCH_MAX_LINES", 1)
+
+    received = await order_services.receive_order(async_db, tenant.id, order.id, [
+        {"product_id": flour.id, "quantity": 3}, {"product_id": milk.id, "quantity": 3},
+    ])
+
+    assert received.status == PurchaseOrderStatus.RECEIVED
+
+
+@pytest.mark.asyncio
+async def test_deleting_or_cancelling_generated_orders_releases_their_requests(async_db):
+    tenant, requests, flour, milk = await seed_requests(async_db)
+    orders = await order_services.create_orders_from_requests(async_db, tenant.id, [requests[0].id, requests[1].id])
+    mill_order, dairy_order = (next(o for o in orders if o.supplier_id == p.supplier_id) for p in (flour, milk))
+
+    async def statuses():
+        result = await async_db.execute(
+            select(PurchaseRequest.id, PurchaseRequest.status).where(PurchaseRequest.id.in_([r.id for r in requests[:2]]))
+        )
+        return dict(result.all())
+
+    # La primera solicitud también tiene leche: sigue pedida en la orden del tambo
+    await order_services.delete_order(async_db, tenant.id, mill_order.id)
+    assert await statuses() == {requests[0].id: PurchaseRequestStatus.ORDERED, requests[1].id: PurchaseRequestStatus.APPROVED}
+    assert await async_db.scalar(select(func.count()).select_from(PurchaseOrderItem)) == 1
+
+    await order_services.update_order(async_db, tenant.id, dairy_order.id, OrderUpdate(status=PurchaseOrderStatus.CANCELLED))
+    assert set((await statuses()).values()) == {PurchaseRequestStatus.APPROVED}
+    with pytest.raises(HTTPException) as exc:
+        await order_services.update_order(async_db, tenant.id, dairy_order.id, OrderUpdate(status=PurchaseOrderStatus.DRAFT))
+    assert exc.value.status_code == 400
+
+    # Se pueden volver a generar
+    again = await order_services.create_orders_from_requests(async_db, tenant.id, [requests[0].id, requests[1].id])
+    assert len(again) == 2
@@ -0,0 +1,252 @@
+import io
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import event, func, select, update
+
+from app.core import catalog_cache
+from app.core.catalog_cache import HotSkuCache
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.schemas.products import ProductsCreate, ProductsReprice
+from app.schemas.suppliers import SuppliersUpdate
+from app.services import product_services, supplier_services, tenant_services
+
+
+async def seed_catalog(db):
+    tenant = Tenants(id=uuid4(), name="Almacén", contact_name="Dueño")
+    flour, dairy = (Suppliers(id=uuid4(), tenant_id=tenant.id, name=name) for name in ("Molino", "Tambo"))
+    db.add_all([tenant, flour, dairy])
+    names = ["Harina 000", "Harina 0000", "Leche", "Manteca", "Queso", "Yerba", "Azúcar"]
+    for index, name in enumerate(names):
+        db.add(Products(
+            tenant_id=tenant.id,
+            sku=f"SKU-{index:03d}",
+            name=name,
+            unit="u",
+            stock_quantity=index,
+            is_raw_material=name.startswith("Harina"),
+            supplier_id=flour.id if name.startswith("Harina") else dairy.id,
+        ))
+    await db.flush()
+    return tenant, flour
+
+
+async def collect_pages(db, tenant_id, **filters):
+    pages, cursor = [], None
+    while True:
+        products, cursor = await product_services.get_products(db, tenant_id, limit=3, cursor=cursor, **filters)
+        pages.append(products)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_catalog_once_in_order(async_db):
+    tenant, _ = await seed_catalog(async_db)
+
+    by_name = await collect_pages(async_db, tenant.id)
+    names = [product.name for page in by_name for product in page]
+    assert [len(page) for page in by_name] == [3, 3, 1]
+    assert names == sorted(names)
+
+    by_sku = await collect_pages(async_db, tenant.id, order_by="sku")
+    assert [p.sku for page in by_sku for p in page] == [f"SKU-{i:03d}" for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_listing_filters(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    # low_stock usa el punto de pedido de cada producto (sin punto de pedido no cuenta)
+    await async_db.execute(update(Products).where(Products.name != "Harina 000").values(reorder_point=1))
+    await async_db.execute(update(Products).where(Products.name == "Harina 000").values(reorder_point=None))
+
+    async def names(**filters):
+        products, _ = await product_services.get_products(async_db, tenant.id, **filters)
+        return {product.name for product in products}
+
+    assert await names(supplier_id=flour.id) == {"Harina 000", "Harina 0000"}
+    assert await names(is_raw_material=False, prefix="le") == {"Leche"}
+    assert await names(prefix="sku-00") == await names()
+    assert await names(low_stock=True) == {"Harina 0000"}
+
+
+@pytest.mark.asyncio
+async def test_cursor_from_other_ordering_is_rejected(async_db):
+    tenant, _ = await seed_catalog(async_db)
+    _, cursor = await product_services.get_products(async_db, tenant.id, limit=2)
+    with pytest.raises(HTTPException) as exc:
+        await product_services.get_products(async_db, tenant.id, cursor=cursor, order_by="sku")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_exact_sku_then_prefix_then_substring(async_db):
+    tenant, _ = await seed_catalog(async_db)
+
+    results = await product_services.search_products(async_db, tenant.id, "harina")
+    assert [product.name for product, _ in results] == ["Harina 000", "Harina 0000"]
+
+    results = await product_services.search_products(async_db, tenant.id, "sku-004")
+    assert results[0][0].name == "Queso"
+
+    results = await product_services.search_products(async_db, tenant.id, "che")
+    assert [product.name for product, _ in results] == ["Leche"]
+    assert await product_services.search_products(async_db, uuid4(), "harina") == []
+
+
+@pytest.mark.asyncio
+async def test_csv_import_upserts_by_sku_and_reports_bad_rows(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    csv_file = io.BytesIO(
+        "sku,name,unit,base_price,cost_price,is_raw_material,supplier\n"
+        "SKU-003,Manteca x 200g,u,900,600,false,tambo\n"
+        f"NEW-1,Sémola,kg,500,300,true,{flour.id}\n"
+        "NEW-2,Polenta,kg,-1,300,false,Molino\n"
+        "NEW-3,Maicena,u,400,200,false,Desconocido\n".encode()
+    )
+
+    report = await product_services.import_products_csv(async_db, csv_file, tenant.id)
+
+    assert (report.total_rows, report.created, report.updated, report.failed) == (4, 1, 1, 2)
+    assert [error.row for error in report.errors] == [4, 5]
+    products, _ = await product_services.get_products(async_db, tenant.id, prefix="manteca")
+    # Se actualizan los datos del catálogo pero el stock queda como estaba
+    assert [(p.name, float(p.base_price), float(p.stock_quantity)) for p in products] == [("Manteca x 200g", 900, 3)]
+
+
+@pytest.mark.asyncio
+async def test_csv_import_rejects_non_utf8_files_with_the_row(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    csv_file = io.BytesIO(
+        "sku,name,unit,base_price,cost_price,supplier\n"
+        "NEW-1,Sémola,kg,500,300,Molino\n".encode("cp1252")
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await product_services.import_products_csv(async_db, csv_file, tenant.id)
+    assert exc.value.status_code == 400 and exc.value.detail.startswith("Fila 2:")
+
+    # Un campo más largo que csv.field_size_limit()
+    huge = io.BytesIO(b"sku,name,unit,base_price,cost_price,supplier\nNEW-1," + b"x" * 200_000 + b",kg,1,1,Molino\n")
+    with pytest.raises(HTTPException) as exc:
+        await product_services.import_products_csv(async_db, huge, tenant.id)
+    assert exc.value.status_code == 400 and exc.value.detail.startswith("Fila 2:")
+
+
+@pytest.mark.asyncio
+async def test_reprice_dry_run_projects_and_real_run_applies(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    await async_db.execute(update(Products).values(base_price=100, cost_price=80))
+    change = ProductsReprice(mode="percent", value=12.5, supplier_id=flour.id, fields=["base_price"], dry_run=True)
+
+    preview = await product_services.reprice_products(async_db, change, tenant.id)
+    assert preview.count == 2
+    assert {(item.old_base_price, item.new_base_price, item.new_cost_price) for item in preview.items} == {(100, 112.5, 80)}
+    assert {float(p.base_price) for p in (await product_services.get_products(async_db, tenant.id))[0]} == {100}
+
+    applied = await product_services.reprice_products(async_db, change.model_copy(update={"dry_run": False}), tenant.id)
+    assert applied.items == preview.items
+    products, _ = await product_services.get_products(async_db, tenant.id, supplier_id=flour.id)
+    await async_db.refresh(products[0])
+    assert float(products[0].base_price) == 112.5
+
+    floor = ProductsReprice(mode="absolute", value=-500, product_ids=[products[0].id], fields=["cost_price"])
+    assert (await product_services.reprice_products(async_db, floor, tenant.id)).items[0].new_cost_price == 0
+
+    with pytest.raises(HTTPException) as exc:
+        await product_services.reprice_products(async_db, ProductsReprice(mode="percent", value=5), tenant.id)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_reprice_rejects_unbounded_values_and_prices_above_the_column_limit(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    await async_db.execute(update(Products).values(base_price=100))
+    for value, mode in ((float("nan"), "absolute"), (float("inf"), "percent"), (-150, "percent"), (1e12, "absolute")):
+        with pytest.raises(ValidationError):
+            ProductsReprice(mode=mode, value=value, supplier_id=flour.id)
+
+    change = ProductsReprice(mode="absolute", value=99_999_950, supplier_id=flour.id)
+    with pytest.raises(HTTPException) as exc:
+        await product_services.reprice_products(async_db, change, tenant.id)
+    assert exc.value.status_code == 400
+    assert {float(p.base_price) for p in (await product_services.get_products(async_db, tenant.id))[0]} == {100}
+
+
+@pytest.mark.asyncio
+async def test_archiving_supplier_hides_it_and_its_products_but_keeps_rows(async_db):
+    tenant, flour = await seed_catalog(async_db)
+
+    result = await supplier_services.delete_supplier(async_db, flour.id, tenant.id)
+
+    assert result["archived_products"] == 2
+    assert await supplier_services.get_supplier_by_id(async_db, flour.id, tenant.id) is None
+    products, _ = await product_services.get_products(async_db, tenant.id)
+    assert "Harina 000" not in {product.name for product in products}
+    archived = await async_db.execute(select(func.count()).select_from(Products).where(Products.archived_at.is_not(None)))
+    assert archived.scalar_one() == 2
+    with pytest.raises(HTTPException) as exc:
+        await product_services.delete_all_products_by_supplier(async_db, tenant.id, flour.id)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_creating_an_archived_sku_reactivates_it_and_active_sku_conflicts(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    products, _ = await product_services.get_products(async_db, tenant.id, prefix="SKU-001")
+    archived = products[0]
+    await product_services.delete_product(async_db, archived.id, tenant.id)
+
+    data = ProductsCreate(sku="SKU-001", name="Harina integral", unit="kg", base_price=700, cost_price=500,
+                          supplier_id=flour.id)
+    product = await product_services.create_product(async_db, data, tenant.id)
+
+    # Misma fila (el historial sigue atado), datos nuevos y el stock como estaba
+    assert (product.id, product.name, float(product.stock_quantity), product.archived_at) == (
+        archived.id, "Harina integral", 1, None
+    )
+    with pytest.raises(HTTPException) as exc:
+        await product_services.create_product(async_db, data, tenant.id)
+    assert exc.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_catalog_writes_bump_tenant_catalog_version(async_db):
+    tenant, flour = await seed_catalog(async_db)
+    before = await tenant_services.get_catalog_version(async_db, tenant.id)
+
+    await product_services.delete_all_products_by_supplier(async_db, tenant.id, flour.id)
+    await supplier_services.update_supplier(async_db, SuppliersUpdate(phone="1234"), flour.id, tenant.id)
+    # La versión sube al confirmar, una vez por transacción
+    assert await tenant_services.get_catalog_version(async_db, tenant.id) == before
+    await async_db.commit()
+    assert await tenant_services.get_catalog_version(async_db, tenant.id) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_sku_lookup_is_served_from_cache_until_catalog_changes(async_db, monkeypatch):
+    tenant, flour = await seed_catalog(async_db)
+    cache = HotSkuCache(maxsize=16, version_ttl=60)
+    monkeypatch.setattr(product_services, "hot_sku_cache", cache)
+    monkeypatch.setattr(catalog_cache, "hot_sku_cache", cache)
+
+    found = await product_services.lookup_skus(async_db, tenant.id, ["SKU-000", " SKU-001 ", "NOPE"])
+    assert sorted(found) == ["SKU-000", "SKU-001"]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(async_db.bind.sync_engine, "before_cursor_execute", listener)
+    try:
+        await product_services.lookup_skus(async_db, tenant.id, ["SKU-000"])
+    finally:
+        event.remove(async_db.bind.sync_engine, "before_cursor_execute", listener)
+    assert statements == []  # ni siquiera lee la versión de catálogo
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    await product_services.delete_all_products_by_supplier(async_db, tenant.id, flour.id)
+    await async_db.commit()
+    assert await product_services.lookup_skus(async_db, tenant.id, ["SKU-000"]) == {}
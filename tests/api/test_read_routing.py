@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api import deps
+from app.middleware.read_after_write import READ_PRIMARY_COOKIE, ReadAfterWriteMiddleware
+
+
+def make_database(path, name):
+    with sqlite3.connect(path) as conn:
+        conn.execute("create table source (name text)")
+        conn.execute("insert into source values (?)", (name,))
+
+
+@pytest.fixture
+def routed_client(tmp_path, monkeypatch):
+    sessionmakers = {}
+    for name in ("primary", "replica"):
+        path = tmp_path / f"{name}.db"
+        make_database(path, name)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        sessionmakers[name] = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(deps, "get_sessionmaker", lambda: sessionmakers["primary"])
+    monkeypatch.setattr(deps, "get_read_sessionmaker", lambda: sessionmakers["replica"])
+
+    app = FastAPI()
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+    @app.get("/source")
+    async def source(db: AsyncSession = Depends(deps.get_read_db)):
+        return (await db.execute(text("select name from source"))).scalar_one()
+
+    @app.post("/write")
+    async def write():
+        return {}
+
+    with TestClient(app, base_url="https://testserver") as client:
+        yield client
+
+
+def test_reads_go_to_replica_until_client_writes(routed_client):
+    assert routed_client.get("/source").json() == "replica"
+
+    response = routed_client.post("/write")
+    assert READ_PRIMARY_COOKIE in response.cookies
+    assert routed_client.get("/source").json() == "primary"
+
+    routed_client.cookies.clear()
+    assert routed_client.get("/source").json() == "replica"
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import instrument_engine
+from app.core.sql_stats import statement_shape, track_request
+from app.middleware.sql_timing import SQLTimingMiddleware
+
+
+def test_statement_shape_ignores_parameters_and_in_list_length():
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3)") == statement_shape(
+        "SELECT *\n  FROM t WHERE id IN ($1)"
+    )
+
+
+def test_server_timing_header_and_n_plus_one_warning(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 3)
+    engine = instrument_engine(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'timing.db'}"))
+
+    app = FastAPI()
+    app.add_middleware(SQLTimingMiddleware)
+
+    @app.get("/items")
+    async def items():
+        async with engine.connect() as conn:
+            for item_id in range(5):
+                await conn.execute(text("select :id"), {"id": item_id})
+        return {}
+
+    with caplog.at_level(logging.INFO, logger="app.sql"), TestClient(app) as client:
+        response = client.get("/items")
+
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="5 queries"' in response.headers["Server-Timing"]
+    warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1 and '"count": 5' in warnings[0].getMessage()
+    assert '"route": "/items"' in caplog.records[0].getMessage()
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_leave_its_start_on_the_connection(tmp_path):
+    engine = instrument_engine(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'errors.db'}"))
+    with track_request() as stats:
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("select * from missing_table"))
+            await conn.execute(text("select 1"))
+            starts = (await conn.get_raw_connection()).info.get("sql_stats_start")
+    await engine.dispose()
+
+    assert not starts
+    assert stats.count == 2
@@ -0,0 +1,39 @@
+from uuid import uuid4
+
+import pytest
+
+from app.models.enums import PurchaseOrderStatus
+from app.models.orders import PurchaseOrder, PurchaseOrderItem
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.services import order_services, valuation_services
+
+
+@pytest.mark.asyncio
+async def test_fifo_and_average_value_received_layers_and_fallback_to_cost_price(async_db):
+    tenant = Tenants(id=uuid4(), name="Ferretería", contact_name="Dueño")
+    supplier = Suppliers(id=uuid4(), tenant_id=tenant.id, name="Mayorista")
+    nails = Products(id=uuid4(), tenant_id=tenant.id, supplier_id=supplier.id, sku="CLAVO", name="Clavos",
+                     unit="kg", stock_quantity=0, cost_price=5)
+    glue = Products(id=uuid4(), tenant_id=tenant.id, supplier_id=supplier.id, sku="COLA", name="Cola",
+                    unit="u", stock_quantity=3, cost_price=7)
+    async_db.add_all([tenant, supplier, nails, glue])
+    await async_db.flush()
+
+    # Dos recepciones de clavos: 10 a $100 y después 10 a $120
+    for price in (100, 120):
+        order = PurchaseOrder(id=uuid4(), tenant_id=tenant.id, supplier_id=supplier.id, status=PurchaseOrderStatus.SENT)
+        async_db.add_all([order, PurchaseOrderItem(order_id=order.id, product_id=nails.id, quantity=10, unit_price=price)])
+        await async_db.flush()
+        await order_services.receive_order(async_db, tenant.id, order.id, [{"product_id": nails.id, "quantity": 10}])
+    # Salen 12: con FIFO quedan 8 de la capa de $120
+    nails.stock_quantity = 8
+    await async_db.flush()
+
+    fifo = await valuation_services.get_valuation_report(async_db, tenant.id, "fifo")
+    assert [(line.sku, line.value, line.unit_cost) for line in fifo.items] == [("CLAVO", 960, 120), ("COLA", 21, 7)]
+    assert fifo.total_value == 981
+
+    average = await valuation_services.get_valuation_report(async_db, tenant.id, "average")
+    assert [(line.sku, line.value) for line in average.items] == [("CLAVO", 880), ("COLA", 21)]
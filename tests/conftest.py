@@ -1,7 +1,9 @@
 import pytest
+import pytest_asyncio
 from typing import AsyncGenerator, Generator
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from app.main import app
@@ -52,4 +54,16 @@ def client() -> Generator[TestClient, None, None]:
     Por ahora, TestClient es lo estándar para endpoints básicos.
     """
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+@pytest_asyncio.fixture
+async def async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sesión async sobre un SQLite en memoria (aiosqlite) con todas las tablas,
+    para probar servicios tal como los usa la app.
+    """
+    async_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await async_engine.dispose()
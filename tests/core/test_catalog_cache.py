@@ -0,0 +1,65 @@
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.catalog_cache import CatalogCache
+
+
+def test_etag_revalidation_and_cached_body():
+    cache = CatalogCache(max_bytes=1024)
+    tenant_id, state = uuid4(), {"version": 1, "builds": 0}
+    app = FastAPI()
+
+    @app.get("/products")
+    async def products(request: Request):
+        async def build() -> bytes:
+            state["builds"] += 1
+            return f'{{"items": [], "version": {state["version"]}}}'.encode()
+        return await cache.respond(request, tenant_id, state["version"], build)
+
+    client = TestClient(app)
+    first = client.get("/products?limit=10")
+    assert first.status_code == 200 and first.json() == {"items": [], "version": 1}
+
+    assert client.get("/products?limit=10", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert client.get("/products?limit=10").status_code == 200
+    assert state["builds"] == 1
+
+    state["version"] = 2
+    changed = client.get("/products?limit=10", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+    assert state["builds"] == 2
+    assert cache.stats()["hit_rate"] == 0.5 and cache.stats()["not_modified"] == 1
+
+
+def test_unchanged_page_still_revalidates_after_the_stock_epoch_rolls_over():
+    cache = CatalogCache(max_bytes=1024)
+    tenant_id, state = uuid4(), {"epoch": 1, "body": b'{"items": [{"stock": 3}]}'}
+    app = FastAPI()
+
+    @app.get("/products")
+    async def products(request: Request):
+        async def build() -> bytes:
+            return state["body"]
+        return await cache.respond(request, tenant_id, 1, build, epoch=state["epoch"])
+
+    client = TestClient(app)
+    etag = client.get("/products").headers["ETag"]
+
+    state["epoch"] = 2
+    assert client.get("/products", headers={"If-None-Match": etag}).status_code == 304
+
+    state["epoch"], state["body"] = 3, b'{"items": [{"stock": 2}]}'
+    moved = client.get("/products", headers={"If-None-Match": etag})
+    assert moved.status_code == 200 and moved.headers["ETag"] != etag
+
+
+def test_eviction_is_by_size_in_bytes():
+    cache = CatalogCache(max_bytes=100)
+    for page in range(3):
+        cache.set(("tenant", 1, "/products", f"page={page}"), b"x" * 40)
+    assert cache.stats()["entries"] == 2 and cache.stats()["size_bytes"] == 80
+    assert cache.get(("tenant", 1, "/products", "page=0")) is None
+    cache.set(("tenant", 1, "/products", "huge"), b"x" * 101)
+    assert cache.get(("tenant", 1, "/products", "huge")) is None
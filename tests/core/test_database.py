@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import database
+from app.core.database import InstrumentedAsyncPool, get_db, pool_status
+
+
+@pytest.mark.asyncio
+async def test_pool_status_reports_checkouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    async with engine.connect() as first, engine.connect() as second:
+        await first.execute(text("select 1"))
+        await second.execute(text("select 1"))
+        status = pool_status(engine)
+        assert status["checked_out"] == 2
+        assert status["overflow"] == 1
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 1
+    assert status["checkouts"] == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_get_db_commits_once_or_rolls_back(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("create table items (name text)"))
+    maker = async_sessionmaker(bind=engine, class_=AsyncSession)
+    monkeypatch.setattr(database, "get_sessionmaker", lambda: maker)
+
+    request = get_db()
+    db = await request.__anext__()
+    await db.execute(text("insert into items values ('ok')"))
+    with pytest.raises(StopAsyncIteration):
+        await request.__anext__()
+
+    request = get_db()
+    db = await request.__anext__()
+    await db.execute(text("insert into items values ('falla')"))
+    with pytest.raises(RuntimeError):
+        await request.athrow(RuntimeError("error en el endpoint"))
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("select name from items"))).scalars().all()
+    assert rows == ["ok"]
+    await engine.dispose()
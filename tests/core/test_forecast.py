@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.models.enums import Roles, TransactionType
+from app.models.inventory import InventoryTransaction
+from app.models.products import Products
+from app.models.suppliers import Suppliers
+from app.models.tenant import Tenants
+from app.models.user import Users
+from app.services import forecast_services
+from app.services.forecast_services import Consumption, forecast_demand, reorder_quantities
+
+
+def test_moving_average_and_smoothing_treat_missing_days_as_zero():
+    # Producto 0: 2 por día los últimos 4 días; producto 1: un solo pico de 8 hace 3 días
+    consumption = Consumption(
+        np.array([0, 0, 0, 0, 1]), np.array([6, 7, 8, 9, 6]), np.array([2.0, 2.0, 2.0, 2.0, 8.0])
+    )
+
+    demand, std = forecast_demand(consumption, 3, 10, method="sma", window=4)
+    assert demand.tolist() == [2.0, 2.0, 0.0]
+    assert std[0] == 0 and std[1] == pytest.approx(np.std([8, 0, 0, 0]))
+
+    demand, _ = forecast_demand(consumption, 3, 10, method="ses", alpha=0.5)
+    weights = 0.5 ** np.arange(1, 11)[::-1] / (1 - 0.5 ** 10)
+    assert demand[0] == pytest.approx(2 * weights[6:].sum())
+    assert demand[1] < demand[0]
+
+
+def test_reorder_quantities_cover_lead_time_review_and_manual_reorder_point():
+    stock = np.array([5.0, 100.0, 1.0])
+    cover, quantity = reorder_quantities(
+        stock,
+        np.array([np.nan, np.nan, 3.0]),
+        np.array([2.0, 2.0, 0.0]),
+        np.zeros(3),
+        lead_time_days=7,
+        review_days=7,
+        service_z=1.65,
+    )
+    assert cover.tolist() == [2.5, 50.0, np.inf]
+    assert quantity.tolist() == [23.0, 0.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_suggestions_become_a_pending_purchase_request(async_db):
+    tenant = Tenants(id=uuid4(), name="Panadería", contact_name="Dueño")
+    supplier = Suppliers(id=uuid4(), tenant_id=tenant.id, name="Molino")
+    flour, salt = (
+        Products(id=uuid4(), tenant_id=tenant.id, supplier_id=supplier.id, sku=sku, name=sku, unit="kg", stock_quantity=10)
+        for sku in ("HARINA", "SAL")
+    )
+    user = Users(id=uuid4(), tenant_id=tenant.id, username="panadero", hashed_password="x", full_name="P", role=Roles.EMPLOYEE)
+    now = datetime.now(forecast_services.ARG)
+    async_db.add_all([tenant, supplier, flour, salt, user, *(
+        InventoryTransaction(tenant_id=tenant.id, product_id=flour.id, transaction_type=TransactionType.OUT,
+                             quantity=5, created_at=now - timedelta(days=day))
+        for day in range(30)
+    )])
+    await async_db.flush()
+
+    suggestions = await forecast_services.get_reorder_suggestions(async_db, tenant.id, method="sma")
+    assert [(s.sku, s.daily_demand, s.days_of_cover) for s in suggestions] == [("HARINA", 5, 2)]
+
+    request = await forecast_services.create_request_from_suggestions(async_db, tenant.id, user.id, method="sma")
+    assert [(item.product_id, float(item.quantity)) for item in request.items] == [(flour.id, 60)]
@@ -0,0 +1,30 @@
+from datetime import date, datetime
+
+from app.services.partition_services import ARG, monthly_partition, partition_plan, retention_start
+
+
+def test_monthly_partition_bounds_cross_year_in_argentina_time():
+    partition = monthly_partition(date(2026, 12, 15))
+    assert partition.name == "inventory_transactions_p202612"
+    assert (partition.start, partition.end) == (datetime(2026, 12, 1, tzinfo=ARG), datetime(2027, 1, 1, tzinfo=ARG))
+
+
+def test_plan_creates_missing_future_months_and_detaches_past_retention():
+    existing = [
+        "inventory_transactions_default",
+        "inventory_transactions_p202607",
+        "inventory_transactions_p202606",
+        "inventory_transactions_p202608",
+        "inventory_transactions_p202610",
+        "inventory_transactions_p202611",
+    ]
+
+    plan = partition_plan(date(2026, 10, 18), existing, months_ahead=3, retain_months=2)
+
+    assert [p.name for p in plan.create] == ["inventory_transactions_p202612", "inventory_transactions_p202701"]
+    # Se conservan agosto, septiembre y el mes actual; la default nunca se toca
+    assert plan.detach == ["inventory_transactions_p202606", "inventory_transactions_p202607"]
+    assert retention_start(date(2026, 10, 18), 2) == datetime(2026, 8, 1, tzinfo=ARG)
+
+    keep_all = partition_plan(date(2026, 10, 18), existing, months_ahead=1, retain_months=0)
+    assert keep_all.create == [] and keep_all.detach == []
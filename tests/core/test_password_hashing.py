@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.security import (
+    PasswordHashPool,
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_hash_roundtrip():
+    hashed = await get_password_hash_async("secreto")
+    assert verify_password("secreto", hashed)
+    assert await verify_password_async("secreto", hashed)
+    assert not await verify_password_async("otro", hashed)
+
+
+@pytest.mark.asyncio
+async def test_pool_does_not_block_event_loop_and_reports_queue():
+    pool = PasswordHashPool(max_workers=1)
+    hashed = get_password_hash("secreto")
+
+    storm = [asyncio.create_task(pool.run(verify_password, "secreto", hashed)) for _ in range(4)]
+    # Mientras bcrypt corre en el pool, el loop sigue atendiendo otras tareas
+    start = time.perf_counter()
+    await asyncio.sleep(0.01)
+    assert time.perf_counter() - start < 0.1
+    assert pool.stats()["queued"] + pool.stats()["running"] > 0
+
+    assert all(await asyncio.gather(*storm))
+    stats = pool.stats()
+    assert stats["completed"] == 4
+    assert stats["max_queued"] >= 3
+    assert stats["queued"] == 0 and stats["running"] == 0
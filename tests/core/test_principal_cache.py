@@ -0,0 +1,80 @@
+from uuid import uuid4
+
+from app.core.principal_cache import PrincipalCache
+from app.models.enums import Roles
+from app.models.user import Users
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_user(tenant_id=None):
+    return Users(
+        id=uuid4(),
+        tenant_id=tenant_id or uuid4(),
+        username="empleado",
+        hashed_password="hash",
+        role=Roles.EMPLOYEE,
+        full_name="Empleado de Prueba",
+        is_active=True,
+    )
+
+
+def test_hit_returns_detached_copy_without_password():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    user = make_user()
+    assert cache.get(user.id) is None
+    cache.set(user)
+
+    cached = cache.get(user.id)
+    assert cached is not user
+    assert cached.id == user.id
+    assert cached.role == Roles.EMPLOYEE
+    assert "hashed_password" not in cached.__dict__
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_tenant_mismatch_is_a_miss():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    user = make_user()
+    cache.set(user)
+    assert cache.get(user.id, tenant_id=uuid4()) is None
+    assert cache.get(user.id, tenant_id=user.tenant_id) is not None
+
+
+def test_invalidate_user_and_tenant():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    tenant_id = uuid4()
+    first, second, other = make_user(tenant_id), make_user(tenant_id), make_user()
+    for user in (first, second, other):
+        cache.set(user)
+
+    cache.invalidate(first.id)
+    assert cache.get(first.id) is None
+
+    cache.invalidate_tenant(tenant_id)
+    assert cache.get(second.id) is None
+    assert cache.get(other.id) is not None
+
+
+def test_entries_expire_after_ttl():
+    timer = FakeTimer()
+    cache = PrincipalCache(maxsize=10, ttl=30, timer=timer)
+    user = make_user()
+    cache.set(user)
+    timer.now = 31
+    assert cache.get(user.id) is None
+
+
+def test_zero_ttl_disables_cache():
+    cache = PrincipalCache(maxsize=10, ttl=0)
+    user = make_user()
+    cache.set(user)
+    assert cache.get(user.id) is None
+    assert cache.stats()["enabled"] is False